@@ -0,0 +1,194 @@
+import asyncio
+import io
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import wave
+from typing import Optional
+
+from tts_engines import ffmpeg_binary
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # s16le
+
+
+class AudioDecodeError(RuntimeError):
+    pass
+
+
+def _wav_pcm(data: bytes, sample_rate: int) -> Optional[bytes]:
+    """PCM frames of a WAV that is already mono s16 at sample_rate (no decoding needed)."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(data), "rb") as w:
+            if w.getnchannels() == 1 and w.getsampwidth() == SAMPLE_WIDTH and w.getframerate() == sample_rate:
+                return w.readframes(w.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return None
+
+
+class PCMDecoder:
+    """Decodes uploaded audio (webm/ogg/mp3/wav/...) to mono s16le PCM entirely in memory.
+
+    ffmpeg reads the upload from stdin and writes raw PCM to stdout. A few ffmpeg processes are
+    spawned ahead of time and wait on stdin, so a clip never pays the process start-up cost on
+    the request path; each process handles one clip and is replaced in the background.
+    """
+
+    def __init__(self, *, sample_rate: int = SAMPLE_RATE, pool_size: int = 2, timeout_s: float = 20.0) -> None:
+        self.sample_rate = sample_rate
+        self.pool_size = max(0, pool_size)
+        self.timeout_s = timeout_s
+        self.ffmpeg = ffmpeg_binary()
+        self._ready: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._closed = False
+        self.counters = {"clips": 0, "wav_passthrough": 0, "prespawned_hits": 0, "cold_spawns": 0, "seekable_fallbacks": 0, "errors": 0}
+
+    def _command(self, source: str) -> list:
+        cmd = [self.ffmpeg, "-hide_banner", "-loglevel", "error"]
+        if source != "pipe:0":
+            cmd.append("-nostdin")
+        return cmd + ["-i", source, "-vn", "-ac", "1", "-ar", str(self.sample_rate), "-f", "s16le", "pipe:1"]
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            self._command("pipe:0"), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def _refill(self) -> None:
+        if self._closed or self.ffmpeg is None:
+            return
+        try:
+            with self._refill_lock:
+                while self._ready.qsize() < self.pool_size:
+                    self._ready.put(self._spawn())
+        except OSError as e:
+            print(f"Could not pre-spawn ffmpeg decoder: {e}")
+
+    def start(self) -> None:
+        threading.Thread(target=self._refill, name="pcm-decoder-refill", daemon=True).start()
+
+    def _take(self) -> subprocess.Popen:
+        while True:
+            try:
+                proc = self._ready.get_nowait()
+            except queue.Empty:
+                self._count("cold_spawns")
+                return self._spawn()
+            if proc.poll() is None:
+                self._count("prespawned_hits")
+                return proc
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+    def decode(self, data: bytes) -> bytes:
+        """Mono s16le PCM at sample_rate for an encoded clip."""
+        if not data:
+            raise AudioDecodeError("empty audio")
+        self._count("clips")
+        pcm = _wav_pcm(data, self.sample_rate)
+        if pcm is not None:
+            self._count("wav_passthrough")
+            return pcm
+        if self.ffmpeg is None:
+            self._count("errors")
+            raise AudioDecodeError("ffmpeg not found")
+
+        proc = self._take()
+        threading.Thread(target=self._refill, name="pcm-decoder-refill", daemon=True).start()
+        try:
+            out, err = proc.communicate(data, timeout=self.timeout_s)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            self._count("errors")
+            raise AudioDecodeError("ffmpeg decode timed out")
+        if proc.returncode == 0 and out:
+            return out
+
+        # Containers with the index at the end (some mp4/m4a) cannot be decoded from a pipe.
+        pcm = self._decode_seekable(data)
+        if pcm:
+            return pcm
+        self._count("errors")
+        raise AudioDecodeError(err.decode("utf-8", "replace").strip()[:300] or "ffmpeg produced no audio")
+
+    def _decode_seekable(self, data: bytes) -> Optional[bytes]:
+        self._count("seekable_fallbacks")
+        fd, path = tempfile.mkstemp(prefix="sahajseva-stt-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            proc = subprocess.run(self._command(path), capture_output=True, timeout=self.timeout_s)
+            return proc.stdout if proc.returncode == 0 else None
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                proc = self._ready.get_nowait()
+            except queue.Empty:
+                return
+            proc.kill()
+            proc.wait()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, prespawned_idle=self._ready.qsize(), pool_size=self.pool_size)
+
+
+class StreamDecoder:
+    """One ffmpeg process per live stream: encoded chunks in (e.g. MediaRecorder webm), PCM out."""
+
+    def __init__(self, *, sample_rate: int = SAMPLE_RATE) -> None:
+        self.sample_rate = sample_rate
+        self.ffmpeg = ffmpeg_binary()
+        self._proc: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self) -> None:
+        if self.ffmpeg is None:
+            raise AudioDecodeError("ffmpeg not found")
+        self._proc = await asyncio.create_subprocess_exec(
+            self.ffmpeg, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0", "-vn", "-ac", "1", "-ar", str(self.sample_rate), "-f", "s16le", "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def feed(self, chunk: bytes) -> None:
+        self._proc.stdin.write(chunk)
+        await self._proc.stdin.drain()
+
+    async def read(self, size: int = 9600) -> bytes:
+        """Next block of PCM; b"" once ffmpeg has flushed everything after end_input()."""
+        return await self._proc.stdout.read(size)
+
+    def end_input(self) -> None:
+        if self._proc is not None and not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+
+    async def close(self) -> None:
+        if self._proc is None:
+            return
+        self.end_input()
+        try:
+            await asyncio.wait_for(self._proc.wait(), timeout=2.0)
+        except asyncio.TimeoutError:
+            self._proc.kill()
+            await self._proc.wait()
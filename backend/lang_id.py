@@ -0,0 +1,133 @@
+"""Deterministic script-based language identification for short strings.
+
+Each character is mapped to a script tag with one ``str.translate`` call and the
+tags are counted with ``str.count``, so the per-string cost stays in C. The
+dominant script decides the language; Devanagari is split between Hindi and
+Marathi with a few Marathi-only markers, and Latin text can optionally be
+checked for romanized Hindi with a small word profile.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# script tag -> (default language, Unicode ranges)
+_SCRIPTS = {
+    "latn": ("en", [(0x41, 0x5A), (0x61, 0x7A), (0xC0, 0xD6), (0xD8, 0xF6), (0xF8, 0x24F)]),
+    "deva": ("hi", [(0x900, 0x97F), (0xA8E0, 0xA8FF)]),
+    "beng": ("bn", [(0x980, 0x9FF)]),
+    "guru": ("pa", [(0xA00, 0xA7F)]),
+    "gujr": ("gu", [(0xA80, 0xAFF)]),
+    "orya": ("or", [(0xB00, 0xB7F)]),
+    "taml": ("ta", [(0xB80, 0xBFF)]),
+    "telu": ("te", [(0xC00, 0xC7F)]),
+    "knda": ("kn", [(0xC80, 0xCFF)]),
+    "mlym": ("ml", [(0xD00, 0xD7F)]),
+    "arab": ("ur", [(0x600, 0x6FF)]),
+}
+
+# Language -> script for the languages the app speaks.
+LANGUAGE_SCRIPT = {
+    "en": "latn",
+    "hi": "deva",
+    "mr": "deva",
+    "bn": "beng",
+    "pa": "guru",
+    "gu": "gujr",
+    "ta": "taml",
+    "te": "telu",
+    "kn": "knda",
+    "ml": "mlym",
+    "or": "orya",
+    "ur": "arab",
+}
+
+# Each script gets a single control character as its tag. The table is a list over the
+# BMP: every code point outside the known scripts maps to None and is deleted, so the
+# translated string holds nothing but tags (astral characters pass through unchanged).
+_TAGS = {script: chr(1 + i) for i, script in enumerate(_SCRIPTS)}
+_TAG_SCRIPT = {tag: script for script, tag in _TAGS.items()}
+_TAG_LIST = list(_TAGS.values())
+_TABLE: List[Optional[str]] = [None] * 0x10000
+for _script, (_, _ranges) in _SCRIPTS.items():
+    for _lo, _hi in _ranges:
+        for _cp in range(_lo, _hi + 1):
+            _TABLE[_cp] = _TAGS[_script]
+
+
+# Marathi-only letters/words used to split Devanagari text between hi and mr.
+_MARATHI_MARKERS_RE = re.compile(r"[ळऱ]|(?:^|\s)(?:आहे|आहेत|आणि|नाही|माझे|माझा|माझी|तुम्ही|करा|लिहा)(?:\s|$|[।.,])")
+
+# Very frequent romanized Hindi words that are rare in English text.
+_HINGLISH_WORDS = frozenset(
+    "hai hain mera meri mere naam kya nahi nahin aur ka ki ke hoon hun mein main tha thi "
+    "kaise kahan kyun haan ji aap apna apni gaon sheher ghar paisa saal umar beta beti".split()
+)
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """Number of characters per known script in text (scripts with zero count are omitted)."""
+    tagged = str(text or "").translate(_TABLE)
+    out = {}
+    for script, tag in _TAGS.items():
+        n = tagged.count(tag)
+        if n:
+            out[script] = n
+    return out
+
+
+def dominant_script(text: str) -> Optional[str]:
+    tagged = str(text or "").translate(_TABLE)
+    if not tagged:
+        return None
+    # Fast path: the whole string is in one script.
+    first = _TAG_SCRIPT.get(tagged[0])
+    if first is not None and tagged.count(tagged[0]) == len(tagged):
+        return first
+    # Ties resolve by table order, which keeps the result deterministic.
+    best = max(_TAG_LIST, key=tagged.count)
+    return _TAG_SCRIPT[best] if best in tagged else None
+
+
+def contains_script(text: str, language: str) -> bool:
+    script = LANGUAGE_SCRIPT.get(language)
+    if script is None:
+        return False
+    return _TAGS[script] in str(text or "").translate(_TABLE)
+
+
+def written_in(text: str, language: str) -> bool:
+    """True when every letter of text belongs to language's script.
+
+    Strings without letters (numbers, dates, PIN codes) count as written in any language.
+    """
+    tag = _TAGS[LANGUAGE_SCRIPT.get(language, "latn")]
+    tagged = str(text or "").translate(_TABLE)
+    return tagged.count(tag) == len(tagged) or not any(t in tagged for t in _TAG_LIST if t != tag)
+
+
+def _looks_romanized_hindi(text: str) -> bool:
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return False
+    hits = sum(1 for w in words if w in _HINGLISH_WORDS)
+    return hits >= 2 or (hits and hits * 3 >= len(words))
+
+
+def identify(text: str, *, default: str = "en", hint: Optional[str] = None, romanized: bool = False) -> str:
+    """Best-guess language code for text.
+
+    hint: a language expected by the caller (e.g. the session language); it wins
+        whenever it is written in the detected script, which settles hi vs mr.
+    romanized: also recognise Hindi written in Latin letters.
+    """
+    script = dominant_script(text)
+    if script is None:
+        return default
+    if hint and LANGUAGE_SCRIPT.get(hint) == script:
+        return hint
+    if script == "deva":
+        return "mr" if _MARATHI_MARKERS_RE.search(text) else "hi"
+    if script == "latn" and romanized and _looks_romanized_hindi(text):
+        return "hi"
+    return _SCRIPTS[script][0]
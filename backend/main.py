@@ -1,17 +1,36 @@
 import os
+import time
 import uuid
+import asyncio
+import hashlib
+import threading
 import json
 import re
+import contextvars
 import unicodedata
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Mapping, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+import lang_id
+from audio_decode import AudioDecodeError, PCMDecoder, StreamDecoder
+from stt_engines import NoSpeechError, STTEngineError
+from vad import Segmenter, VoiceActivityDetector, trim_silence
+import mp3_frames
+import stt_engines
+import tts_engines
+import timing
 from ai_providers import get_ai_client
+from sessions import SessionConflict, create_session_store
+from translation_memory import TranslationMemory
+from uploads_janitor import UploadsJanitor, shard_path
 from scheme_models import (
     ExtractProfileRequest,
     ExtractProfileResponse,
@@ -26,18 +45,6 @@ except Exception:  # pragma: no cover
     genai = None
     types = None
 
-try:
-    from gtts import gTTS  # type: ignore
-except Exception:  # pragma: no cover
-    gTTS = None
-
-try:
-    from langdetect import detect  # type: ignore
-    from langdetect.lang_detect_exception import LangDetectException  # type: ignore
-except Exception:  # pragma: no cover
-    detect = None
-    LangDetectException = Exception
-
 try:
     from googletrans import Translator  # type: ignore
 except Exception:  # pragma: no cover
@@ -90,11 +97,49 @@ ALLOW_ANALYZE_WITHOUT_LLM = os.getenv("ALLOW_ANALYZE_WITHOUT_LLM", "true").strip
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# Session storage for conversation state (in-memory, use Redis/DB for production)
-conversation_sessions = {}
+# Uploads lifecycle: quotas for voice notes and cleanup of leftover scratch files.
+UPLOADS_MAX_BYTES = int(os.getenv("UPLOADS_MAX_BYTES", str(2 * 1024 ** 3)))
+UPLOADS_MAX_AGE_S = float(os.getenv("UPLOADS_MAX_AGE_S", str(30 * 24 * 3600)))
+UPLOADS_TEMP_MAX_AGE_S = float(os.getenv("UPLOADS_TEMP_MAX_AGE_S", "3600"))
+UPLOADS_MIN_FREE_BYTES = int(os.getenv("UPLOADS_MIN_FREE_BYTES", str(512 * 1024 ** 2)))
+UPLOADS_JANITOR_INTERVAL_S = float(os.getenv("UPLOADS_JANITOR_INTERVAL_S", "600"))
+
+# Conversation state of form-filling sessions: dropped after SESSION_TTL_S without activity,
+# least recently used sessions are evicted once they take more than SESSION_MAX_BYTES.
+# The default SQLite file is shared by every worker on the node, so any worker can continue
+# any session; SESSION_STORE=redis://... shares them across pods, "memory" keeps them local.
+SESSION_STORE = os.getenv("SESSION_STORE", "sessions.sqlite3")
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(2 * 3600)))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 ** 2)))
+# A write that races another write to the same session is re-read and re-applied this many times.
+SESSION_WRITE_ATTEMPTS = int(os.getenv("SESSION_WRITE_ATTEMPTS", "3"))
+session_store = create_session_store(SESSION_STORE, ttl_s=SESSION_TTL_S, max_bytes=SESSION_MAX_BYTES)
+
+# Translation memory: in-process LRU in front of a SQLite file shared by all workers.
+TRANSLATION_MEMORY_PATH = os.getenv("TRANSLATION_MEMORY_PATH", "translation_memory.sqlite3").strip()
+TRANSLATION_MEMORY_LRU_SIZE = int(os.getenv("TRANSLATION_MEMORY_LRU_SIZE", "4096"))
+translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH or None, lru_size=TRANSLATION_MEMORY_LRU_SIZE)
 
 # ---------------- APP ----------------
-app = FastAPI(title="Sahaj Seva AI Backend", version="5.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background engines and janitor, and release them all on shutdown."""
+    await tts_engine.start()
+    janitor_task = asyncio.create_task(_uploads_janitor_loop()) if UPLOADS_JANITOR_INTERVAL_S > 0 else None
+    stt_decoder.start()
+    await stt_router.start()
+    try:
+        yield
+    finally:
+        if janitor_task is not None:
+            janitor_task.cancel()
+        await tts_engine.close()
+        session_store.close()
+        stt_decoder.close()
+        await stt_router.close()
+
+
+app = FastAPI(title="Sahaj Seva AI Backend", version="5.0.0", lifespan=lifespan)
 
 
 STATE_DISPLAY = {
@@ -502,10 +547,48 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Endpoints that get per-stage timing (Server-Timing header + one structured log line).
+TIMED_ENDPOINTS = {
+    "/api/analyze-form": "analyze_form",
+    "/api/start-filling": "start_filling",
+    "/api/submit-field": "submit_field",
+    "/api/submit-fields": "submit_fields",
+    "/api/speech-to-text": "speech_to_text",
+}
+
+
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    name = TIMED_ENDPOINTS.get(request.url.path)
+    if name is None:
+        return await call_next(request)
+
+    timer, token = timing.start_request(name)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["Server-Timing"] = timer.server_timing()
+        response.headers["Timing-Allow-Origin"] = "*"
+        return response
+    finally:
+        timing.finish_request(timer, token, status_code)
+
+class UploadsStaticFiles(StaticFiles):
+    """Files under tts/ are content-addressed and never change, so clients may cache them forever."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304) and path.replace("\\", "/").startswith("tts/"):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
 # Mount uploads directory
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.mount("/uploads", UploadsStaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 # ---------------- MODELS ----------------
 class UserProfile(BaseModel):
@@ -555,6 +638,22 @@ def health():
     return {"ok": True}
 
 
+@app.get("/api/stats")
+def stats():
+    return {
+        "stages": timing.stage_stats(),
+        "translation": translation_memory.stats(),
+        "uploads": uploads_janitor.stats(),
+        "tts_engine": tts_engine.describe(),
+        "voice_formats": voice_format_stats(),
+        "tts_queue": tts_queue_stats(),
+        "sessions": session_store.stats(),
+        "stt_decoder": stt_decoder.stats(),
+        "stt": stt_stats(),
+        "stt_engines": stt_router.describe(),
+    }
+
+
 # ---------------- HELPERS ----------------
 def extract_text_from_file(path: str, ext: str) -> str:
     text = ""
@@ -569,7 +668,7 @@ def extract_text_from_file(path: str, ext: str) -> str:
                     "how_to_fix": "Install optional dependencies: pip install -r Backend/requirements-optional.txt",
                 },
             )
-        with pdfplumber.open(path) as pdf:
+        with timing.span("pdf"), pdfplumber.open(path) as pdf:
             for page in pdf.pages:
                 text += page.extract_text() or ""
 
@@ -583,8 +682,9 @@ def extract_text_from_file(path: str, ext: str) -> str:
                     "how_to_fix": "Install optional dependencies: pip install -r Backend/requirements-optional.txt (and install Tesseract OCR on the machine)",
                 },
             )
-        image = Image.open(path)
-        text = pytesseract.image_to_string(image)
+        with timing.span("ocr"):
+            image = Image.open(path)
+            text = pytesseract.image_to_string(image)
 
     else:
         raise HTTPException(400, "Only PDF, PNG, JPG, JPEG files allowed")
@@ -596,11 +696,8 @@ def extract_text_from_file(path: str, ext: str) -> str:
 
 
 def _is_likely_hindi(text: str) -> bool:
-    t = (text or "").strip()
-    if not t:
-        return False
-    # Devanagari block (Hindi)
-    return any("\u0900" <= ch <= "\u097F" for ch in t)
+    # Any Devanagari (Hindi) character counts.
+    return lang_id.contains_script(text, "hi")
 
 
 def _localize_fallback_strings(language: str) -> dict:
@@ -631,154 +728,204 @@ def _localize_fallback_strings(language: str) -> dict:
     }
 
 
-def _basic_field_guess_from_text(extracted_text: str, *, language: str, max_fields: int = 25) -> List[FormField]:
-    fields: List[FormField] = []
-    seen = set()
-
-    def _normalize_label(label: str) -> str:
-        s = (label or "").strip()
-        s = re.sub(r"^[\s\-–—•*#\d.()]+", "", s)
-        s = re.sub(r"\s+", " ", s)
-        # Remove common instruction prefixes if OCR merges them into the label.
-        s = re.sub(r"^(please|kindly)\s+(provide|enter|fill|write)\s+", "", s, flags=re.IGNORECASE)
-        # Trim trailing punctuation/underscores
-        s = re.sub(r"[\s:;\-–_]+$", "", s).strip()
-        return s
-
-    def _is_non_user_field(label: str) -> bool:
-        t = (label or "").strip().lower()
-        if not t:
-            return True
-        # Ignore administrative/instructional sections.
-        blocked_phrases = [
-            "for office use",
-            "office use only",
-            "to be filled by",
-            "for official use",
-            "for departmental use",
-            "instructions",
-            "important instructions",
-            "note:",
-            "note ",
-            "declaration",
-            "undertaking",
-            "terms and conditions",
-            "terms & conditions",
-            "annexure",
-            "enclosure",
-            "enclosures",
-            "checklist",
-            "certificate",
-            "seal",
-            "signature of officer",
-            "office seal",
-            "do not write",
-            "do not fill",
+# Administrative/instructional phrases that never label a user-fill field.
+_NON_USER_FIELD_PHRASES = (
+    "for office use",
+    "office use only",
+    "to be filled by",
+    "for official use",
+    "for departmental use",
+    "instructions",
+    "important instructions",
+    "note:",
+    "note ",
+    "declaration",
+    "undertaking",
+    "terms and conditions",
+    "terms & conditions",
+    "annexure",
+    "enclosure",
+    "enclosures",
+    "checklist",
+    "certificate",
+    "seal",
+    "signature of officer",
+    "office seal",
+    "do not write",
+    "do not fill",
+)
+# One alternation scans the label once instead of one substring search per phrase.
+_NON_USER_FIELD_RE = re.compile(
+    "|".join(re.escape(p) for p in sorted(_NON_USER_FIELD_PHRASES, key=len, reverse=True))
+)
+_GENERIC_LABELS = frozenset({"page", "form", "application", "government"})
+
+_PHOTO_TYPE_RE = re.compile(
+    "|".join(
+        re.escape(k)
+        for k in [
+            "photo", "photograph", "image", "picture", "passport size", "signature", "thumb impression",
+            "फोटो", "हस्ताक्षर", "अंगूठा",
         ]
-        if any(p in t for p in blocked_phrases):
-            return True
-        # Too generic or not a label.
-        if t in {"page", "form", "application", "government"}:
-            return True
-        return False
-
-    def _infer_field_type(label: str) -> str:
-        t = (label or "").lower()
-        if any(k in t for k in ["photo", "photograph", "image", "picture", "passport size", "signature", "thumb impression", "फोटो", "हस्ताक्षर", "अंगूठा"]):
-            return "photo"
-        if any(k in t for k in ["mobile", "phone", "contact", "pincode", "pin code", "zip", "age", "मोबाइल", "फोन", "पिन", "आयु"]):
-            return "number"
-        if any(k in t for k in ["date", "dob", "birth", "जन्म", "तिथि"]):
-            return "date"
-        return "text"
-
-    # Look for common form field patterns
-    patterns = [
-        r"([A-Za-z][A-Za-z0-9 ,/\-]{3,80})\s*[:\-–_]+\s*",  # Name: _____ or Address Details:
-        r"\d+\.\s*([A-Za-z][A-Za-z0-9 ,/\-]{3,80})(?:\s*[:\-–_]|$)",  # 1. Name or 1. Full Address
-        r"([A-Za-z][A-Za-z0-9 ,/\-]{3,80})\s*\(",  # Name(
-    ]
-    
-    # Photo field keywords
-    photo_keywords = [
-        "photo",
-        "photograph",
-        "image",
-        "picture",
-        "pic",
-        "फोटो",
-        "छवि",
-        "चित्र",
-        "प्रकाशचित्र",
-    ]
+    )
+)
+# Weaker photo hints, only consulted when nothing else matched.
+_PHOTO_HINT_RE = re.compile("|".join(re.escape(k) for k in ["pic", "छवि", "चित्र", "प्रकाशचित्र"]))
+_NUMBER_TYPE_RE = re.compile(
+    "|".join(
+        re.escape(k)
+        for k in ["mobile", "phone", "contact", "pincode", "pin code", "zip", "age", "मोबाइल", "फोन", "पिन", "आयु"]
+    )
+)
+_DATE_TYPE_RE = re.compile("|".join(re.escape(k) for k in ["date", "dob", "birth", "जन्म", "तिथि"]))
+
+# Common form field patterns, combined so each line is scanned once:
+#   "Name: _____" / "Address Details:"  |  "1. Name" / "1. Full Address"  |  "Name("
+_FIELD_LABEL_RE = re.compile(
+    r"\d+\.\s*(?P<numbered>[A-Za-z][A-Za-z0-9 ,/\-]{3,80})(?:\s*[:\-–_]|$)"
+    r"|(?P<colon>[A-Za-z][A-Za-z0-9 ,/\-]{3,80})\s*[:\-–_]+\s*"
+    r"|(?P<paren>[A-Za-z][A-Za-z0-9 ,/\-]{3,80})\s*\(",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_LABEL_LEAD_RE = re.compile(r"^[\s\-–—•*#\d.()]+")
+_LABEL_INSTRUCTION_RE = re.compile(r"^(please|kindly)\s+(provide|enter|fill|write)\s+", re.IGNORECASE)
+_LABEL_TRAIL_RE = re.compile(r"[\s:;\-–_]+$")
+
+
+def _normalize_field_label(label: str) -> str:
+    s = (label or "").strip()
+    s = _LABEL_LEAD_RE.sub("", s)
+    s = _WHITESPACE_RE.sub(" ", s)
+    # Remove common instruction prefixes if OCR merges them into the label.
+    s = _LABEL_INSTRUCTION_RE.sub("", s)
+    # Trim trailing punctuation/underscores
+    return _LABEL_TRAIL_RE.sub("", s).strip()
+
+
+def _infer_field_type(label: str) -> str:
+    t = (label or "").lower()
+    if _PHOTO_TYPE_RE.search(t):
+        return "photo"
+    if _NUMBER_TYPE_RE.search(t):
+        return "number"
+    if _DATE_TYPE_RE.search(t):
+        return "date"
+    if _PHOTO_HINT_RE.search(t):
+        return "photo"
+    return "text"
+
 
+def _basic_field_guess_from_text(extracted_text: str, *, language: str, max_fields: int = 25) -> List[FormField]:
+    is_hi = (language or "").strip().lower() == "hi"
     strings = _localize_fallback_strings(language)
 
-    for raw_line in extracted_text.splitlines():
-        line = re.sub(r"\s+", " ", raw_line).strip()
-        if not line or len(line) < 3 or len(line) > 200:
+    # First pass: collect unique candidate labels in document order.
+    candidates: List[tuple] = []
+    seen = set()
+    for raw_line in (extracted_text or "").splitlines():
+        line = _WHITESPACE_RE.sub(" ", raw_line).strip()
+        if len(line) < 3 or len(line) > 200:
             continue
 
-        for pattern in patterns:
-            matches = re.findall(pattern, line, re.IGNORECASE)
-            for match in matches:
-                candidate_name = _normalize_label(match)
-                
-                # Skip if too short or clearly not a user-fill field
-                if len(candidate_name) < 3 or _is_non_user_field(candidate_name):
-                    continue
-                
-                # Skip if already seen
-                if candidate_name.lower() in seen:
-                    continue
-
-                seen.add(candidate_name.lower())
-                
-                # Detect field type
-                lower_name = candidate_name.lower()
-                field_type = _infer_field_type(candidate_name)
-                if field_type == "text" and any(keyword in lower_name for keyword in photo_keywords):
-                    field_type = "photo"
-
-                # Localize field name for Hindi mode; keep descriptions short to avoid repetitive questions
-                if (language or "").strip().lower() == "hi":
-                    display_name = candidate_name
-                    if not _is_likely_hindi(display_name):
-                        display_name = _translate_text(display_name, "hi")
-
-                    if field_type == "photo":
-                        description = f"{strings['provide_prefix']}{display_name}{strings['upload_suffix']}"
-                    else:
-                        description = ""
-                    field_name_out = display_name
-                else:
-                    description = "" if field_type != "photo" else f"{strings['provide_prefix']}{candidate_name}{strings['upload_suffix']}"
-                    field_name_out = candidate_name
-
-                fields.append(
-                    FormField(
-                        field_name=field_name_out,
-                        field_type=field_type,
-                        required=False,
-                        description=description,
-                        example="",
-                    )
-                )
+        for m in _FIELD_LABEL_RE.finditer(line):
+            candidate_name = _normalize_field_label(m.group("numbered") or m.group("colon") or m.group("paren"))
+
+            # Skip if too short or clearly not a user-fill field
+            if len(candidate_name) < 3 or _is_non_user_fill_field_name(candidate_name):
+                continue
+            key = candidate_name.lower()
+            if key in _GENERIC_LABELS or key in seen:
+                continue
+            seen.add(key)
+            candidates.append((candidate_name, _infer_field_type(candidate_name)))
+            if len(candidates) >= max_fields:
+                break
+        if len(candidates) >= max_fields:
+            break
+
+    if not candidates:
+        return [
+            FormField(
+                field_name="Information",
+                field_type="text",
+                required=False,
+                description="कृपया आवश्यक जानकारी प्रदान करें" if is_hi else "Please provide required information",
+                example="",
+            )
+        ]
 
-                if len(fields) >= max_fields:
-                    return fields
-
-    return fields if fields else [
-        FormField(
-            field_name="Information",
-            field_type="text",
-            required=False,
-            description=(
-                "कृपया आवश्यक जानकारी प्रदान करें" if (language or "").strip().lower() == "hi" else "Please provide required information"
-            ),
-            example=""
+    # Localize field names for Hindi mode with a single batched translation for the whole document.
+    display_names = [name for name, _ in candidates]
+    if is_hi:
+        pending = [i for i, name in enumerate(display_names) if not _is_likely_hindi(name)]
+        translated = _translate_batch([display_names[i] for i in pending], "hi")
+        for i, text in zip(pending, translated):
+            display_names[i] = text
+
+    # Keep descriptions short to avoid repetitive questions.
+    fields: List[FormField] = []
+    for display_name, (_, field_type) in zip(display_names, candidates):
+        description = ""
+        if field_type == "photo":
+            description = f"{strings['provide_prefix']}{display_name}{strings['upload_suffix']}"
+        fields.append(
+            FormField(
+                field_name=display_name,
+                field_type=field_type,
+                required=False,
+                description=description,
+                example="",
+            )
         )
-    ]
+    return fields
+
+
+# Questions used when extraction finds too few fields: (name_en, desc_en, name_hi, desc_hi, type).
+COMMON_DEFAULT_FIELDS = [
+    (
+        "Full Name",
+        "Please enter your full name as per ID.",
+        "पूरा नाम",
+        "कृपया पहचान पत्र के अनुसार अपना पूरा नाम लिखें।",
+        "text",
+    ),
+    (
+        "Mobile Number",
+        "Enter a valid 10-digit mobile number.",
+        "मोबाइल नंबर",
+        "कृपया 10 अंकों का वैध मोबाइल नंबर लिखें।",
+        "number",
+    ),
+    (
+        "Address",
+        "Enter your full current address.",
+        "पता",
+        "कृपया अपना पूरा वर्तमान पता लिखें।",
+        "text",
+    ),
+    (
+        "ID Proof (Aadhaar / Voter ID)",
+        "Enter your Aadhaar or Voter ID number (if available).",
+        "पहचान प्रमाण (आधार / वोटर आईडी)",
+        "यदि उपलब्ध हो तो अपना आधार या वोटर आईडी नंबर लिखें।",
+        "text",
+    ),
+]
+
+
+def _seed_translation_memory() -> None:
+    """Preload the glossary and the built-in Hindi strings so common labels never hit the network."""
+    translation_memory.seed_from_glossary()
+    en, hi = _localize_fallback_strings("en"), _localize_fallback_strings("hi")
+    pairs = [(en["purpose"], hi["purpose"]), (en["eligibility"], hi["eligibility"])]
+    pairs.extend(zip(en["warnings"], hi["warnings"]))
+    for name_en, desc_en, name_hi, desc_hi, _ in COMMON_DEFAULT_FIELDS:
+        pairs.extend([(name_en, name_hi), (desc_en, desc_hi)])
+    translation_memory.seed(pairs, "auto", "hi")
+
+
+_seed_translation_memory()
 
 
 def _fallback_form_analysis(extracted_text: str, original_filename: str, *, language: str) -> FormAnalysis:
@@ -804,44 +951,17 @@ def _fallback_form_analysis(extracted_text: str, original_filename: str, *, lang
             )
         )
 
-    common_defaults = [
-        (
-            "Full Name",
-            "Please enter your full name as per ID.",
-            "पूरा नाम",
-            "कृपया पहचान पत्र के अनुसार अपना पूरा नाम लिखें।",
-            "text",
-        ),
-        (
-            "Mobile Number",
-            "Enter a valid 10-digit mobile number.",
-            "मोबाइल नंबर",
-            "कृपया 10 अंकों का वैध मोबाइल नंबर लिखें।",
-            "number",
-        ),
-        (
-            "Address",
-            "Enter your full current address.",
-            "पता",
-            "कृपया अपना पूरा वर्तमान पता लिखें।",
-            "text",
-        ),
-        (
-            "ID Proof (Aadhaar / Voter ID)",
-            "Enter your Aadhaar or Voter ID number (if available).",
-            "पहचान प्रमाण (आधार / वोटर आईडी)",
-            "यदि उपलब्ध हो तो अपना आधार या वोटर आईडी नंबर लिखें।",
-            "text",
-        ),
-    ]
-
     if guessed_fields is None:
         guessed_fields = []
 
+    # Advance through the defaults independently of the field count so an already
+    # present default is skipped instead of being retried forever.
+    attempt = len(guessed_fields)
     while len(guessed_fields) < 4:
-        idx = len(guessed_fields)
-        if idx < len(common_defaults):
-            n_en, d_en, n_hi, d_hi, ftype = common_defaults[idx]
+        idx = attempt
+        attempt += 1
+        if idx < len(COMMON_DEFAULT_FIELDS):
+            n_en, d_en, n_hi, d_hi, ftype = COMMON_DEFAULT_FIELDS[idx]
             _add_field_if_missing(n_en, d_en, n_hi, d_hi, ftype)
         else:
             # Last resort filler
@@ -884,80 +1004,232 @@ def _is_non_user_fill_field_name(label: str) -> bool:
     t = (label or "").strip().lower()
     if not t:
         return True
-    blocked_phrases = [
-        "for office use",
-        "office use only",
-        "to be filled by",
-        "for official use",
-        "for departmental use",
-        "instructions",
-        "important instructions",
-        "note:",
-        "note ",
-        "declaration",
-        "undertaking",
-        "terms and conditions",
-        "terms & conditions",
-        "annexure",
-        "enclosure",
-        "enclosures",
-        "checklist",
-        "certificate",
-        "seal",
-        "signature of officer",
-        "office seal",
-        "do not write",
-        "do not fill",
-    ]
-    return any(p in t for p in blocked_phrases)
+    return _NON_USER_FIELD_RE.search(t) is not None
+
+
+def _number_repeated_field_names(fields: list) -> None:
+    """Rename repeated field names in place ("Name", "Name (2)").
+
+    Forms often ask for the same thing twice (applicant and nominee "Name"); answers are
+    keyed by field name, so every field needs its own.
+    """
+    taken = {str(f.get("field_name") or "").strip().lower() for f in fields if isinstance(f, dict)}
+    counts: dict = {}
+    for f in fields:
+        if not isinstance(f, dict):
+            continue
+        name = str(f.get("field_name") or "").strip()
+        if not name:
+            continue
+        n = counts[name.lower()] = counts.get(name.lower(), 0) + 1
+        if n == 1:
+            continue
+        while f"{name} ({n})".lower() in taken:
+            n += 1
+        f["field_name"] = f"{name} ({n})"
+        taken.add(f["field_name"].lower())
+
+
+# Provider clients are reused so repeated calls share one HTTP connection pool.
+_translator_clients: dict = {}
+
+
+def _get_translator_client(kind: str, target_lang: str = "", source_lang: str = "auto"):
+    key = (kind, Translator) if kind == "googletrans" else (kind, source_lang, target_lang)
+    inst = _translator_clients.get(key)
+    if inst is None:
+        if kind == "googletrans":
+            inst = Translator()
+        else:
+            from deep_translator import GoogleTranslator  # type: ignore
+
+            inst = GoogleTranslator(source=source_lang, target=target_lang)
+        _translator_clients[key] = inst
+    return inst
 
 
 def _translate_text(text: str, target_lang: str) -> str:
     """Translate text to target language."""
-    if not text or target_lang == "en":
+    if not text or target_lang == "en" or not text.strip():
         return text
 
+    cached = translation_memory.get(text, "auto", target_lang)
+    if cached is not None:
+        return cached
+
+    with timing.span("translate"):
+        translated = _translate_with_provider(text, target_lang)
+    if translated is None:
+        return text  # Return original if translation fails
+    translation_memory.put(text, "auto", target_lang, translated)
+    return translated
+
+
+def _translate_with_provider(text: str, target_lang: str, source_lang: str = "auto") -> Optional[str]:
     # Prefer googletrans if present
     if Translator is not None:
         try:
-            translator = Translator()
-            result = translator.translate(text, dest=target_lang)
+            result = _get_translator_client("googletrans").translate(text, src=source_lang, dest=target_lang)
             return result.text
         except Exception as e:
             print(f"Translation error (googletrans): {e}")
 
     # Fallback: deep-translator
     try:
-        from deep_translator import GoogleTranslator  # type: ignore
-
-        return GoogleTranslator(source="auto", target=target_lang).translate(text)
+        return _get_translator_client("deep-translator", target_lang, source_lang).translate(text)
     except Exception as e:
         print(f"Translation error (deep-translator): {e}")
-        return text  # Return original if translation fails
-
-
-def _maybe_translate(text: str, target_lang: str) -> str:
-    if target_lang == "hi" and _is_likely_hindi(text):
-        return text
-    return _translate_text(text, target_lang)
+        return None
+
+
+# Batch translation: segments are joined with a delimiter the provider leaves alone,
+# sent as one request per chunk, and chunks of very large batches run in parallel.
+TRANSLATE_BATCH_MAX_SEGMENTS = int(os.getenv("TRANSLATE_BATCH_MAX_SEGMENTS", "40"))
+TRANSLATE_BATCH_MAX_CHARS = int(os.getenv("TRANSLATE_BATCH_MAX_CHARS", "4500"))
+TRANSLATE_BATCH_CONCURRENCY = int(os.getenv("TRANSLATE_BATCH_CONCURRENCY", "4"))
+_BATCH_DELIMITER = "\n§§\n"
+_BATCH_SPLIT_RE = re.compile(r"\s*§\s*§\s*")
+_translate_pool = ThreadPoolExecutor(max_workers=max(1, TRANSLATE_BATCH_CONCURRENCY), thread_name_prefix="translate")
+
+
+def _chunk_segments(segments: List[str]) -> List[List[str]]:
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for seg in segments:
+        cost = len(seg) + len(_BATCH_DELIMITER)
+        if current and (len(current) >= TRANSLATE_BATCH_MAX_SEGMENTS or size + cost > TRANSLATE_BATCH_MAX_CHARS):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(seg)
+        size += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _past(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _translate_chunk(
+    segments: List[str], target_lang: str, source_lang: str = "auto", deadline: Optional[float] = None
+) -> List[Optional[str]]:
+    """One provider round trip for a chunk; falls back to per-segment calls if the delimiters don't survive.
+
+    Segments not started by the deadline (a time.monotonic() value) come back as None.
+    """
+    if _past(deadline):
+        return [None] * len(segments)
+    if len(segments) == 1:
+        with timing.span("translate"):
+            return [_translate_with_provider(segments[0], target_lang, source_lang)]
+
+    with timing.span("translate"):
+        joined = _translate_with_provider(_BATCH_DELIMITER.join(segments), target_lang, source_lang)
+    parts = [p.strip() for p in _BATCH_SPLIT_RE.split((joined or "").strip())]
+    if joined is not None and len(parts) == len(segments) and all(parts):
+        return parts
+
+    timing.note("translate_batch_fallback", len(segments))
+    out: List[Optional[str]] = []
+    for seg in segments:
+        if _past(deadline):
+            out.append(None)
+            continue
+        with timing.span("translate"):
+            out.append(_translate_with_provider(seg, target_lang, source_lang))
+    return out
+
+
+def _translate_batch(
+    texts: List[str],
+    target_lang: str,
+    *,
+    user_values: bool = False,
+    source_lang: str = "auto",
+    deadline: Optional[float] = None,
+) -> List[str]:
+    """Translate many strings at once: memory hits are free, misses go out in as few requests as possible.
+
+    App strings are authored in English, so an English target is a no-op for them. Pass
+    user_values=True for user answers: those may be in any language and, being personal
+    data, are never looked up in or written to the translation memory. No provider call
+    starts after deadline (a time.monotonic() value); texts it cuts off stay untranslated.
+    """
+    remember = not user_values
+    if not texts or (target_lang == "en" and not user_values):
+        return list(texts)
+
+    out = list(texts)
+    pending: dict = {}  # source text -> indexes that need it
+    for i, t in enumerate(texts):
+        if not t or not t.strip():
+            continue
+        cached = translation_memory.get(t, source_lang, target_lang) if remember else None
+        if cached is not None:
+            out[i] = cached
+        else:
+            pending.setdefault(t, []).append(i)
+    if not pending:
+        return out
+
+    segments = list(pending.keys())
+    chunks = _chunk_segments([s.replace("§", " ") for s in segments])
+    if len(chunks) == 1:
+        results = [_translate_chunk(chunks[0], target_lang, source_lang, deadline)]
+    else:
+        # Run each chunk in a copy of the caller's context so timing spans land on the request.
+        futures = [
+            _translate_pool.submit(
+                contextvars.copy_context().run, _translate_chunk, chunk, target_lang, source_lang, deadline
+            )
+            for chunk in chunks
+        ]
+        results = [f.result() for f in futures]
+
+    translated = [t for chunk_result in results for t in chunk_result]
+    learned = []
+    for source, result in zip(segments, translated):
+        if result is None:
+            continue  # Keep the original text if translation fails
+        learned.append((source, result))
+        for i in pending[source]:
+            out[i] = result
+    if remember:
+        translation_memory.put_many(learned, source_lang, target_lang)
+    return out
+
+
+def _maybe_translate_batch(texts: List[str], target_lang: str) -> List[str]:
+    """Like _translate_batch, but leaves text already in Hindi untouched for Hindi targets."""
+    if target_lang == "hi":
+        idx = [i for i, t in enumerate(texts) if not _is_likely_hindi(t)]
+        out = list(texts)
+        for i, t in zip(idx, _translate_batch([texts[i] for i in idx], target_lang)):
+            out[i] = t
+        return out
+    return _translate_batch(texts, target_lang)
 
 
 def _create_intro_text(form_name: str, purpose: str, fields: List[dict], lang: str) -> str:
     """Create a comprehensive introduction that explains form details and all fields."""
     
-    # Translate form name and purpose to selected language
-    translated_form_name = _maybe_translate(form_name, lang)
-    translated_purpose = _maybe_translate(purpose, lang)
-    
-    # Build field list description
-    field_names = [f['field_name'] for f in fields] if fields else []
+    shown_fields = fields[:10]  # Limit to 10 for voice clarity
+
+    # Translate form name, purpose and (for Hindi/Marathi) every listed field in one batch
+    texts = [form_name, purpose]
+    if lang in ("hi", "mr"):
+        for field in shown_fields:
+            texts.extend([field['field_name'], field.get('description', '')])
+    translated = _maybe_translate_batch(texts, lang)
+    translated_form_name, translated_purpose = translated[0], translated[1]
+    translated_fields = list(zip(translated[2::2], translated[3::2]))
     
     if lang == "hi":
         intro = f"यह दस्तावेज़ {translated_form_name} है। {translated_purpose}\n\n"
         intro += "इस फॉर्म में निम्नलिखित जानकारी की आवश्यकता है:\n"
-        for i, field in enumerate(fields[:10], 1):  # Limit to 10 for voice clarity
-            translated_field_name = _maybe_translate(field['field_name'], lang)
-            translated_description = _maybe_translate(field.get('description', ''), lang)
+        for i, (translated_field_name, translated_description) in enumerate(translated_fields, 1):
             intro += f"{i}. {translated_field_name} - {translated_description}\n"
         if len(fields) > 10:
             intro += f"और {len(fields) - 10} अधिक फील्ड्स।\n"
@@ -965,9 +1237,7 @@ def _create_intro_text(form_name: str, purpose: str, fields: List[dict], lang: s
     elif lang == "mr":
         intro = f"हा दस्तऐवज {translated_form_name} आहे। {translated_purpose}\n\n"
         intro += "या फॉर्ममध्ये खालील माहिती आवश्यक आहे:\n"
-        for i, field in enumerate(fields[:10], 1):
-            translated_field_name = _translate_text(field['field_name'], lang)
-            translated_description = _translate_text(field.get('description', ''), lang)
+        for i, (translated_field_name, translated_description) in enumerate(translated_fields, 1):
             intro += f"{i}. {translated_field_name} - {translated_description}\n"
         if len(fields) > 10:
             intro += f"आणि {len(fields) - 10} अधिक फील्ड।\n"
@@ -975,7 +1245,7 @@ def _create_intro_text(form_name: str, purpose: str, fields: List[dict], lang: s
     else:  # Default English
         intro = f"This document is {translated_form_name}. {translated_purpose}\n\n"
         intro += "This form requires the following information:\n"
-        for i, field in enumerate(fields[:10], 1):
+        for i, field in enumerate(shown_fields, 1):
             intro += f"{i}. {field['field_name']} - {field.get('description', '')}\n"
         if len(fields) > 10:
             intro += f"and {len(fields) - 10} more fields.\n"
@@ -984,40 +1254,577 @@ def _create_intro_text(form_name: str, purpose: str, fields: List[dict], lang: s
     return intro
 
 
-def _create_voice_note(explanation_text: str, target_lang: str = None) -> tuple[Optional[str], str]:
-    text = (explanation_text or "").strip() or "Form analysis is ready."
+# Voice notes are content-addressed: the file name is a hash of the normalized text, the
+# language and the engine settings, so identical requests reuse the same mp3. Files are
+# sharded as tts/ab/cd/<hash>.mp3 to keep directories small.
+TTS_CACHE_DIR = os.path.join(UPLOAD_DIR, "tts")
+# Synthesizer: "gtts" (Google, network) or "espeak" (espeak-ng, offline); see tts_engines.py.
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
+tts_engine = tts_engines.create_engine(TTS_ENGINE)
+TTS_COALESCE_WAIT_S = float(os.getenv("TTS_COALESCE_WAIT_S", "30"))
+os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+
+# Long texts are synthesized sentence by sentence in parallel; each sentence is cached as its
+# own voice note (so shared lines are reused across forms) and the mp3 frames are joined in order.
+TTS_CHUNK_MIN_CHARS = int(os.getenv("TTS_CHUNK_MIN_CHARS", "100"))
+TTS_CHUNK_CONCURRENCY = int(os.getenv("TTS_CHUNK_CONCURRENCY", "4"))
+_tts_chunk_pool = ThreadPoolExecutor(max_workers=max(1, TTS_CHUNK_CONCURRENCY), thread_name_prefix="tts-chunk")
+# Chunks shorter than this are merged into the next one rather than synthesized on their own.
+TTS_CHUNK_MERGE_CHARS = int(os.getenv("TTS_CHUNK_MERGE_CHARS", "24"))
+# Split after sentence punctuation (Latin and Devanagari danda) and at line breaks.
+_VOICE_SPLIT_RE = re.compile(r"(?<=[.!?।॥])\s+|\s*\n+\s*")
+# "1." / "2)" at the start of an intro list line: the period is not the end of a sentence.
+_LIST_MARKER_RE = re.compile(r"\s*\d+[.)]")
+
+_tts_inflight: dict = {}  # cache key -> threading.Event set when the leader finishes
+_tts_inflight_lock = threading.Lock()
+
+
+def _voice_note_key(text: str, lang: str) -> str:
+    normalized = _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return hashlib.sha256(f"{tts_engine.settings}\x00{lang}\x00{normalized}".encode("utf-8")).hexdigest()[:32]
+
+
+def _split_voice_text(text: str) -> List[str]:
+    if len(text) < TTS_CHUNK_MIN_CHARS:
+        return [text]
+    chunks: List[str] = []
+    carry = ""
+    for part in _VOICE_SPLIT_RE.split(text):
+        part = f"{carry} {part.strip()}".strip()
+        if not part:
+            continue
+        if _LIST_MARKER_RE.fullmatch(part) or len(part) < TTS_CHUNK_MERGE_CHARS:
+            carry = part  # a list marker or a fragment: keep it with what follows
+            continue
+        chunks.append(part)
+        carry = ""
+    if carry:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {carry}"
+        else:
+            chunks.append(carry)
+    return chunks
 
-    # Use target language if provided, otherwise auto-detect
-    if target_lang:
-        lang = target_lang
+
+def _iter_chunk_frames(chunks: List[str], lang: str):
+    """mp3 frames of each chunk in order; chunks are synthesized (or read from cache) in parallel."""
+    futures = [_tts_chunk_pool.submit(_synthesize_cached, chunk, lang) for chunk in chunks]
+    try:
+        for fut in futures:
+            url = fut.result()
+            if url is None:
+                raise RuntimeError("chunk synthesis failed")
+            with open(_upload_url_to_path(url), "rb") as f:
+                yield mp3_frames.audio_frames(f.read())
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+def _render_voice_note(text: str, lang: str, out_path: str) -> None:
+    chunks = _split_voice_text(text)
+    if len(chunks) <= 1:
+        data = tts_engine.synthesize(text, lang)
     else:
+        timing.note("tts_chunks", len(chunks))
+        data = b"".join(_iter_chunk_frames(chunks, lang))
+    with open(out_path, "wb") as f:
+        f.write(data)
+
+
+def _voice_note_url(path: str) -> str:
+    return "/uploads/" + os.path.relpath(path, UPLOAD_DIR).replace(os.sep, "/")
+
+
+def _synthesize_cached(text: str, lang: str) -> Optional[str]:
+    """URL of the voice note for (text, lang); synthesized once, concurrent misses wait for the first."""
+    filename = f"{_voice_note_key(text, lang)}.mp3"
+    path = shard_path(TTS_CACHE_DIR, filename)
+    url = _voice_note_url(path)
+    if os.path.exists(path):
+        timing.note("tts_cache", "hit")
+        uploads_janitor.touch(path)
+        return url
+
+    with _tts_inflight_lock:
+        done = _tts_inflight.get(filename)
+        leader = done is None
+        if leader:
+            done = _tts_inflight[filename] = threading.Event()
+    if not leader:
+        timing.note("tts_cache", "coalesced")
+        done.wait(TTS_COALESCE_WAIT_S)
+        return url if os.path.exists(path) else None
+
+    timing.note("tts_cache", "miss")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with timing.span("tts"):
+            _render_voice_note(text, lang, tmp_path)
+        # Publish atomically so a half-written file is never served.
+        os.replace(tmp_path, path)
+        return url
+    except Exception:
         try:
-            lang = detect(text)
-        except LangDetectException:
-            lang = "en"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except Exception:
+            pass
+        return None
+    finally:
+        with _tts_inflight_lock:
+            _tts_inflight.pop(filename, None)
+        done.set()
 
-    audio_filename = f"{uuid.uuid4()}.mp3"
-    audio_path = os.path.join(UPLOAD_DIR, audio_filename)
 
-    try:
-        gTTS(text=text, lang=lang).save(audio_path)
-    except Exception:
+def _create_voice_note(
+    explanation_text: str, target_lang: str = None, audio_format: str = "mp3"
+) -> tuple[Optional[str], str]:
+    text = (explanation_text or "").strip() or "Form analysis is ready."
+
+    # Use target language if provided, otherwise auto-detect
+    lang = target_lang or lang_id.identify(text, default="en", romanized=True)
+
+    if not tts_engine.supports(lang):
+        lang = "en"
+        timing.note("tts_fallback", "en")
+    voice_url = _synthesize_cached(text, lang)
+    if voice_url is None and lang != "en":
         # Fallback to English if the language is not supported
         lang = "en"
+        timing.note("tts_fallback", "en")
+        voice_url = _synthesize_cached(text, lang)
+    if voice_url is None:
+        timing.note("tts", "failed")
+    elif audio_format == "opus":
+        voice_url = _opus_variant_url(voice_url)
+    else:
+        _record_voice_format("mp3", 0, 0)
+    return voice_url, lang
+
+
+# Voice notes are synthesized on a dedicated, bounded pool so a slow TTS round trip never
+# blocks the event loop; queue depth and wait time show when the pool is saturated.
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "8"))
+_tts_pool = ThreadPoolExecutor(max_workers=max(1, TTS_WORKERS), thread_name_prefix="tts")
+_tts_queue_stats = {"submitted": 0, "queued": 0, "running": 0, "max_queued": 0}
+_tts_queue_lock = threading.Lock()
+
+
+async def _create_voice_note_async(
+    explanation_text: str, target_lang: str = None, audio_format: str = "mp3"
+) -> tuple[Optional[str], str]:
+    enqueued = time.perf_counter()
+    with _tts_queue_lock:
+        _tts_queue_stats["submitted"] += 1
+        _tts_queue_stats["queued"] += 1
+        _tts_queue_stats["max_queued"] = max(_tts_queue_stats["max_queued"], _tts_queue_stats["queued"])
+
+    def run() -> tuple[Optional[str], str]:
+        with _tts_queue_lock:
+            _tts_queue_stats["queued"] -= 1
+            _tts_queue_stats["running"] += 1
+        timing.observe("tts_queue", (time.perf_counter() - enqueued) * 1000.0)
         try:
-            gTTS(text=text, lang=lang).save(audio_path)
+            return _create_voice_note(explanation_text, target_lang, audio_format)
+        finally:
+            with _tts_queue_lock:
+                _tts_queue_stats["running"] -= 1
+
+    # Run in a copy of the request context so TTS spans land on the request's timer.
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_tts_pool, ctx.run, run)
+
+
+def tts_queue_stats() -> dict:
+    with _tts_queue_lock:
+        return dict(_tts_queue_stats, workers=TTS_WORKERS)
+
+
+# ---------------- VOICE NOTE FORMATS ----------------
+# gTTS mp3 is ~32 kbps; mono Opus at 12-16 kbps is plenty for speech and several times smaller,
+# which matters on 2G/3G links. The Opus copy sits next to the mp3 as <key>.ogg; the mp3 stays
+# the canonical file for clients that cannot play Opus.
+VOICE_OPUS_BITRATE = os.getenv("VOICE_OPUS_BITRATE", "16k")
+_voice_format_stats = {"mp3_responses": 0, "opus_responses": 0, "transcodes": 0, "transcode_failures": 0, "bytes_saved": 0}
+_voice_format_lock = threading.Lock()
+_OPUS_MEDIA_TYPES = ("audio/ogg", "audio/opus", "application/ogg")
+_MP3_MEDIA_TYPES = ("audio/mpeg", "audio/mp3")
+
+
+def _voice_format(flag: Optional[str], accept: Optional[str] = None) -> str:
+    """"opus" or "mp3": an explicit client flag wins, otherwise the Accept header decides."""
+    flag = (flag or "").strip().lower()
+    if flag in ("opus", "ogg"):
+        return "opus"
+    if flag == "mp3":
+        return "mp3"
+    best_opus = best_mp3 = 0.0
+    for part in (accept or "").split(","):
+        media, _, params = part.strip().partition(";")
+        media = media.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in _OPUS_MEDIA_TYPES:
+            best_opus = max(best_opus, q)
+        elif media in _MP3_MEDIA_TYPES:
+            best_mp3 = max(best_mp3, q)
+    return "opus" if best_opus > 0 and best_opus >= best_mp3 else "mp3"
+
+
+def _opus_variant_path(mp3_path: str) -> Optional[str]:
+    """Path of the Opus copy of a cached mp3, transcoding it on first use; None if that fails."""
+    ogg_path = os.path.splitext(mp3_path)[0] + ".ogg"
+    if os.path.exists(ogg_path):
+        uploads_janitor.touch(ogg_path)
+        return ogg_path
+
+    filename = os.path.basename(ogg_path)
+    with _tts_inflight_lock:
+        done = _tts_inflight.get(filename)
+        leader = done is None
+        if leader:
+            done = _tts_inflight[filename] = threading.Event()
+    if not leader:
+        done.wait(TTS_COALESCE_WAIT_S)
+        return ogg_path if os.path.exists(ogg_path) else None
+
+    tmp_path = f"{ogg_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(mp3_path, "rb") as f:
+            mp3 = f.read()
+        with timing.span("opus"):
+            ogg = asyncio.run(tts_engines.encode_opus(mp3, bitrate=VOICE_OPUS_BITRATE))
+        with open(tmp_path, "wb") as f:
+            f.write(ogg)
+        os.replace(tmp_path, ogg_path)
+        with _voice_format_lock:
+            _voice_format_stats["transcodes"] += 1
+        return ogg_path
+    except Exception as e:
+        print(f"Opus transcode failed for {mp3_path}: {e}")
+        with _voice_format_lock:
+            _voice_format_stats["transcode_failures"] += 1
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         except Exception:
-            return None, lang
+            pass
+        return None
+    finally:
+        with _tts_inflight_lock:
+            _tts_inflight.pop(filename, None)
+        done.set()
+
+
+def _record_voice_format(fmt: str, mp3_bytes: int, served_bytes: int) -> int:
+    saved = max(0, mp3_bytes - served_bytes)
+    with _voice_format_lock:
+        _voice_format_stats[f"{fmt}_responses"] += 1
+        _voice_format_stats["bytes_saved"] += saved
+    timing.note("voice_format", fmt)
+    timing.note("voice_bytes_saved", saved)
+    return saved
+
+
+def _opus_variant_url(mp3_url: str) -> str:
+    """URL of the Opus copy of a voice note, or the mp3 URL if transcoding is not possible."""
+    mp3_path = _upload_url_to_path(mp3_url)
+    ogg_path = _opus_variant_path(mp3_path) if mp3_path else None
+    if ogg_path is None:
+        return mp3_url
+    try:
+        _record_voice_format("opus", os.path.getsize(mp3_path), os.path.getsize(ogg_path))
+    except OSError:
+        pass
+    return _voice_note_url(ogg_path)
+
+
+def voice_format_stats() -> dict:
+    with _voice_format_lock:
+        return dict(_voice_format_stats, opus_bitrate=VOICE_OPUS_BITRATE)
+
+
+# ---------------- STREAMING TTS ----------------
+# Long voice notes take seconds to synthesize. In streaming mode the response carries a
+# /api/tts/stream/<key> URL right away and the mp3 is sent while the engine is still producing it;
+# the finished file lands in the same content-addressed cache as regular voice notes.
+TTS_STREAM_WORKERS = int(os.getenv("TTS_STREAM_WORKERS", "4"))
+_tts_stream_pool = ThreadPoolExecutor(max_workers=max(1, TTS_STREAM_WORKERS), thread_name_prefix="tts-stream")
+_tts_streams: dict = {}  # cache key -> VoiceStream while synthesis is running
+_TTS_KEY_RE = re.compile(r"[0-9a-f]{32}")
+
+
+class VoiceStream:
+    """mp3 bytes of one voice note as they are synthesized; readers follow along until done."""
+
+    def __init__(self, key: str, produce, path: str) -> None:
+        self.key = key
+        self.produce = produce  # () -> iterator of mp3 bytes
+        self.path = path
+        self.buffer = bytearray()
+        self.done = threading.Event()
+        self.failed = False
+        self._lock = threading.Lock()
+        self._waiters: list = []  # (loop, asyncio.Event) of readers waiting for more bytes
+
+    def _wake(self) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # reader's loop is gone
+
+    def run(self) -> None:
+        filename = os.path.basename(self.path)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with timing.span("tts"):
+                for chunk in self.produce():
+                    with self._lock:
+                        self.buffer += chunk
+                    self._wake()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(self.buffer)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.failed = True
+            print(f"Streaming TTS failed for {filename}: {e}")
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except Exception:
+                pass
+        finally:
+            with _tts_inflight_lock:
+                _tts_inflight.pop(filename, None)
+                _tts_streams.pop(self.key, None)
+            self.done.set()
+            self._wake()
+
+    async def iter_bytes(self):
+        loop = asyncio.get_running_loop()
+        offset = 0
+        while True:
+            event = asyncio.Event()
+            with self._lock:
+                chunk = bytes(self.buffer[offset:])
+                finished = self.done.is_set()
+                if not chunk and not finished:
+                    self._waiters.append((loop, event))
+            if chunk:
+                offset += len(chunk)
+                yield chunk
+            elif finished:
+                return
+            else:
+                await event.wait()
 
-    return f"/uploads/{audio_filename}", lang
+
+def _start_voice_stream(explanation_text: str, target_lang: str = None) -> tuple[Optional[str], Optional[str], str]:
+    """Start (or join) synthesis of a voice note without waiting for it.
+
+    Returns (stream_url, voice_url, lang): stream_url plays while synthesis runs, voice_url is
+    where the finished file will be cached.
+    """
+    text = (explanation_text or "").strip() or "Form analysis is ready."
+    lang = target_lang or lang_id.identify(text, default="en", romanized=True)
+
+    if not tts_engine.supports(lang):
+        lang = "en"
+        timing.note("tts_fallback", "en")
+    if not tts_engine.available():
+        timing.note("tts", "failed")
+        return None, None, lang
+
+    key = _voice_note_key(text, lang)
+    filename = f"{key}.mp3"
+    path = shard_path(TTS_CACHE_DIR, filename)
+    stream_url = f"/api/tts/stream/{key}"
+    if os.path.exists(path):
+        timing.note("tts_cache", "hit")
+        uploads_janitor.touch(path)
+        return stream_url, _voice_note_url(path), lang
+
+    with _tts_inflight_lock:
+        if filename in _tts_inflight:
+            timing.note("tts_cache", "coalesced")
+        else:
+            timing.note("tts_cache", "stream")
+            chunks = _split_voice_text(text)
+            if len(chunks) > 1:
+                stream = VoiceStream(key, lambda: _iter_chunk_frames(chunks, lang), path)
+            else:
+                stream = VoiceStream(key, lambda: tts_engine.stream(text, lang), path)
+            _tts_streams[key] = stream
+            _tts_inflight[filename] = stream.done
+            _tts_stream_pool.submit(stream.run)
+    return stream_url, _voice_note_url(path), lang
+
+
+def _parse_byte_range(header: str, size: int) -> Optional[tuple]:
+    """(start, end) inclusive for a single "bytes=" range, or None if unsatisfiable."""
+    m = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header or "")
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start = max(0, size - int(m.group(2)))
+        end = size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+def _audio_file_response(path: str, range_header: Optional[str], extra_headers: Optional[dict] = None) -> Response:
+    with open(path, "rb") as f:
+        data = f.read()
+    media_type = "audio/ogg" if path.endswith(".ogg") else "audio/mpeg"
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "public, max-age=31536000, immutable", "Vary": "Accept"}
+    headers.update(extra_headers or {})
+    if not range_header:
+        return Response(data, media_type=media_type, headers=headers)
+    byte_range = _parse_byte_range(range_header, len(data))
+    if byte_range is None:
+        headers["Content-Range"] = f"bytes */{len(data)}"
+        return Response(status_code=416, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(data[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+
+@app.post("/api/tts")
+async def text_to_speech(text: str = Form(...), language: Optional[str] = Form(default=None)):
+    """Start synthesis of `text` and return a URL that streams it while it is produced."""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail={"code": "missing_text", "message": "text is required."})
+    stream_url, voice_url, lang = _start_voice_stream(text, language)
+    if stream_url is None:
+        raise HTTPException(
+            status_code=503,
+            detail={"code": "tts_unavailable", "message": "Text-to-speech is not available right now."},
+        )
+    return {"stream_url": stream_url, "voice_url": voice_url, "language": lang}
+
+
+@app.get("/api/tts/stream/{key}")
+async def stream_voice_note(key: str, request: Request, format: Optional[str] = None):
+    """Voice note audio: mp3 streamed while synthesis runs, then served from cache with Range support.
+
+    Finished voice notes are served as Opus when `format=opus` or the Accept header prefers Ogg.
+    """
+    if not _TTS_KEY_RE.fullmatch(key):
+        raise HTTPException(status_code=404, detail="Voice note not found")
+    range_header = request.headers.get("range")
+    stream = _tts_streams.get(key)
+    if stream is not None and not range_header:
+        return StreamingResponse(
+            stream.iter_bytes(),
+            media_type="audio/mpeg",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    filename = f"{key}.mp3"
+    # Replays with a Range header (and joins of a non-streaming synthesis) wait for the file.
+    pending = stream.done if stream is not None else _tts_inflight.get(filename)
+    if pending is not None:
+        await asyncio.to_thread(pending.wait, TTS_COALESCE_WAIT_S)
+    path = shard_path(TTS_CACHE_DIR, filename)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Voice note not found")
+    uploads_janitor.touch(path)
+    if _voice_format(format, request.headers.get("accept")) == "opus":
+        ogg_path = await asyncio.to_thread(_opus_variant_path, path)
+        if ogg_path is not None:
+            saved = _record_voice_format("opus", os.path.getsize(path), os.path.getsize(ogg_path))
+            return await asyncio.to_thread(
+                _audio_file_response, ogg_path, range_header, {"X-Voice-Bytes-Saved": str(saved)}
+            )
+    _record_voice_format("mp3", 0, 0)
+    return await asyncio.to_thread(_audio_file_response, path, range_header)
+
+
+def _upload_url_to_path(url: Optional[str]) -> Optional[str]:
+    if not url or not url.startswith("/uploads/"):
+        return None
+    return os.path.join(UPLOAD_DIR, *url[len("/uploads/"):].split("/"))
+
+
+def _session_upload_paths() -> set:
+    """Files that stored sessions refer to (reads the session store; blocking)."""
+    paths = set()
+    for session in session_store.values():
+        paths.add(session.get("original_file_path"))
+        paths.add(_upload_url_to_path(session.get("voice_note_url")))
+    paths.discard(None)
+    return paths
+
+
+def _prefetch_upload_paths() -> set:
+    """Voice notes of prepared questions (reads prefetch futures; call on the event loop)."""
+    paths = set()
+    for prefetch in list(_question_prefetch.values()):
+        for fut in prefetch.items:
+            if fut.done() and not fut.cancelled() and fut.exception() is None and fut.result():
+                paths.add(_upload_url_to_path(fut.result().get("voice_url")))
+    paths.discard(None)
+    return paths
+
+
+def _referenced_upload_paths() -> set:
+    """Files that live sessions may still hand out; the janitor never deletes these."""
+    return _session_upload_paths() | _prefetch_upload_paths()
+
+
+def _sweep_uploads(prefetched: set) -> dict:
+    return uploads_janitor.sweep(_session_upload_paths() | prefetched)
+
+
+uploads_janitor = UploadsJanitor(
+    UPLOAD_DIR,
+    max_bytes=UPLOADS_MAX_BYTES,
+    max_age_s=UPLOADS_MAX_AGE_S,
+    temp_max_age_s=UPLOADS_TEMP_MAX_AGE_S,
+    min_free_bytes=UPLOADS_MIN_FREE_BYTES,
+    protected=_referenced_upload_paths,
+)
+
+
+async def _uploads_janitor_loop() -> None:
+    while True:
+        try:
+            # Prefetch futures belong to the event loop; the session store is read in the worker thread.
+            result = await asyncio.to_thread(_sweep_uploads, _prefetch_upload_paths())
+            if sum(result["deleted"].values()):
+                print(f"Uploads janitor: {result}")
+        except Exception as e:
+            print(f"Uploads janitor error: {e}")
+        await asyncio.sleep(UPLOADS_JANITOR_INTERVAL_S)
 
 
 # 🔹 FORM ANALYSIS + VOICE NOTE
 @app.post("/api/analyze-form")
 async def analyze_form(
+    request: Request,
     file: UploadFile = File(...),
-    language: str = Form(default="en")  # Language code: 'en', 'hi', 'mr', 'ta', etc.
+    language: str = Form(default="en"),  # Language code: 'en', 'hi', 'mr', 'ta', etc.
+    stream_audio: bool = Form(default=False),  # Return stream URLs instead of waiting for synthesis
+    audio_format: Optional[str] = Form(default=None),  # "opus" | "mp3"; defaults to the Accept header
 ):
+    path: Optional[str] = None
     try:
         # Determine file extension reliably (some uploads may not include an extension).
         filename_in = (file.filename or "").strip()
@@ -1048,8 +1855,9 @@ async def analyze_form(
         filename = f"{uuid.uuid4()}.{ext}"
         path = os.path.join(UPLOAD_DIR, filename)
 
-        with open(path, "wb") as f:
-            f.write(await file.read())
+        with timing.span("upload"):
+            with open(path, "wb") as f:
+                f.write(await file.read())
 
         try:
             extracted_text = extract_text_from_file(path, ext)
@@ -1058,18 +1866,32 @@ async def analyze_form(
             # instead of failing the whole request.
             if he.status_code == 400:
                 extracted_text = ""
+                timing.note("extract", "no_text")
             else:
                 raise
 
+        # The fallback analysis only depends on the upload, so compute it at most once
+        # and reuse it both as the full result and as the field supplement.
+        fallback_cache: dict = {}
+
+        def _fallback_json() -> dict:
+            if "analysis" not in fallback_cache:
+                with timing.span("fallback_extract"):
+                    fallback_cache["analysis"] = _fallback_form_analysis(
+                        extracted_text or "", file.filename, language=language
+                    ).model_dump()
+            return fallback_cache["analysis"]
+
         # We'll compute analysis first, then ALWAYS create a session_id before returning.
         fallback = False
         warning_msg: Optional[str] = None
 
         if not (extracted_text or "").strip():
             # Keep UX smooth: use fallback analysis rather than hard failing.
-            result_json = _fallback_form_analysis("", file.filename, language=language).model_dump()
+            result_json = _fallback_json()
             fallback = True
             warning_msg = "Could not extract readable text from the document; using fallback form analysis."
+            timing.note("fallback_reason", "no_text")
         else:
             result_json = None
 
@@ -1084,8 +1906,9 @@ async def analyze_form(
                         },
                     )
 
-                result_json = _fallback_form_analysis(extracted_text, file.filename, language=language).model_dump()
+                result_json = _fallback_json()
                 fallback = True
+                timing.note("fallback_reason", "llm_not_configured")
             else:
                 prompt = f"""
 You are analyzing an Indian government application form.
@@ -1116,14 +1939,15 @@ FORM TEXT:
 
                 try:
                     full_prompt = "You only return valid JSON. No markdown. No explanation.\n\n" + prompt
-                    response = client.models.generate_content(
-                        model=MODEL_NAME,
-                        contents=full_prompt,
-                        config=types.GenerateContentConfig(
-                            temperature=0.2,
-                        ),
-                    )
-                    result_text = response.text
+                    with timing.span("llm"):
+                        response = client.models.generate_content(
+                            model=MODEL_NAME,
+                            contents=full_prompt,
+                            config=types.GenerateContentConfig(
+                                temperature=0.2,
+                            ),
+                        )
+                        result_text = response.text
                 except Exception as e:
                     error_str = str(e).lower()
                     if not ALLOW_ANALYZE_WITHOUT_LLM:
@@ -1147,27 +1971,31 @@ FORM TEXT:
                             },
                         )
 
-                    result_json = _fallback_form_analysis(extracted_text, file.filename, language=language).model_dump()
+                    result_json = _fallback_json()
                     fallback = True
                     warning_msg = "AI analysis was unavailable; using fallback form analysis."
+                    timing.note("fallback_reason", "llm_error")
                 else:
                     # Clean up response text (remove markdown code blocks if present)
-                    result_text = result_text.strip()
-                    if result_text.startswith("```json"):
-                        result_text = result_text[7:]
-                    if result_text.startswith("```"):
-                        result_text = result_text[3:]
-                    if result_text.endswith("```"):
-                        result_text = result_text[:-3]
-                    result_text = result_text.strip()
-
                     try:
-                        result_json = json.loads(result_text)
+                        with timing.span("json_repair"):
+                            result_text = result_text.strip()
+                            if result_text.startswith("```json"):
+                                result_text = result_text[7:]
+                            if result_text.startswith("```"):
+                                result_text = result_text[3:]
+                            if result_text.endswith("```"):
+                                result_text = result_text[:-3]
+                            result_text = result_text.strip()
+                            result_json = json.loads(result_text)
+                            if not isinstance(result_json, dict):
+                                raise ValueError(f"expected a JSON object, got {type(result_json).__name__}")
                     except Exception as e:
                         if ALLOW_ANALYZE_WITHOUT_LLM:
-                            result_json = _fallback_form_analysis(extracted_text, file.filename, language=language).model_dump()
+                            result_json = _fallback_json()
                             fallback = True
                             warning_msg = "LLM returned invalid JSON; using fallback analysis instead."
+                            timing.note("fallback_reason", "invalid_llm_json")
                         else:
                             raise HTTPException(
                                 status_code=502,
@@ -1180,37 +2008,39 @@ FORM TEXT:
 
         # Normalize fields list to guarantee at least 4 questions.
         try:
-            if isinstance(result_json, dict):
-                fields_in = result_json.get("fields") or []
-                if not isinstance(fields_in, list):
-                    fields_in = []
-                # If LLM returned too few/empty fields, supplement with fallback analysis fields.
-                if len(fields_in) < 4:
-                    supplement = _fallback_form_analysis(extracted_text or "", file.filename, language=language).model_dump().get("fields", [])
-                    merged = []
-                    seen = set()
-                    for f in (fields_in + supplement):
-                        if not isinstance(f, dict):
-                            continue
-                        name = str(f.get("field_name", "") or "").strip()
-                        if not name:
-                            continue
-                        if _is_non_user_fill_field_name(name):
-                            continue
-                        key = name.lower()
-                        if key in seen:
-                            continue
-                        seen.add(key)
-                        merged.append(
-                            {
-                                "field_name": name,
-                                "field_type": f.get("field_type") or "text",
-                                "required": bool(f.get("required", False)),
-                                "description": f.get("description") or "",
-                                "example": f.get("example") or "",
-                            }
-                        )
-                    result_json["fields"] = merged[: max(4, len(merged))]
+            with timing.span("normalize"):
+                if isinstance(result_json, dict):
+                    fields_in = result_json.get("fields") or []
+                    if not isinstance(fields_in, list):
+                        fields_in = []
+                    _number_repeated_field_names(fields_in)
+                    # If LLM returned too few/empty fields, supplement with fallback analysis fields.
+                    if len(fields_in) < 4:
+                        supplement = _fallback_json().get("fields", [])
+                        merged = []
+                        seen = set()
+                        for f in (fields_in + supplement):
+                            if not isinstance(f, dict):
+                                continue
+                            name = str(f.get("field_name", "") or "").strip()
+                            if not name:
+                                continue
+                            if _is_non_user_fill_field_name(name):
+                                continue
+                            key = name.lower()
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                            merged.append(
+                                {
+                                    "field_name": name,
+                                    "field_type": f.get("field_type") or "text",
+                                    "required": bool(f.get("required", False)),
+                                    "description": f.get("description") or "",
+                                    "example": f.get("example") or "",
+                                }
+                            )
+                        result_json["fields"] = merged[: max(4, len(merged))]
         except Exception as e:
             print(f"Could not normalize fields: {e}")
 
@@ -1219,33 +2049,37 @@ FORM TEXT:
         purpose = (result_json or {}).get("purpose", "") if isinstance(result_json, dict) else ""
         fields = (result_json or {}).get("fields", []) if isinstance(result_json, dict) else []
 
-        intro_text = _create_intro_text(form_name, purpose, fields, language)
-        voice_note_url, lang = _create_voice_note(intro_text, language)
+        with timing.span("intro"):
+            intro_text = _create_intro_text(form_name, purpose, fields, language)
+        voice_stream_url = None
+        voice_format = _voice_format(audio_format, request.headers.get("accept"))
+        if stream_audio:
+            voice_stream_url, voice_note_url, lang = _start_voice_stream(intro_text, language)
+        else:
+            voice_note_url, lang = await _create_voice_note_async(intro_text, language, voice_format)
 
         # Create session for conversation (ALWAYS)
         session_id = str(uuid.uuid4())
-        form_lang_guess = "en"
-        try:
-            if (extracted_text or "").strip():
-                form_lang_guess = "hi" if any(ord(c) > 127 for c in (extracted_text or "")[:100]) else "en"
-        except Exception:
-            form_lang_guess = "en"
-
-        conversation_sessions[session_id] = {
-            "form_analysis": result_json,
+        # Dominant script of the form text; the session language settles hi vs mr.
+        form_lang_guess = lang_id.identify((extracted_text or "")[:4000], default="en", hint=language)
+
+        # The analysis is stored once per distinct form and shared by every session that uses it;
+        # form_id is minted per upload, so it stays with the session.
+        shared_analysis = {k: v for k, v in result_json.items() if k != "form_id"}
+        analysis_ref = await asyncio.to_thread(session_store.intern_analysis, shared_analysis)
+        await asyncio.to_thread(session_store.put, session_id, {
+            "analysis_ref": analysis_ref,
+            "form_id": result_json.get("form_id"),
             "language": language,
             "current_field_index": 0,
             "field_responses": {},
             "form_language": form_lang_guess,
             "original_file_path": path,
-        }
-
-        # Clean up uploaded file after processing (keep only voice notes)
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except Exception as e:
-            print(f"Could not delete file {path}: {e}")
+            "voice_note_url": voice_note_url,
+            "stream_audio": stream_audio,
+            "audio_format": voice_format,
+        })
+        _start_question_prefetch(session_id, fields, language, stream_audio, voice_format)
 
         payload = {
             "session_id": session_id,
@@ -1253,6 +2087,8 @@ FORM TEXT:
             "voice_note_url": voice_note_url,
             "language_detected": lang,
         }
+        if voice_stream_url:
+            payload["voice_stream_url"] = voice_stream_url
         if fallback:
             payload["fallback"] = True
         if warning_msg:
@@ -1263,6 +2099,7 @@ FORM TEXT:
         raise
     except Exception as e:
         print("🔥 ERROR:", e)
+        timing.note("error", type(e).__name__)
         raise HTTPException(
             status_code=500,
             detail={
@@ -1271,6 +2108,37 @@ FORM TEXT:
                 "provider_error": str(e),
             },
         )
+    finally:
+        # Clean up the uploaded file however the request ended (keep only voice notes)
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"Could not delete file {path}: {e}")
+
+
+async def _read_session(session_id: str) -> Optional[dict]:
+    """session_store.get() off the event loop; also brings the session's analysis into the cache.
+
+    The shared backends do file or network I/O, so request handlers read sessions through here.
+    """
+    def read() -> Optional[dict]:
+        session = session_store.get(session_id)
+        if session is not None and "form_analysis" not in session:
+            session_store.analysis(session.get("analysis_ref") or "")
+        return session
+
+    return await asyncio.to_thread(read)
+
+
+def _session_analysis(session: dict) -> Mapping:
+    """The form analysis a session refers to (shared and read-only)."""
+    analysis = session.get("form_analysis")  # sessions stored before analyses were interned
+    if analysis is None:
+        analysis = session_store.analysis(session.get("analysis_ref") or "")
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return analysis
 
 
 # 🔹 START FORM FILLING CONVERSATION
@@ -1299,11 +2167,11 @@ async def start_filling(request: Request, session_id: Optional[str] = Form(defau
             },
         )
 
-    if session_id not in conversation_sessions:
+    session = await _read_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = conversation_sessions[session_id]
-    fields = session["form_analysis"].get("fields", [])
+    fields = _session_analysis(session).get("fields", ())
     
     if not fields:
         return {
@@ -1312,29 +2180,11 @@ async def start_filling(request: Request, session_id: Optional[str] = Form(defau
         }
     
     # Ask first field
-    return await _get_next_field_question(session_id)
+    return await _get_next_field_question(session_id, session)
 
 
 # 🔹 GET NEXT FIELD QUESTION
-async def _get_next_field_question(session_id: str):
-    session = conversation_sessions[session_id]
-    fields = session["form_analysis"].get("fields", [])
-    current_index = session["current_field_index"]
-    language = session["language"]
-    
-    if current_index >= len(fields):
-        # All fields completed
-        return {
-            "completed": True,
-            "message": "All fields completed! Generating filled form..."
-        }
-    
-    field = fields[current_index]
-    
-    # Translate field name; keep the question short and aligned to the form label.
-    translated_field_name = _translate_text(field.get('field_name', ''), language)
-    translated_description = _translate_text(field.get('description', '') or '', language)
-
+def _field_question_text(field: dict, translated_field_name: str, translated_description: str, language: str) -> str:
     base_questions = {
         "en": f"Please enter {translated_field_name}.",
         "hi": f"कृपया {translated_field_name} लिखें।",
@@ -1371,19 +2221,217 @@ async def _get_next_field_question(session_id: str):
             "pa": f"ਉਦਾਹਰਣ: {field['example']}",
         }
         question_text += " " + example_texts.get(language, example_texts["en"])
-    
+
+    return question_text
+
+
+async def _build_field_question(
+    fields: List[dict],
+    index: int,
+    language: str,
+    translated: Optional[tuple] = None,
+    stream: bool = False,
+    audio_format: str = "mp3",
+    voice: bool = True,
+) -> dict:
+    field = fields[index]
+
+    # Translate field name; keep the question short and aligned to the form label.
+    if translated is None:
+        translated = await asyncio.to_thread(
+            _translate_batch, [field.get('field_name', ''), field.get('description', '') or ''], language
+        )
+    question_text = _field_question_text(field, translated[0], translated[1], language)
+
     # Generate voice note for this question
-    voice_url, _ = _create_voice_note(question_text, language)
-    
-    return {
+    voice_stream_url = voice_url = None
+    if not voice:
+        pass
+    elif stream:
+        voice_stream_url, voice_url, _ = _start_voice_stream(question_text, language)
+    else:
+        voice_url, _ = await _create_voice_note_async(question_text, language, audio_format)
+
+    payload = {
         "completed": False,
-        "field_index": current_index,
+        "field_index": index,
         "total_fields": len(fields),
         "field_name": field["field_name"],
         "question": question_text,
         "voice_url": voice_url,  # Voice note for this field question
         "field_type": field.get("field_type", "text"),
     }
+    if voice_stream_url:
+        payload["voice_stream_url"] = voice_stream_url
+    return payload
+
+
+# Background prefetch: as soon as a session exists, every question (text + voice note)
+# is prepared off the request path so start-filling/submit-field can answer immediately.
+PREFETCH_QUESTIONS = os.getenv("PREFETCH_QUESTIONS", "true").strip().lower() in ("1", "true", "yes", "y")
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+PREFETCH_ABANDON_AFTER_S = float(os.getenv("PREFETCH_ABANDON_AFTER_S", "900"))
+PREFETCH_RECHECK_S = float(os.getenv("PREFETCH_RECHECK_S", "60"))  # how soon an expired session's prefetch is dropped
+
+_question_prefetch: dict = {}  # session_id -> QuestionPrefetch
+_prefetch_slots: Optional[asyncio.Semaphore] = None
+
+
+class QuestionPrefetch:
+    """Prepares all question payloads of one session in order, in the background."""
+
+    def __init__(
+        self, session_id: str, fields: List[dict], language: str, stream: bool = False, audio_format: str = "mp3"
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        self.session_id = session_id
+        self.fields = list(fields)
+        self.language = language
+        self.stream = stream
+        self.audio_format = audio_format
+        # Each slot resolves to the prepared payload, or None if prefetch gave up on it.
+        self.items = [loop.create_future() for _ in self.fields]
+        self.last_access = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.skip_below = 0  # questions before this index were answered in bulk and are not needed
+
+    def skip_to(self, index: int) -> None:
+        self.skip_below = max(self.skip_below, index)
+
+    def abandoned(self) -> bool:
+        return (
+            self.session_id not in session_store
+            or time.monotonic() - self.last_access > PREFETCH_ABANDON_AFTER_S
+        )
+
+    async def _prepare(self, index: int, translated: List[str]) -> None:
+        async with _prefetch_slots:
+            item = await _build_field_question(
+                self.fields,
+                index,
+                self.language,
+                (translated[2 * index], translated[2 * index + 1]),
+                self.stream,
+                self.audio_format,
+            )
+        if not self.items[index].done():
+            self.items[index].set_result(item)
+
+    async def run(self) -> None:
+        """Prepare every question, then keep them until the session is done with them.
+
+        The entry is removed from _question_prefetch when this task ends, which it does
+        once the session expires or goes idle (or when the prefetch is cancelled).
+        """
+        global _prefetch_slots
+        if _prefetch_slots is None:
+            _prefetch_slots = asyncio.Semaphore(max(1, PREFETCH_CONCURRENCY))
+        try:
+            # One batched translation for every label and description of the form.
+            texts = []
+            for field in self.fields:
+                texts.extend([field.get('field_name', ''), field.get('description', '') or ''])
+            translated = await asyncio.to_thread(_translate_batch, texts, self.language)
+
+            # Questions are built a batch at a time; the session store is consulted once per batch.
+            batch = max(1, PREFETCH_CONCURRENCY)
+            for start in range(0, len(self.fields), batch):
+                if await asyncio.to_thread(self.abandoned):
+                    return
+                await asyncio.gather(*(
+                    self._prepare(i, translated)
+                    for i in range(max(start, self.skip_below), min(start + batch, len(self.fields)))
+                ))
+            self._release_pending()
+
+            while True:
+                idle_for = PREFETCH_ABANDON_AFTER_S - (time.monotonic() - self.last_access)
+                await asyncio.sleep(min(max(idle_for, 1.0), PREFETCH_RECHECK_S))
+                if await asyncio.to_thread(self.abandoned):
+                    return
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Question prefetch failed for session {self.session_id}: {e}")
+        finally:
+            self._release_pending()
+            if _question_prefetch.get(self.session_id) is self:
+                del _question_prefetch[self.session_id]
+
+    def _release_pending(self) -> None:
+        # Whoever waits on an unprepared slot builds that question itself.
+        for fut in self.items:
+            if not fut.done():
+                fut.set_result(None)
+
+    def ready(self, index: int) -> Optional[dict]:
+        """The prepared question if it is already done, without waiting."""
+        if index >= len(self.items) or not self.items[index].done():
+            return None
+        self.last_access = time.monotonic()
+        item = self.items[index].result()
+        if item is not None:
+            timing.note("question", "prefetched")
+        return dict(item) if item is not None else None
+
+    async def get(self, index: int) -> Optional[dict]:
+        self.last_access = time.monotonic()
+        if index >= len(self.items):
+            return None
+        if self.items[index].done():
+            timing.note("question", "prefetched")
+        else:
+            timing.note("question", "waited_on_prefetch")
+        item = await asyncio.shield(self.items[index])
+        return dict(item) if item is not None else None
+
+
+def _start_question_prefetch(
+    session_id: str, fields: List[dict], language: str, stream: bool = False, audio_format: str = "mp3"
+) -> None:
+    if not PREFETCH_QUESTIONS or not fields:
+        return
+    prefetch = QuestionPrefetch(session_id, fields, language, stream, audio_format)
+    # Run outside the request's context so background spans don't land on this request's timer.
+    prefetch.task = contextvars.Context().run(asyncio.get_running_loop().create_task, prefetch.run())
+    _question_prefetch[session_id] = prefetch
+
+
+def _cancel_question_prefetch(session_id: str) -> None:
+    prefetch = _question_prefetch.pop(session_id, None)
+    if prefetch is not None and prefetch.task is not None and not prefetch.task.done():
+        prefetch.task.cancel()
+
+
+async def _get_next_field_question(session_id: str, session: dict, voice: bool = True):
+    fields = _session_analysis(session).get("fields", ())
+    current_index = session["current_field_index"]
+    language = session["language"]
+    
+    if current_index >= len(fields):
+        # All fields completed
+        return {
+            "completed": True,
+            "message": "All fields completed! Generating filled form..."
+        }
+    
+    prefetch = _question_prefetch.get(session_id)
+    if prefetch is not None:
+        # Without voice, only take a question that is already prepared; waiting would be
+        # waiting for audio nobody asked for.
+        item = await prefetch.get(current_index) if voice else prefetch.ready(current_index)
+        if item is not None:
+            return item
+
+    timing.note("question", "computed")
+    return await _build_field_question(
+        fields,
+        current_index,
+        language,
+        stream=bool(session.get("stream_audio")),
+        audio_format=session.get("audio_format", "mp3"),
+        voice=voice,
+    )
 
 
 # 🔹 SUBMIT FIELD RESPONSE
@@ -1419,139 +2467,663 @@ async def submit_field(request: Request, session_id: Optional[str] = Form(defaul
             },
         )
 
-    if session_id not in conversation_sessions:
+    session = await _read_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = conversation_sessions[session_id]
-    fields = session["form_analysis"].get("fields", [])
-    current_index = session["current_field_index"]
-    
-    if current_index < len(fields):
-        field_name = fields[current_index]["field_name"]
-        session["field_responses"][field_name] = field_value
-        session["current_field_index"] += 1
+    session = await _save_answer(session_id, session, field_value)
     
     # Get next question or complete
-    return await _get_next_field_question(session_id)
+    return await _get_next_field_question(session_id, session)
+
+
+def _update_session(session_id: str, session: dict, apply) -> dict:
+    """apply(session) and store it; on a concurrent write, re-read the session and apply again.
+
+    Blocking (it reads and writes the session store): run it through asyncio.to_thread.
+    """
+    for attempt in range(max(1, SESSION_WRITE_ATTEMPTS)):
+        if attempt:
+            session = session_store.get(session_id)
+            if session is None:
+                raise HTTPException(status_code=404, detail="Session not found")
+        apply(session)
+        try:
+            session_store.put(session_id, session)
+            return session
+        except SessionConflict:
+            timing.note("session_conflict", attempt + 1)
+    raise HTTPException(
+        status_code=409,
+        detail={
+            "code": "session_conflict",
+            "message": "The session was changed by another request at the same time. Please try again.",
+        },
+    )
+
+
+def _first_unanswered(fields, responses: dict) -> int:
+    return next((i for i, field in enumerate(fields) if field["field_name"] not in responses), len(fields))
+
+
+def _skip_answered_prefetch(session_id: str, session: dict) -> None:
+    prefetch = _question_prefetch.get(session_id)
+    if prefetch is not None:
+        prefetch.skip_to(session["current_field_index"])
+
+
+async def _save_answer(session_id: str, session: dict, value: str) -> dict:
+    """Record the answer to the current field and move on to the first unanswered one.
+
+    Returns the stored session. Fields answered in bulk earlier are not asked again.
+    """
+    answering = session["current_field_index"]
+
+    def apply(current: dict) -> None:
+        if current["current_field_index"] != answering:
+            # Another request answered this question first; do not apply the value to the next one.
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "code": "session_conflict",
+                    "message": "This question was already answered by another request.",
+                    "field_index": current["current_field_index"],
+                },
+            )
+        fields = _session_analysis(current).get("fields", ())
+        if answering < len(fields):
+            current["field_responses"][fields[answering]["field_name"]] = value
+            current["current_field_index"] = _first_unanswered(fields, current["field_responses"])
+
+    session = await asyncio.to_thread(_update_session, session_id, session, apply)
+    _skip_answered_prefetch(session_id, session)
+    return session
+
+
+# 🔹 SUBMIT MANY FIELD RESPONSES AT ONCE
+def _field_key(name: str) -> str:
+    return " ".join(str(name).split()).casefold()
+
+
+def _resolve_bulk_values(fields, values) -> Tuple[dict, List[dict]]:
+    """Map submitted {field name or index: value} pairs to field indexes.
+
+    Returns ({index: value}, errors); nothing is applied when there are errors.
+    """
+    if isinstance(values, dict):
+        pairs = list(values.items())
+    elif isinstance(values, list):
+        pairs = []
+        for item in values:
+            if not isinstance(item, dict):
+                return {}, [{"key": item, "error": "expected an object with field_name or index and value"}]
+            pairs.append((item.get("index", item.get("field_name")), item.get("value")))
+    else:
+        return {}, [{"key": None, "error": "values must be an object or a list"}]
+
+    by_name = {}
+    for i, field in enumerate(fields):
+        by_name.setdefault(_field_key(field["field_name"]), i)
+
+    resolved, errors = {}, []
+    for key, value in pairs:
+        if isinstance(key, bool) or key is None:
+            index = None
+        elif isinstance(key, int) or (isinstance(key, str) and key.strip().isdigit()):
+            index = int(key)
+            index = index if 0 <= index < len(fields) else None
+        else:
+            index = by_name.get(_field_key(key))
+        if index is None:
+            errors.append({"key": key, "error": "unknown field"})
+        elif index in resolved:
+            errors.append({"key": key, "error": "field given more than once"})
+        elif isinstance(value, (dict, list)):
+            errors.append({"key": key, "error": "value must be text"})
+        else:
+            resolved[index] = "" if value is None else str(value)
+    return resolved, errors
+
+
+@app.post("/api/submit-fields")
+async def submit_fields(request: Request):
+    """Submit answers for many fields at once (e.g. typed or pasted from records).
+
+    Body (JSON): {"session_id": ..., "values": {"Full Name": "...", "3": "..."}, "voice": false}.
+    Keys are field names or field indexes; values may also be a list of
+    {"field_name" | "index": ..., "value": ...}. Form posts send values as a JSON string.
+    Returns the next unanswered question (with a voice note unless voice is false).
+    """
+    data: dict = {}
+    try:
+        ctype = (request.headers.get("content-type") or "").lower()
+        if "application/json" in ctype:
+            data = await request.json() or {}
+        else:
+            form = await request.form()
+            data = dict(form)
+            if isinstance(data.get("values"), str):
+                data["values"] = json.loads(data["values"])
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "invalid_body", "message": "Send a JSON body with session_id and values."},
+        )
+    if not isinstance(data, dict):
+        data = {}
+
+    session_id = str(data.get("session_id") or "").strip()
+    if not session_id:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "missing_session_id",
+                "message": "session_id is required.",
+            },
+        )
+    voice = str(data.get("voice", True)).strip().lower() not in ("0", "false", "no", "off")
+
+    session = await _read_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    fields = _session_analysis(session).get("fields", ())
+
+    resolved, errors = _resolve_bulk_values(fields, data.get("values"))
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "code": "invalid_fields",
+                "message": "Some values could not be matched to the form's fields; nothing was saved.",
+                "errors": errors,
+            },
+        )
+
+    session, answered = await _save_bulk_answers(session_id, session, fields, resolved)
+    payload = await _get_next_field_question(session_id, session, voice=voice)
+    payload["accepted"] = len(resolved)
+    payload["answered"] = answered
+    return payload
+
+
+async def _save_bulk_answers(session_id: str, session: dict, fields, resolved: dict) -> Tuple[dict, int]:
+    """Record validated {index: value} answers and move to the first unanswered field.
+
+    Returns the stored session and how many fields are answered now.
+    """
+    def apply(current: dict) -> None:
+        for index, value in resolved.items():
+            current["field_responses"][fields[index]["field_name"]] = value
+        current["current_field_index"] = _first_unanswered(fields, current["field_responses"])
+
+    session = await asyncio.to_thread(_update_session, session_id, session, apply)
+    answered = session["field_responses"]
+    timing.note("bulk_fields", len(resolved))
+    _skip_answered_prefetch(session_id, session)
+    return session, sum(1 for field in fields if field["field_name"] in answered)
 
 
 # 🔹 SPEECH TO TEXT (for voice input)
+# Pre-spawned ffmpeg processes decode uploads from memory to 16 kHz mono PCM.
+STT_DECODER_POOL = int(os.getenv("STT_DECODER_POOL", "2"))
+stt_decoder = PCMDecoder(pool_size=STT_DECODER_POOL)
+
+
+# Recognition engines: STT_ENGINE is the default, STT_ENGINES picks one per language
+# ("hi:vosk,en:google"). Vosk needs `pip install vosk` and model directories in VOSK_MODELS.
+STT_ENGINE = os.getenv("STT_ENGINE", "google").strip().lower()
+STT_ENGINES = os.getenv("STT_ENGINES", "")
+STT_WORKERS = int(os.getenv("STT_WORKERS", str(os.cpu_count() or 1)))
+STT_REQUEST_TIMEOUT_S = float(os.getenv("STT_REQUEST_TIMEOUT_S", "15"))
+stt_router = stt_engines.STTRouter(
+    STT_ENGINE,
+    stt_engines.parse_engine_map(STT_ENGINES),
+    options={"google": {"timeout_s": STT_REQUEST_TIMEOUT_S}, "vosk": {"workers": STT_WORKERS}},
+)
+
+
+# Languages recognized in parallel for a selected language, e.g. "hi=hi,en;mr=mr,hi,en".
+# Hinglish answers to a Hindi form often only come back from en-US, so hi also runs en.
+STT_PARALLEL_LANGUAGES = os.getenv("STT_PARALLEL_LANGUAGES", "hi=hi,en")
+# A transcript scoring at least this much is accepted without waiting for the other languages.
+STT_ACCEPT_SCORE = float(os.getenv("STT_ACCEPT_SCORE", "0.85"))
+# Engines omit the confidence for some results; assume this much.
+_STT_DEFAULT_CONFIDENCE = 0.7
+_STT_PRIMARY_BONUS = 0.05
+
+
+def _parse_stt_candidates(spec: str) -> dict:
+    out = {}
+    for part in (spec or "").split(";"):
+        lang, _, langs = part.partition("=")
+        lang = lang.strip().lower()
+        codes = [code.strip().lower() for code in langs.split(",") if code.strip()]
+        if lang and codes:
+            out[lang] = codes
+    return out
+
+
+_STT_CANDIDATES = _parse_stt_candidates(STT_PARALLEL_LANGUAGES)
+_stt_stats = {"requests": 0, "parallel": 0, "early_accepts": 0, "abandoned": 0, "latency_saved_ms": 0.0, "wins": {}}
+_stt_stats_lock = threading.Lock()
+
+
+def _stt_candidates(language: str) -> List[str]:
+    """Languages to recognize for the selected one, the selected language first."""
+    langs = _STT_CANDIDATES.get(language) or [language]
+    return [language] + [lang for lang in langs if lang != language]
+
+
+async def _recognize_candidate(pcm: bytes, lang: str) -> Tuple[str, Optional[float], float]:
+    """(transcript, confidence, ms) for one language; an empty transcript means no speech found."""
+    engine = stt_router.engine_for(lang)
+    started = time.perf_counter()
+    text, confidence = await engine.atranscribe(pcm, lang, sample_rate=stt_decoder.sample_rate)
+    return text, confidence, (time.perf_counter() - started) * 1000.0
+
+
+def _transcript_score(text: str, lang: str, confidence: Optional[float], primary: bool) -> float:
+    """Recognizer confidence blended with the share of the transcript written in lang's script."""
+    counts = lang_id.script_counts(text)
+    letters = sum(counts.values())
+    script = lang_id.LANGUAGE_SCRIPT.get(lang)
+    script_match = counts.get(script, 0) / letters if letters and script else 0.0
+    if confidence is None:
+        confidence = _STT_DEFAULT_CONFIDENCE
+    return 0.6 * confidence + 0.4 * script_match + (_STT_PRIMARY_BONUS if primary else 0.0)
+
+
+def _best_transcript(results: dict, candidates: List[str]) -> Optional[Tuple[str, str, float]]:
+    best = None
+    for lang in candidates:
+        result = results.get(lang)
+        if not isinstance(result, tuple) or not result[0]:
+            continue
+        score = _transcript_score(result[0], lang, result[1], lang == candidates[0])
+        if best is None or score > best[2]:
+            best = (lang, result[0], score)
+    return best
+
+
+def _record_stt(candidates: List[str], results: dict, winner: Optional[str], wall_ms: float, abandoned: int) -> None:
+    # The old code tried the candidates one after another until one produced text. Its latency
+    # is estimated from the finished requests; a failed one counts as 0 and an abandoned one as
+    # the parallel wall time, so the saving is a lower bound.
+    sequential_ms = 0.0
+    for lang in candidates:
+        result = results.get(lang)
+        if isinstance(result, tuple):
+            sequential_ms += result[2]
+            if result[0]:
+                break
+        elif result is None:
+            sequential_ms += wall_ms
+            break
+    with _stt_stats_lock:
+        _stt_stats["requests"] += 1
+        if len(candidates) > 1:
+            _stt_stats["parallel"] += 1
+            _stt_stats["abandoned"] += abandoned
+            _stt_stats["early_accepts"] += 1 if abandoned else 0
+            _stt_stats["latency_saved_ms"] += max(0.0, sequential_ms - wall_ms)
+        if winner:
+            _stt_stats["wins"][winner] = _stt_stats["wins"].get(winner, 0) + 1
+    for lang, result in results.items():
+        if isinstance(result, tuple):
+            timing.observe(f"stt_{lang}", result[2])
+
+
+def stt_stats() -> dict:
+    with _stt_stats_lock:
+        stats = dict(_stt_stats, wins=dict(_stt_stats["wins"]))
+    requests_ = stats["requests"]
+    stats["win_rates"] = {lang: round(n / requests_, 3) for lang, n in stats["wins"].items()} if requests_ else {}
+    stats["latency_saved_ms"] = round(stats["latency_saved_ms"], 1)
+    stats["avg_latency_saved_ms"] = round(stats["latency_saved_ms"] / stats["parallel"], 1) if stats["parallel"] else 0.0
+    stats["candidates"] = _STT_CANDIDATES
+    stats["accept_score"] = STT_ACCEPT_SCORE
+    with _stt_stats_lock:
+        vad_stats = dict(_stt_vad_stats)
+    vad_stats["sent_ratio"] = round(vad_stats["sent_ms"] / vad_stats["input_ms"], 3) if vad_stats["input_ms"] else None
+    stats["vad"] = vad_stats
+    return stats
+
+
+# Leading/trailing silence is cut before recognition and clips without speech never reach an
+# engine. STT_VAD_PAD_MS of audio is kept around the speech.
+STT_VAD_TRIM = os.getenv("STT_VAD_TRIM", "true").strip().lower() in ("1", "true", "yes", "on")
+STT_VAD_PAD_MS = int(os.getenv("STT_VAD_PAD_MS", "200"))
+STT_MIN_SPEECH_MS = int(os.getenv("STT_MIN_SPEECH_MS", "150"))
+_stt_vad_stats = {"clips": 0, "no_speech": 0, "input_ms": 0, "sent_ms": 0}
+
+
+async def _trim_for_recognition(pcm: bytes) -> bytes:
+    """pcm without leading/trailing silence; raises NoSpeechError if it contains no speech."""
+    if not STT_VAD_TRIM:
+        return pcm
+    with timing.span("stt_vad"):
+        trimmed = await asyncio.to_thread(trim_silence, pcm, pad_ms=STT_VAD_PAD_MS, min_speech_ms=STT_MIN_SPEECH_MS)
+    sent_ms = len(trimmed.pcm) * 1000 // (stt_decoder.sample_rate * 2)
+    with _stt_stats_lock:
+        _stt_vad_stats["clips"] += 1
+        _stt_vad_stats["input_ms"] += trimmed.input_ms
+        _stt_vad_stats["sent_ms"] += sent_ms
+        if not trimmed.pcm:
+            _stt_vad_stats["no_speech"] += 1
+    timing.note("stt_trimmed_ms", trimmed.input_ms - sent_ms)
+    if not trimmed.pcm:
+        timing.note("stt_vad", "no_speech")
+        raise NoSpeechError()
+    return trimmed.pcm
+
+
+async def _recognize_pcm(pcm: bytes, language: str) -> Tuple[str, str]:
+    """(transcript, language) for 16 kHz mono PCM; raises NoSpeechError / STTEngineError.
+
+    All candidate languages are recognized concurrently on the same audio and the best-scoring
+    transcript wins. Once a result scores STT_ACCEPT_SCORE the other requests are abandoned:
+    their tasks are cancelled and whatever the worker threads still return is ignored.
+    """
+    candidates = _stt_candidates(language)
+    results: dict = {}
+    best = None
+    started = time.perf_counter()
+    with timing.span("stt"):
+        tasks = {asyncio.ensure_future(_recognize_candidate(pcm, lang)): lang for lang in candidates}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        results[tasks[task]] = task.result()
+                    except Exception as e:
+                        results[tasks[task]] = e
+                best = _best_transcript(results, candidates)
+                if best is not None and best[2] >= STT_ACCEPT_SCORE:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+    _record_stt(candidates, results, best[0] if best else None, (time.perf_counter() - started) * 1000.0, len(pending))
+
+    if best is not None:
+        return best[1], best[0]
+    errors = [r for r in results.values() if isinstance(r, Exception)]
+    if errors and len(errors) == len(results):
+        raise errors[0] if isinstance(errors[0], STTEngineError) else STTEngineError(str(errors[0]))
+    raise NoSpeechError()
+
+
 @app.post("/api/speech-to-text")
 async def speech_to_text(
     audio: UploadFile = File(...),
     language: str = Form(default="en")
 ):
     """Convert speech audio to text - supports Hindi and English recognition"""
+    if not stt_router.available():
+        raise HTTPException(status_code=501, detail="Speech recognition is not installed on the server")
     try:
-        # Save audio temporarily
         in_name = (audio.filename or "recording").strip()
-        in_ext = ""
-        if "." in in_name:
-            in_ext = in_name.rsplit(".", 1)[-1].lower().strip()
-
         ctype = (audio.content_type or "").lower().strip()
-        if not in_ext:
-            if "webm" in ctype:
-                in_ext = "webm"
-            elif "ogg" in ctype:
-                in_ext = "ogg"
-            elif "mpeg" in ctype or "mp3" in ctype:
-                in_ext = "mp3"
-            elif "wav" in ctype:
-                in_ext = "wav"
-
-        if not in_ext:
-            in_ext = "webm"  # common default from browsers
-
-        audio_in_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.{in_ext}")
-        with open(audio_in_path, "wb") as f:
-            f.write(await audio.read())
-
-        # Convert to WAV if needed (SpeechRecognition expects WAV/AIFF/FLAC).
-        audio_for_sr_path = audio_in_path
-        if in_ext not in {"wav", "aiff", "aif", "flac"}:
-            try:
-                from pydub import AudioSegment  # type: ignore
-                try:
-                    from imageio_ffmpeg import get_ffmpeg_exe  # type: ignore
-                    AudioSegment.converter = get_ffmpeg_exe()
-                except Exception:
-                    # If imageio-ffmpeg isn't installed, rely on system ffmpeg if present.
-                    pass
-
-                wav_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.wav")
-                seg = AudioSegment.from_file(audio_in_path)
-                seg = seg.set_channels(1).set_frame_rate(16000)
-                seg.export(wav_path, format="wav")
-                audio_for_sr_path = wav_path
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "unsupported_audio_format",
-                        "message": "Unsupported audio format. Please try again (Chrome/Edge recommended).",
-                        "content_type": ctype,
-                        "filename": in_name,
-                        "provider_error": str(e),
-                    },
-                )
-
-        # Use Google Speech Recognition
-        import speech_recognition as sr
-        recognizer = sr.Recognizer()
+        with timing.span("upload"):
+            raw = await audio.read()
 
-        with sr.AudioFile(audio_for_sr_path) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio_data = recognizer.record(source)
-        
-        # Map language codes to speech recognition
-        lang_map = {
-            "en": "en-US",
-            "hi": "hi-IN",
-            "mr": "mr-IN",
-            "ta": "ta-IN",
-            "te": "te-IN",
-            "bn": "bn-IN",
-            "gu": "gu-IN",
-            "kn": "kn-IN",
-            "ml": "ml-IN",
-            "pa": "pa-IN",
-        }
-        
-        recognition_lang = lang_map.get(language, "en-US")
-        
-        # Try to recognize in selected language
+        # Decode straight to 16 kHz mono PCM in memory; nothing is written to uploads/.
         try:
-            text = recognizer.recognize_google(audio_data, language=recognition_lang)
-        except (sr.UnknownValueError, sr.RequestError):
-            # If Hindi is selected and fails, try English as fallback
-            if language == "hi":
-                try:
-                    text = recognizer.recognize_google(audio_data, language="en-US")
-                except:
-                    raise sr.UnknownValueError()
-            else:
-                raise
-        
-        # Clean up audio files
-        for p in {audio_in_path, audio_for_sr_path}:
-            try:
-                if p and os.path.exists(p):
-                    os.remove(p)
-            except Exception:
-                pass
-        
-        return {"text": text, "success": True, "detected_language": language}
+            with timing.span("stt_decode"):
+                pcm = await asyncio.to_thread(stt_decoder.decode, raw)
+        except AudioDecodeError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "unsupported_audio_format",
+                    "message": "Unsupported audio format. Please try again (Chrome/Edge recommended).",
+                    "content_type": ctype,
+                    "filename": in_name,
+                    "provider_error": str(e),
+                },
+            )
+        del raw
+        pcm = await _trim_for_recognition(pcm)
+        text, detected = await _recognize_pcm(pcm, language)
+
+        return {"text": text, "success": True, "detected_language": detected}
         
-    except sr.UnknownValueError:
+    except HTTPException:
+        raise
+    except NoSpeechError:
         raise HTTPException(status_code=400, detail="Could not understand audio")
-    except sr.RequestError as e:
+    except STTEngineError as e:
         raise HTTPException(status_code=503, detail=f"Speech recognition service error: {str(e)}")
     except Exception as e:
         print(f"Speech to text error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# 🔹 STREAMING SPEECH TO TEXT (WebSocket)
+# Audio arrives while the user speaks; VAD cuts it into utterances, each utterance is
+# recognized as soon as it ends ("final"), and long utterances also get interim "partial"
+# transcripts. See README for the message protocol.
+STT_PARTIAL_INTERVAL_S = float(os.getenv("STT_PARTIAL_INTERVAL_S", "1.2"))
+STT_PARTIAL_MIN_MS = int(os.getenv("STT_PARTIAL_MIN_MS", "900"))
+STT_END_SILENCE_MS = int(os.getenv("STT_END_SILENCE_MS", "600"))
+STT_STREAM_CONCURRENCY = int(os.getenv("STT_STREAM_CONCURRENCY", "2"))
+
+
+class SpeechStream:
+    """State of one streaming recognition socket."""
+
+    def __init__(self, websocket: WebSocket, language: str) -> None:
+        self.websocket = websocket
+        self.language = language
+        self.segmenter = Segmenter(VoiceActivityDetector(), end_silence_ms=STT_END_SILENCE_MS)
+        self.tasks: set = set()
+        self.finished: set = set()  # segment indexes whose final transcript is being produced
+        self.partial_inflight = False
+        self.last_partial = 0.0
+        self._send_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max(1, STT_STREAM_CONCURRENCY))
+
+    async def send(self, message: dict) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(message)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _recognize(self, pcm: bytes) -> Optional[Tuple[str, str]]:
+        async with self._slots:
+            try:
+                return await _recognize_pcm(pcm, self.language)
+            except NoSpeechError:
+                return "", self.language
+            except STTEngineError as e:
+                await self.send({"type": "error", "code": "stt_unavailable", "message": str(e)})
+                return None
+
+    async def _final(self, index: int, pcm: bytes) -> None:
+        duration_ms = len(pcm) // 32
+        try:
+            pcm = await _trim_for_recognition(pcm)
+        except NoSpeechError:
+            await self.send({"type": "final", "segment": index, "text": "", "language": self.language, "duration_ms": duration_ms})
+            return
+        result = await self._recognize(pcm)
+        if result is not None:
+            text, language = result
+            await self.send({"type": "final", "segment": index, "text": text, "language": language, "duration_ms": duration_ms})
+
+    async def _partial(self, index: int, pcm: bytes) -> None:
+        try:
+            result = await self._recognize(pcm)
+            if result and result[0] and index not in self.finished:
+                await self.send({"type": "partial", "segment": index, "text": result[0], "language": result[1]})
+        finally:
+            self.partial_inflight = False
+
+    async def process(self, pcm: bytes) -> None:
+        for event in self.segmenter.feed(pcm):
+            await self._handle(event)
+        if (
+            self.segmenter.in_speech
+            and not self.partial_inflight
+            and self.segmenter.current_ms() >= STT_PARTIAL_MIN_MS
+            and time.monotonic() - self.last_partial >= STT_PARTIAL_INTERVAL_S
+        ):
+            self.partial_inflight = True
+            self.last_partial = time.monotonic()
+            self._spawn(self._partial(self.segmenter.index, self.segmenter.current()))
+
+    async def _handle(self, event: tuple) -> None:
+        if event[0] == "start":
+            self.last_partial = time.monotonic()
+            await self.send({"type": "speech_start", "segment": event[1]})
+        else:
+            _, index, pcm = event
+            self.finished.add(index)
+            self._spawn(self._final(index, pcm))
+
+    async def finish(self) -> None:
+        for event in self.segmenter.flush():
+            await self._handle(event)
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+
+
+async def _pump_decoder(decoder: StreamDecoder, stream: SpeechStream) -> None:
+    while True:
+        pcm = await decoder.read()
+        if not pcm:
+            return
+        await stream.process(pcm)
+
+
+@app.websocket("/ws/speech-to-text")
+async def speech_to_text_stream(websocket: WebSocket):
+    await websocket.accept()
+    if not stt_router.available():
+        await websocket.send_json({"type": "error", "code": "stt_unavailable", "message": "Speech recognition is not installed"})
+        await websocket.close()
+        return
+
+    # First message configures the stream: {"type": "start", "language": "hi", "format": "webm" | "pcm16"}.
+    config: dict = {}
+    first = await websocket.receive()
+    if first.get("type") == "websocket.disconnect":
+        return  # client left before configuring the stream; there is nothing to start or clean up
+    if first.get("text"):
+        try:
+            config = json.loads(first["text"]) or {}
+        except ValueError:
+            config = {}
+    language = str(config.get("language") or "en")
+    audio_format = str(config.get("format") or "webm").lower()
+    stream = SpeechStream(websocket, language)
+
+    decoder: Optional[StreamDecoder] = None
+    pump: Optional[asyncio.Task] = None
+    try:
+        if audio_format != "pcm16":
+            decoder = StreamDecoder(sample_rate=stt_decoder.sample_rate)
+            await decoder.start()
+            pump = asyncio.create_task(_pump_decoder(decoder, stream))
+        await stream.send({"type": "ready", "language": language, "format": audio_format})
+
+        pending = [first] if first.get("bytes") else []
+        while True:
+            message = pending.pop() if pending else await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                if decoder is not None:
+                    await decoder.feed(message["bytes"])
+                else:
+                    await stream.process(message["bytes"])
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"]) or {}
+                except ValueError:
+                    command = {}
+                if command.get("type") == "stop":
+                    break
+
+        if decoder is not None:
+            decoder.end_input()
+            await pump
+        await stream.finish()
+        await stream.send({"type": "done", "segments": stream.segmenter.index + 1})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except (AudioDecodeError, BrokenPipeError, ConnectionResetError) as e:
+        try:
+            await stream.send({"type": "error", "code": "unsupported_audio_format", "message": str(e)})
+            await websocket.close()
+        except Exception:
+            pass
+    finally:
+        for task in list(stream.tasks):
+            task.cancel()
+        if pump is not None and not pump.done():
+            pump.cancel()
+        if decoder is not None:
+            await decoder.close()
+
+
+# Answer normalization for the filled form runs under an overall deadline.
+FILLED_FORM_DEADLINE_S = float(os.getenv("FILLED_FORM_DEADLINE_S", "8"))
+
+
+async def _normalize_answers_to_form_language(values: List[str], form_language: str) -> List[str]:
+    """Translate answers that aren't in the form's language; originals are kept on error or timeout."""
+    # Script identification is local and cheap, so only real mismatches reach the translator,
+    # grouped by the language they were identified as so the provider never has to guess.
+    by_source: dict = {}  # source language -> indexes of values
+    for i, value in enumerate(values):
+        if not value or value == "Not provided" or lang_id.written_in(value, form_language):
+            continue
+        source = lang_id.identify(value, default=form_language, romanized=True)
+        if source != form_language:
+            by_source.setdefault(source, []).append(i)
+    timing.note("answers_translated", sum(len(idx) for idx in by_source.values()))
+    if not by_source:
+        return list(values)
+
+    # The deadline also stops the workers: no provider call starts after it.
+    deadline = time.monotonic() + FILLED_FORM_DEADLINE_S
+    groups = list(by_source.items())
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(
+                asyncio.to_thread(
+                    _translate_batch,
+                    [values[i] for i in idx],
+                    form_language,
+                    user_values=True,
+                    source_lang=source,
+                    deadline=deadline,
+                )
+                for source, idx in groups
+            )),
+            timeout=FILLED_FORM_DEADLINE_S,
+        )
+    except asyncio.TimeoutError:
+        print(f"Answer translation exceeded {FILLED_FORM_DEADLINE_S}s; keeping original values")
+        timing.note("answers_translation", "timeout")
+        return list(values)
+
+    out = list(values)
+    for (source, idx), translated in zip(groups, results):
+        for i, value in zip(idx, translated):
+            if value != values[i]:
+                print(f"Translated '{values[i]}' from {source} to {form_language}: {value}")
+            out[i] = value
+    return out
+
+
 # 🔹 GENERATE FILLED FORM
 @app.post("/api/generate-filled-form")
 async def generate_filled_form(request: Request, session_id: Optional[str] = Form(default=None)):
@@ -1578,18 +3150,18 @@ async def generate_filled_form(request: Request, session_id: Optional[str] = For
             },
         )
 
-    if session_id not in conversation_sessions:
+    session = await _read_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = conversation_sessions[session_id]
-    form_analysis = session["form_analysis"]
+    return await _filled_form_payload(session_id, session)
+
+
+async def _filled_form_payload(session_id: str, session: dict) -> dict:
+    form_analysis = _session_analysis(session)
     form_language = session.get("form_language", "en")
     responses = session["field_responses"]
     language = session["language"]
     
-    # Initialize translator
-    translator = Translator()
-    
     # Create a formatted filled form
     form_name = form_analysis.get("form_name", "Form")
     
@@ -1597,27 +3169,14 @@ async def generate_filled_form(request: Request, session_id: Optional[str] = For
     filled_form_text += f"{form_name.upper()}\n"
     filled_form_text += f"{'='*50}\n\n"
     
-    # Add all fields with responses - translate if needed
-    for field in form_analysis.get("fields", []):
-        field_name = field["field_name"]
-        value = responses.get(field_name, "Not provided")
-        
-        # Translate answer to match form language if different
-        if value and value != "Not provided":
-            try:
-                # Detect the language of the answer
-                detected_lang = detect(value)
-                
-                # If answer language doesn't match form language, translate it
-                if detected_lang != form_language:
-                    translation = translator.translate(value, dest=form_language)
-                    value = translation.text
-                    print(f"Translated '{responses.get(field_name)}' from {detected_lang} to {form_language}: {value}")
-            except Exception as e:
-                print(f"Translation error for field {field_name}: {e}")
-                # Keep original value if translation fails
-                pass
-        
+    # Bring every answer into the form's language (concurrently, under a deadline)
+    field_names = [field["field_name"] for field in form_analysis.get("fields", ())]
+    values = await _normalize_answers_to_form_language(
+        [responses.get(name, "Not provided") for name in field_names], form_language
+    )
+    rows = list(zip(field_names, values))
+
+    for field_name, value in rows:
         filled_form_text += f"{field_name}: {value}\n"
     
     filled_form_text += f"\n{'='*50}\n"
@@ -1637,7 +3196,8 @@ async def generate_filled_form(request: Request, session_id: Optional[str] = For
     }
     
     summary_message = completion_texts.get(language, completion_texts["en"])
-    voice_url, _ = _create_voice_note(summary_message, language)
+    _cancel_question_prefetch(session_id)
+    voice_url, _ = await _create_voice_note_async(summary_message, language, session.get("audio_format", "mp3"))
     
     return {
         "success": True,
@@ -1651,6 +3211,235 @@ async def generate_filled_form(request: Request, session_id: Optional[str] = For
     }
 
 
+# 🔹 FORM FILLING OVER ONE WEBSOCKET
+# The whole conversation (questions with their voice notes, answers, the filled form) runs on
+# one socket, so each step is one message in and one pushed back. Progress lives in the session
+# store, so a client that reconnects with the same session_id continues where it left off.
+FORM_CHANNEL_AUDIO_MODES = ("bytes", "url", "none")
+FORM_CHANNEL_MAX_KNOWN_VOICE = int(os.getenv("FORM_CHANNEL_MAX_KNOWN_VOICE", "512"))
+
+
+class FormChannelError(Exception):
+    def __init__(self, code: str, message: str, **extra) -> None:
+        super().__init__(message)
+        self.code = code
+        self.extra = extra
+
+
+def _voice_note_ref(voice_url: Optional[str]) -> Optional[str]:
+    """Name of a cached voice note file; a content hash, so the same audio has the same ref everywhere."""
+    if not voice_url or not voice_url.startswith("/uploads/"):
+        return None
+    return os.path.basename(voice_url)
+
+
+class FormChannel:
+    """State of one /ws/form-filling socket."""
+
+    def __init__(self, websocket: WebSocket, session_id: str, audio_mode: str, known_voice) -> None:
+        self.websocket = websocket
+        self.session_id = session_id
+        self.audio_mode = audio_mode
+        # Voice notes the client already holds (told at start, or sent on this socket).
+        self.known_voice = set(list(known_voice)[:FORM_CHANNEL_MAX_KNOWN_VOICE])
+
+    async def load(self) -> Tuple[dict, tuple]:
+        session = await _read_session(self.session_id)
+        if session is None:
+            raise FormChannelError("session_not_found", "Session not found")
+        try:
+            fields = _session_analysis(session).get("fields", ())
+        except HTTPException:
+            raise FormChannelError("session_not_found", "Session not found")
+        return session, fields
+
+    def progress(self, session: dict, fields) -> dict:
+        answered = session["field_responses"]
+        return {
+            "field_index": session["current_field_index"],
+            "total_fields": len(fields),
+            "answered": sum(1 for field in fields if field["field_name"] in answered),
+        }
+
+    async def push_next(self, session: dict, fields) -> None:
+        """Send the current question (and its audio), or the filled form once every field is answered."""
+        if session["current_field_index"] >= len(fields):
+            _cancel_question_prefetch(self.session_id)
+            form = await _filled_form_payload(self.session_id, session)
+            await self.websocket.send_json({"type": "completed", **self.progress(session, fields), "form": form})
+            return
+
+        payload = await _get_next_field_question(self.session_id, session, voice=self.audio_mode != "none")
+        payload.pop("completed", None)
+        message = {"type": "question", **payload, "answered": self.progress(session, fields)["answered"]}
+        if self.audio_mode == "none":
+            message["voice_url"] = None
+            message.pop("voice_stream_url", None)
+        if self.audio_mode != "bytes":
+            await self.websocket.send_json(message)
+            return
+        await self._send_with_audio(message)
+
+    async def _send_with_audio(self, message: dict) -> None:
+        ref = _voice_note_ref(message.get("voice_url"))
+        if ref is None:
+            await self.websocket.send_json(message)
+            return
+        media_type = "audio/ogg" if ref.endswith(".ogg") else "audio/mpeg"
+        if ref in self.known_voice:
+            timing.note("form_channel_audio", "client_cached")
+            await self.websocket.send_json({**message, "audio": {"ref": ref, "media_type": media_type, "cached": True}})
+            return
+
+        path = _upload_url_to_path(message["voice_url"])
+        data = await asyncio.to_thread(_read_file_or_none, path) if path else None
+        stream = _tts_streams.get(os.path.splitext(ref)[0]) if data is None else None
+        if data is None and stream is None:
+            # Synthesis failed or ran on another worker; the client can still fetch voice_url.
+            timing.note("form_channel_audio", "unavailable")
+            await self.websocket.send_json({**message, "audio": None})
+            return
+
+        await self.websocket.send_json({**message, "audio": {"ref": ref, "media_type": media_type, "cached": False}})
+        sent = 0
+        if data is not None:
+            timing.note("form_channel_audio", "file")
+            await self.websocket.send_bytes(data)
+            sent = len(data)
+        else:
+            # Still being synthesized: forward mp3 bytes as they are produced.
+            timing.note("form_channel_audio", "stream")
+            async for chunk in stream.iter_bytes():
+                await self.websocket.send_bytes(chunk)
+                sent += len(chunk)
+        complete = data is not None or not stream.failed
+        await self.websocket.send_json({"type": "audio_end", "ref": ref, "bytes": sent, "complete": complete})
+        if complete and len(self.known_voice) < FORM_CHANNEL_MAX_KNOWN_VOICE:
+            self.known_voice.add(ref)
+
+    async def handle(self, command: dict) -> None:
+        kind = command.get("type")
+        if kind == "ping":
+            await self.websocket.send_json({"type": "pong"})
+            return
+        session, fields = await self.load()
+
+        if kind == "answer":
+            expected = command.get("field_index")
+            if expected is not None and expected != session["current_field_index"]:
+                # Usually an answer re-sent after a reconnect that was already saved.
+                await self.websocket.send_json(
+                    {
+                        "type": "error",
+                        "code": "stale_answer",
+                        "message": "That answer is not for the current question; it was ignored.",
+                        "field_index": session["current_field_index"],
+                    }
+                )
+            else:
+                value = command.get("value")
+                if isinstance(value, (dict, list)):
+                    raise FormChannelError("invalid_value", "value must be text")
+                session = await _save_answer(self.session_id, session, "" if value is None else str(value))
+        elif kind == "answers":
+            resolved, errors = _resolve_bulk_values(fields, command.get("values"))
+            if errors:
+                raise FormChannelError(
+                    "invalid_fields",
+                    "Some values could not be matched to the form's fields; nothing was saved.",
+                    errors=errors,
+                )
+            session, _ = await _save_bulk_answers(self.session_id, session, fields, resolved)
+        elif kind != "resume":
+            raise FormChannelError("unknown_message", f"Unknown message type {kind!r}")
+        await self.push_next(session, fields)
+
+
+def _read_file_or_none(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    uploads_janitor.touch(path)
+    return data
+
+
+async def _receive_json(websocket: WebSocket) -> Optional[dict]:
+    """Next JSON text message; None for anything else. Raises WebSocketDisconnect."""
+    message = await websocket.receive()
+    if message.get("type") == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    try:
+        command = json.loads(message.get("text") or "")
+    except ValueError:
+        return None
+    return command if isinstance(command, dict) else None
+
+
+@app.websocket("/ws/form-filling")
+async def form_filling_channel(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        # {"type": "start", "session_id": ..., "audio": "bytes" | "url" | "none", "cached": [voice refs]}
+        config = await _receive_json(websocket) or {}
+        session_id = str(config.get("session_id") or "").strip()
+        if not session_id:
+            await websocket.send_json(
+                {"type": "error", "code": "missing_session_id", "message": "session_id is required."}
+            )
+            await websocket.close()
+            return
+        audio_mode = str(config.get("audio") or "bytes").lower()
+        if audio_mode not in FORM_CHANNEL_AUDIO_MODES:
+            audio_mode = "bytes"
+        cached = config.get("cached")
+        channel = FormChannel(
+            websocket, session_id, audio_mode, [str(ref) for ref in cached] if isinstance(cached, list) else []
+        )
+
+        command: Optional[dict] = {"type": "resume"}
+        while True:
+            if command is None:
+                await websocket.send_json(
+                    {"type": "error", "code": "invalid_message", "message": "Messages must be JSON objects."}
+                )
+            elif command.get("type") == "stop":
+                break
+            else:
+                timer, token = timing.start_request("form_channel")
+                timing.note("message", command.get("type"))
+                status_code = 200
+                try:
+                    if command.get("type") == "resume":
+                        session, fields = await channel.load()
+                        await websocket.send_json(
+                            {
+                                "type": "ready",
+                                "session_id": session_id,
+                                "audio": audio_mode,
+                                **channel.progress(session, fields),
+                            }
+                        )
+                    await channel.handle(command)
+                except FormChannelError as e:
+                    status_code = 404 if e.code == "session_not_found" else 422
+                    await websocket.send_json({"type": "error", "code": e.code, "message": str(e), **e.extra})
+                    if e.code == "session_not_found":
+                        await websocket.close()
+                        return
+                except HTTPException as e:
+                    status_code = e.status_code
+                    detail = e.detail if isinstance(e.detail, dict) else {"code": "error", "message": str(e.detail)}
+                    await websocket.send_json({"type": "error", **detail})
+                finally:
+                    timing.finish_request(timer, token, status_code)
+            command = await _receive_json(websocket)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 # ---------------- RUN ----------------
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,100 @@
+from typing import Iterable, Iterator, Optional, Tuple
+
+# Bitrates in kbps by (is_mpeg1, layer) and header index; index 0 ("free") and 15 are unusable.
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by header version bits (0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1).
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+_LAYERS = {1: 3, 2: 2, 3: 1}
+
+# (version bits, layer, sample rate, channels)
+FrameFormat = Tuple[int, int, int, int]
+
+
+def parse_header(data: bytes, pos: int) -> Optional[Tuple[int, FrameFormat]]:
+    """(frame length, format) of the MPEG audio frame starting at pos, or None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 3
+    layer = _LAYERS.get((b1 >> 1) & 3)
+    bitrate_idx = b2 >> 4
+    rate_idx = (b2 >> 2) & 3
+    if version == 1 or layer is None or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_idx] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_idx]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and not mpeg1:
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        length = 144 * bitrate // sample_rate + padding
+    channels = 1 if (b3 >> 6) == 3 else 2
+    return length, (version, layer, sample_rate, channels)
+
+
+def _is_info_frame(data: bytes, pos: int, fmt: FrameFormat) -> bool:
+    """Xing/Info/VBRI header frames describe the whole file and must not appear mid-stream."""
+    version, layer, _, channels = fmt
+    if layer != 3:
+        return False
+    if version == 3:
+        side_info = 17 if channels == 1 else 32
+    else:
+        side_info = 9 if channels == 1 else 17
+    offset = pos + 4 + side_info + (0 if data[pos + 1] & 1 else 2)
+    return data[offset:offset + 4] in (b"Xing", b"Info") or data[pos + 36:pos + 40] == b"VBRI"
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _iter_frames(data: bytes) -> Iterator[Tuple[int, int, FrameFormat, bool]]:
+    """(offset, length, format, is_info_frame) for every complete frame in data."""
+    pos = _skip_id3v2(data)
+    n = len(data)
+    while pos < n:
+        parsed = parse_header(data, pos)
+        if parsed is None or parsed[0] <= 4:
+            if data[pos:pos + 3] == b"TAG" and n - pos == 128:
+                return  # ID3v1 trailer
+            pos += 1  # garbage between frames: resync
+            continue
+        length, fmt = parsed
+        if pos + length > n:
+            return
+        yield pos, length, fmt, _is_info_frame(data, pos, fmt)
+        pos += length
+
+
+def audio_frames(data: bytes) -> bytes:
+    """Only the audio frames of an mp3: no ID3 tags, no VBR info frame, no truncated tail."""
+    return b"".join(data[pos:pos + length] for pos, length, _, info in _iter_frames(data) if not info)
+
+
+def duration_s(data: bytes) -> float:
+    total = 0.0
+    for _, _, (version, layer, sample_rate, _), info in _iter_frames(data):
+        if not info:
+            samples = 384 if layer == 1 else (1152 if layer == 2 or version == 3 else 576)
+            total += samples / sample_rate
+    return total
+
+
+def concat(parts: Iterable[bytes]) -> bytes:
+    """Join mp3 files into one stream by concatenating their audio frames in order."""
+    return b"".join(audio_frames(p) for p in parts)
@@ -0,0 +1,773 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+try:
+    import redis  # type: ignore
+except Exception:  # pragma: no cover
+    redis = None
+
+
+def _dumps(session: dict) -> bytes:
+    return json.dumps(session, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def approx_size(session: dict) -> int:
+    """Approximate footprint of a session: the size of its compact JSON encoding."""
+    return len(_dumps(session))
+
+
+def encode_session(session: dict) -> bytes:
+    """Compact record for the shared backends: zlib-compressed compact JSON."""
+    return zlib.compress(_dumps(session), 6)
+
+
+def decode_session(data: bytes) -> dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def analysis_key(analysis: dict) -> str:
+    """Content hash of a form analysis; identical analyses share one key."""
+    canonical = json.dumps(analysis, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy: dicts become mapping proxies and lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class SessionConflict(Exception):
+    """put() lost a race: the session was written by someone else since it was read."""
+
+
+# An interned analysis nobody references yet (between intern_analysis() and the put() of its
+# session) is kept at least this long.
+ANALYSIS_GRACE_S = 60.0
+
+
+class SessionStore:
+    """Where form-filling sessions live.
+
+    Sessions are JSON-serializable dicts. get() hands out the session for reading and
+    modifying; changes only count once they are written back with put(). A session that
+    expires or is evicted is simply gone: get() returns None, as for an unknown id.
+
+    Every stored session carries a "version" that put() increments. put() is a compare-and-set:
+    if the stored version is no longer the one the session was read with, it raises
+    SessionConflict instead of overwriting the other write; re-read and apply the change again.
+    A session without a version (a new one) is written unconditionally.
+
+    Form analyses are stored once per distinct content: intern_analysis() returns a key that
+    the session keeps as "analysis_ref", and analysis() returns the shared read-only copy. An
+    analysis lives as long as some session refers to it.
+    """
+
+    name = "base"
+
+    def __init__(self, *, analysis_cache_size: int = 256) -> None:
+        # Keys are content hashes, so a cached analysis can never be stale.
+        self._analysis_cache: "OrderedDict[str, Mapping]" = OrderedDict()
+        self._analysis_cache_size = analysis_cache_size
+        self._analysis_cache_lock = threading.Lock()
+
+    def _cached_analysis(self, key: str) -> Optional[Mapping]:
+        with self._analysis_cache_lock:
+            analysis = self._analysis_cache.get(key)
+            if analysis is not None:
+                self._analysis_cache.move_to_end(key)
+            return analysis
+
+    def _cache_analysis(self, key: str, analysis: Mapping) -> None:
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = analysis
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self._analysis_cache_size:
+                self._analysis_cache.popitem(last=False)
+
+    def intern_analysis(self, analysis: dict) -> str:
+        raise NotImplementedError
+
+    def analysis(self, key: str) -> Optional[Mapping]:
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, session: dict) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def __contains__(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def values(self) -> Iterator[dict]:
+        """Snapshot of all live sessions (for housekeeping, not for the request path)."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        pass
+
+
+class _Entry:
+    # The session is kept encoded, so callers only ever hold copies and must put() to change it.
+    __slots__ = ("data", "analysis_ref", "last_access", "version")
+
+    def __init__(self, data: bytes, analysis_ref: Optional[str], last_access: float, version: int) -> None:
+        self.data = data
+        self.analysis_ref = analysis_ref
+        self.last_access = last_access
+        self.version = version
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def session(self) -> dict:
+        session = json.loads(self.data)
+        session["version"] = self.version
+        return session
+
+
+class _Analysis:
+    __slots__ = ("data", "size", "refs", "created")
+
+    def __init__(self, data: Mapping, size: int, created: float) -> None:
+        self.data = data
+        self.size = size
+        self.refs = 0
+        self.created = created
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local sessions with an idle TTL and an LRU memory cap.
+
+    Sessions are stored as compact JSON, so get() returns a private copy just like the shared
+    backends do. Entries are kept in access order, so expired sessions are always at the front and are
+    dropped as a side effect of get()/put(); no background sweeper is needed. When the
+    approximate total size (sessions plus shared analyses) exceeds max_bytes, least recently
+    used sessions are evicted. Analyses are reference-counted by the sessions that use them.
+    """
+
+    name = "memory"
+
+    def __init__(self, *, ttl_s: float = 2 * 3600, max_bytes: int = 256 * 1024 ** 2) -> None:
+        super().__init__()
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._analyses: Dict[str, _Analysis] = {}
+        self._bytes = 0
+        self._analysis_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            "created": 0, "hits": 0, "misses": 0, "expired": 0, "evicted": 0, "conflicts": 0, "analyses_shared": 0,
+        }
+
+    def intern_analysis(self, analysis: dict) -> str:
+        key = analysis_key(analysis)
+        with self._lock:
+            if key in self._analyses:
+                self.counters["analyses_shared"] += 1
+            else:
+                size = approx_size(analysis)
+                self._analyses[key] = _Analysis(freeze(analysis), size, time.monotonic())
+                self._analysis_bytes += size
+        return key
+
+    def analysis(self, key: str) -> Optional[Mapping]:
+        with self._lock:
+            entry = self._analyses.get(key)
+            return entry.data if entry is not None else None
+
+    def _release_locked(self, key: Optional[str]) -> None:
+        entry = self._analyses.get(key) if key else None
+        if entry is None:
+            return
+        entry.refs -= 1
+        if entry.refs <= 0:
+            del self._analyses[key]
+            self._analysis_bytes -= entry.size
+
+    def _collect_locked(self, now: float) -> None:
+        # Interned but never used (the request failed before its session was stored).
+        for key, entry in list(self._analyses.items()):
+            if entry.refs <= 0 and now - entry.created >= ANALYSIS_GRACE_S:
+                del self._analyses[key]
+                self._analysis_bytes -= entry.size
+
+    def _remove_locked(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            self._release_locked(entry.analysis_ref)
+
+    def _expire_locked(self, now: float) -> None:
+        if self.ttl_s <= 0:
+            return
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_access < self.ttl_s:
+                return
+            self._remove_locked(session_id)
+            self.counters["expired"] += 1
+
+    def _evict_locked(self, keep: str) -> None:
+        while self._bytes + self._analysis_bytes > self.max_bytes and len(self._entries) > 1:
+            session_id = next(iter(self._entries))
+            if session_id == keep:
+                return
+            self._remove_locked(session_id)
+            self.counters["evicted"] += 1
+
+    def get(self, session_id: str) -> Optional[dict]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_locked(now)
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            entry.last_access = now
+            self._entries.move_to_end(session_id)
+            return entry.session()
+
+    def put(self, session_id: str, session: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_locked(now)
+            current = self._entries.get(session_id)
+            expected = session.get("version")
+            # A session read earlier but removed since (expired, evicted, deleted) is a conflict too.
+            if expected is not None and (current is None or current.version != expected):
+                self.counters["conflicts"] += 1
+                raise SessionConflict(session_id)
+            version = (current.version if current is not None else 0) + 1
+            data = _dumps(dict(session, version=version))
+            # Take the new reference before dropping the old one, which may be the same analysis.
+            analysis = self._analyses.get(session.get("analysis_ref") or "")
+            if analysis is not None:
+                analysis.refs += 1
+            if current is not None:
+                self._remove_locked(session_id)
+            else:
+                self.counters["created"] += 1
+                self._collect_locked(now)
+            entry = _Entry(data, session.get("analysis_ref"), now, version)
+            self._entries[session_id] = entry
+            self._bytes += entry.size
+            self._evict_locked(session_id)
+        session["version"] = version
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._remove_locked(session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return entry is not None and (self.ttl_s <= 0 or time.monotonic() - entry.last_access < self.ttl_s)
+
+    def values(self) -> Iterator[dict]:
+        with self._lock:
+            self._expire_locked(time.monotonic())
+            sessions: List[dict] = [entry.session() for entry in self._entries.values()]
+        return iter(sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire_locked(time.monotonic())
+            live = len(self._entries)
+            return dict(
+                self.counters,
+                backend=self.name,
+                live=live,
+                bytes=self._bytes,
+                avg_bytes=self._bytes // live if live else 0,
+                analyses=len(self._analyses),
+                analysis_bytes=self._analysis_bytes,
+                max_bytes=self.max_bytes,
+                ttl_s=self.ttl_s,
+            )
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite file (WAL mode) shared by every worker process on the node.
+
+    Any worker can continue a session another worker created, and sessions survive restarts.
+    Records are compressed JSON. Expiry and the size cap are enforced by a sweep that runs
+    at most every sweep_interval_s, from whichever worker writes next. Analyses live in their
+    own table with a reference count kept in the same transactions that add and remove
+    sessions; each worker caches the ones it has read.
+    """
+
+    name = "sqlite"
+
+    # get() refreshes last_access at most this often, so reads rarely turn into writes.
+    TOUCH_INTERVAL_S = 30.0
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        ttl_s: float = 2 * 3600,
+        max_bytes: int = 256 * 1024 ** 2,
+        sweep_interval_s: float = 30.0,
+    ) -> None:
+        super().__init__()
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.sweep_interval_s = sweep_interval_s
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.counters = {
+            "created": 0, "hits": 0, "misses": 0, "expired": 0, "evicted": 0, "conflicts": 0, "db_errors": 0,
+            "analyses_shared": 0,
+        }
+
+        parent = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(parent, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(sessions)")}
+        if "analysis" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN analysis TEXT")
+        if "version" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                refs INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def intern_analysis(self, analysis: dict) -> str:
+        key = analysis_key(analysis)
+        now = time.time()
+        with self._lock:
+            # Refreshing created_at keeps a concurrent sweep off it until the session is stored.
+            cur = self._db.execute("UPDATE analyses SET created_at=? WHERE key=?", (now, key))
+            if cur.rowcount:
+                self.counters["analyses_shared"] += 1
+            else:
+                data = encode_session(analysis)
+                self._db.execute(
+                    "INSERT OR IGNORE INTO analyses (key, data, size, refs, created_at) VALUES (?, ?, ?, 0, ?)",
+                    (key, data, len(data), now),
+                )
+            self._db.commit()
+        if self._cached_analysis(key) is None:
+            self._cache_analysis(key, freeze(analysis))
+        return key
+
+    def analysis(self, key: str) -> Optional[Mapping]:
+        cached = self._cached_analysis(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT data FROM analyses WHERE key=?", (key,)).fetchone()
+            except sqlite3.Error:
+                self.counters["db_errors"] += 1
+                row = None
+        if row is None:
+            return None
+        analysis = freeze(decode_session(row[0]))
+        self._cache_analysis(key, analysis)
+        return analysis
+
+    def _release_locked(self, refs: Dict[str, int]) -> None:
+        self._db.executemany(
+            "UPDATE analyses SET refs=refs-? WHERE key=?", [(n, key) for key, n in refs.items() if key]
+        )
+
+    def _cutoff(self, now: float) -> float:
+        return now - self.ttl_s if self.ttl_s > 0 else float("-inf")
+
+    def get(self, session_id: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT data, last_access, version FROM sessions WHERE id=? AND last_access>?",
+                    (session_id, self._cutoff(now)),
+                ).fetchone()
+                if row is not None and now - row[1] >= self.TOUCH_INTERVAL_S:
+                    self._db.execute("UPDATE sessions SET last_access=? WHERE id=?", (now, session_id))
+                    self._db.commit()
+            except sqlite3.Error as e:
+                self.counters["db_errors"] += 1
+                print(f"Session store read failed: {e}")
+                row = None
+            self.counters["hits" if row is not None else "misses"] += 1
+        if row is None:
+            return None
+        session = decode_session(row[0])
+        session["version"] = row[2]
+        return session
+
+    def put(self, session_id: str, session: dict) -> None:
+        ref = session.get("analysis_ref")
+        expected = session.get("version")
+        now = time.time()
+        with self._lock:
+            # Errors propagate: losing a write would silently lose the user's answer.
+            # BEGIN IMMEDIATE takes the write lock up front, so no other worker can write the
+            # session between the version check and the update.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT analysis, version, last_access FROM sessions WHERE id=?", (session_id,)
+                ).fetchone()
+                # A session read earlier but expired or deleted since is a conflict too; writing it
+                # back would resurrect it and take an analysis reference nobody releases.
+                if expected is not None and (
+                    row is None or row[1] != expected or row[2] <= self._cutoff(now)
+                ):
+                    self.counters["conflicts"] += 1
+                    raise SessionConflict(session_id)
+                version = (row[1] if row is not None else 0) + 1
+                data = encode_session(dict(session, version=version))
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE sessions SET data=?, size=?, last_access=?, analysis=?, version=? WHERE id=?",
+                        (data, len(data), now, ref, version, session_id),
+                    )
+                else:
+                    self._db.execute(
+                        "INSERT INTO sessions (id, data, size, last_access, analysis, version) VALUES (?, ?, ?, ?, ?, ?)",
+                        (session_id, data, len(data), now, ref, version),
+                    )
+                    self.counters["created"] += 1
+                old_ref = row[0] if row is not None else None
+                if ref != old_ref:
+                    if ref:
+                        self._db.execute("UPDATE analyses SET refs=refs+1 WHERE key=?", (ref,))
+                    self._release_locked({old_ref: 1})
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+            session["version"] = version
+            if now - self._last_sweep >= self.sweep_interval_s:
+                self._sweep_locked(now)
+
+    def _sweep_locked(self, now: float) -> None:
+        self._last_sweep = now
+        try:
+            # One write transaction: the sessions counted for release are exactly the ones deleted,
+            # even when several workers sweep at once.
+            self._db.execute("BEGIN IMMEDIATE")
+            if self.ttl_s > 0:
+                cutoff = self._cutoff(now)
+                self._release_locked(
+                    dict(self._db.execute(
+                        "SELECT analysis, COUNT(*) FROM sessions WHERE last_access<=? GROUP BY analysis", (cutoff,)
+                    ).fetchall())
+                )
+                cur = self._db.execute("DELETE FROM sessions WHERE last_access<=?", (cutoff,))
+                self.counters["expired"] += max(0, cur.rowcount)
+            total = self._db.execute(
+                "SELECT (SELECT COALESCE(SUM(size), 0) FROM sessions) + (SELECT COALESCE(SUM(size), 0) FROM analyses)"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                # Oldest first until the rest fits (analyses freed along the way are not counted).
+                doomed, refs, excess = [], {}, total - self.max_bytes
+                for session_id, size, ref in self._db.execute("SELECT id, size, analysis FROM sessions ORDER BY last_access"):
+                    if excess <= 0:
+                        break
+                    doomed.append((session_id,))
+                    refs[ref] = refs.get(ref, 0) + 1
+                    excess -= size
+                self._db.executemany("DELETE FROM sessions WHERE id=?", doomed)
+                self._release_locked(refs)
+                self.counters["evicted"] += len(doomed)
+            self._db.execute(
+                "DELETE FROM analyses WHERE refs<=0 AND created_at<?", (now - ANALYSIS_GRACE_S,)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            self._db.rollback()
+            self.counters["db_errors"] += 1
+            print(f"Session store sweep failed: {e}")
+
+    def sweep(self) -> None:
+        with self._lock:
+            self._sweep_locked(time.time())
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT analysis FROM sessions WHERE id=?", (session_id,)).fetchone()
+                if row is not None:
+                    self._db.execute("DELETE FROM sessions WHERE id=?", (session_id,))
+                    self._release_locked({row[0]: 1})
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT 1 FROM sessions WHERE id=? AND last_access>?", (session_id, self._cutoff(time.time()))
+                ).fetchone()
+            except sqlite3.Error:
+                self.counters["db_errors"] += 1
+                return False
+        return row is not None
+
+    def values(self) -> Iterator[dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM sessions WHERE last_access>?", (self._cutoff(time.time()),)
+            ).fetchall()
+        return (decode_session(row[0]) for row in rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            live, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE last_access>?",
+                (self._cutoff(time.time()),),
+            ).fetchone()
+            analyses, analysis_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses"
+            ).fetchone()
+            return dict(
+                self.counters,
+                backend=self.name,
+                path=self.db_path,
+                live=live,
+                bytes=stored,
+                avg_bytes=stored // live if live else 0,
+                analyses=analyses,
+                analysis_bytes=analysis_bytes,
+                max_bytes=self.max_bytes,
+                ttl_s=self.ttl_s,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions in Redis (or anything that speaks its protocol), shared across pods.
+
+    Each session is one key holding the compressed record with the idle TTL as its expiry;
+    reads refresh the expiry. The memory cap is Redis's own job: maxmemory with the
+    volatile-lru policy evicts only keys with an expiry, i.e. sessions. Pass client= to use an
+    existing client, e.g. a local stand-in in tests.
+
+    put() checks the version under WATCH and writes in MULTI/EXEC, so a concurrent write by
+    another worker makes it raise SessionConflict.
+
+    Analyses have no expiry, so they are never evicted or expired out from under a live
+    session. Redis cannot run code when a session expires, so they are not reference-counted
+    either: every sweep_interval_s one worker (holding a lock key) deletes the analyses that no
+    stored session refers to. A freshly interned analysis is protected by a pending marker for
+    ANALYSIS_GRACE_S, until its session has been written.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        *,
+        ttl_s: float = 2 * 3600,
+        prefix: str = "sahajseva:session:",
+        analysis_prefix: str = "sahajseva:analysis:",
+        sweep_interval_s: float = 300.0,
+        client=None,
+    ) -> None:
+        super().__init__()
+        if client is None:
+            if redis is None:
+                raise RuntimeError("the redis package is not installed")
+            client = redis.Redis.from_url(url, socket_timeout=5)
+            client.ping()  # fail at startup, not on the first request
+        self.client = client
+        self.url = url
+        self.ttl_s = ttl_s
+        self.prefix = prefix
+        self.analysis_prefix = analysis_prefix
+        self.pending_prefix = analysis_prefix.rstrip(":") + "-pending:"
+        self.sweep_lock_key = analysis_prefix.rstrip(":") + "-sweep"
+        self.sweep_interval_s = sweep_interval_s
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        self.counters = {
+            "hits": 0, "misses": 0, "writes": 0, "conflicts": 0, "analyses_shared": 0, "analyses_swept": 0,
+        }
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _ttl(self) -> Optional[int]:
+        return max(1, int(self.ttl_s)) if self.ttl_s > 0 else None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+    def intern_analysis(self, analysis: dict) -> str:
+        key = analysis_key(analysis)
+        # The marker keeps a sweep off the analysis until the session that uses it is stored.
+        self.client.set(self.pending_prefix + key, b"1", ex=max(1, int(ANALYSIS_GRACE_S)))
+        created = self.client.set(self.analysis_prefix + key, encode_session(analysis), nx=True)
+        if not created:
+            self._count("analyses_shared")
+        if self._cached_analysis(key) is None:
+            self._cache_analysis(key, freeze(analysis))
+        return key
+
+    def analysis(self, key: str) -> Optional[Mapping]:
+        cached = self._cached_analysis(key)
+        if cached is not None:
+            return cached
+        data = self.client.get(self.analysis_prefix + key)
+        if data is None:
+            return None
+        analysis = freeze(decode_session(data))
+        self._cache_analysis(key, analysis)
+        return analysis
+
+    def get(self, session_id: str) -> Optional[dict]:
+        ttl = self._ttl()
+        key = self._key(session_id)
+        data = self.client.getex(key, ex=ttl) if ttl else self.client.get(key)
+        self._count("hits" if data is not None else "misses")
+        return decode_session(data) if data is not None else None
+
+    def put(self, session_id: str, session: dict) -> None:
+        key = self._key(session_id)
+        expected = session.get("version")
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.get(key)
+                stored = decode_session(current).get("version", 0) if current is not None else 0
+                if expected is not None and (current is None or stored != expected):
+                    raise SessionConflict(session_id)
+                version = stored + 1
+                pipe.multi()
+                pipe.set(key, encode_session(dict(session, version=version)), ex=self._ttl())
+                pipe.execute()
+            except SessionConflict:
+                self._count("conflicts")
+                raise
+            except Exception as e:
+                if redis is None or not isinstance(e, redis.WatchError):
+                    raise
+                self._count("conflicts")
+                raise SessionConflict(session_id)
+        session["version"] = version
+        self._count("writes")
+        if time.monotonic() - self._last_sweep >= self.sweep_interval_s:
+            self.sweep()
+
+    def sweep(self) -> None:
+        """Delete analyses no stored session refers to (one worker per sweep_interval_s)."""
+        self._last_sweep = time.monotonic()
+        if not self.client.set(self.sweep_lock_key, b"1", ex=max(1, int(self.sweep_interval_s)), nx=True):
+            return
+        referenced = {session.get("analysis_ref") for session in self.values()}
+        keys = list(self.client.scan_iter(match=self.analysis_prefix + "*", count=500))
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            names = [k.decode() if isinstance(k, bytes) else k for k in batch]
+            refs = [name[len(self.analysis_prefix):] for name in names]
+            pending = self.client.mget([self.pending_prefix + ref for ref in refs])
+            doomed = [name for name, ref, marker in zip(names, refs, pending) if ref not in referenced and marker is None]
+            if doomed:
+                self.client.delete(*doomed)
+                with self._lock:
+                    self.counters["analyses_swept"] += len(doomed)
+            # Analyses written before they stopped expiring lose their expiry once seen in use.
+            for name, ref in zip(names, refs):
+                if ref in referenced:
+                    self.client.persist(name)
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
+
+    def __contains__(self, session_id: str) -> bool:
+        return bool(self.client.exists(self._key(session_id)))
+
+    def _keys(self) -> List:
+        return list(self.client.scan_iter(match=self.prefix + "*", count=500))
+
+    def values(self) -> Iterator[dict]:
+        keys = self._keys()
+        for i in range(0, len(keys), 500):
+            for data in self.client.mget(keys[i:i + 500]):
+                if data is not None:
+                    yield decode_session(data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return dict(counters, backend=self.name, live=len(self._keys()), ttl_s=self.ttl_s)
+
+    def close(self) -> None:
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+def create_session_store(spec: str, *, ttl_s: float, max_bytes: int) -> SessionStore:
+    """Store for SESSION_STORE: "memory", "redis://host:6379/0", or a SQLite file path
+    ("sqlite:///var/lib/sahajseva/sessions.sqlite3" or just "sessions.sqlite3").
+
+    Falls back to the in-memory store if the shared backend cannot be opened.
+    """
+    spec = (spec or "").strip()
+    try:
+        if spec.startswith(("redis://", "rediss://", "unix://")):
+            return RedisSessionStore(spec, ttl_s=ttl_s)
+        if spec and spec.lower() != "memory":
+            path = spec[len("sqlite:///"):] if spec.startswith("sqlite:///") else spec
+            return SQLiteSessionStore(path, ttl_s=ttl_s, max_bytes=max_bytes)
+    except Exception as e:
+        print(f"Session store {spec!r} unavailable ({e}); keeping sessions in memory")
+    return MemorySessionStore(ttl_s=ttl_s, max_bytes=max_bytes)
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Type
+
+try:
+    import speech_recognition as sr  # type: ignore
+except Exception:  # pragma: no cover
+    sr = None
+
+try:
+    import vosk  # type: ignore
+except Exception:  # pragma: no cover
+    vosk = None
+
+SAMPLE_RATE = 16000
+
+# (transcript, confidence); an empty transcript means no speech was recognized.
+Transcript = Tuple[str, Optional[float]]
+
+
+class STTEngineError(RuntimeError):
+    """The engine could not be reached or failed (not: the audio had no speech)."""
+
+
+class NoSpeechError(Exception):
+    """No speech could be recognized in the audio."""
+
+
+class STTEngine:
+    """A speech recognizer for 16 kHz mono s16le PCM.
+
+    transcribe() is blocking; atranscribe() runs it off the event loop. start() runs once at
+    startup so models are loaded before the first request.
+    """
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.warmup_ms: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, lang: str) -> bool:
+        return True
+
+    async def warm_up(self) -> None:
+        pass
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        try:
+            await self.warm_up()
+            self.ready = True
+        except Exception as e:
+            self.warmup_error = str(e)
+            print(f"STT engine {self.name} warm-up failed: {e}")
+        self.warmup_ms = round((time.perf_counter() - started) * 1000.0, 1)
+
+    async def close(self) -> None:
+        self.ready = False
+
+    def transcribe(self, pcm: bytes, lang: str, *, sample_rate: int = SAMPLE_RATE) -> Transcript:
+        raise NotImplementedError
+
+    async def atranscribe(self, pcm: bytes, lang: str, *, sample_rate: int = SAMPLE_RATE) -> Transcript:
+        return await asyncio.to_thread(self.transcribe, pcm, lang, sample_rate=sample_rate)
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "available": self.available(),
+            "ready": self.ready,
+            "warmup_ms": self.warmup_ms,
+            "warmup_error": self.warmup_error,
+        }
+
+
+class GoogleEngine(STTEngine):
+    """Google's free web speech endpoint via SpeechRecognition (network)."""
+
+    name = "google"
+
+    # App language code -> recognizer language tag.
+    LANGUAGES = {
+        "en": "en-US",
+        "hi": "hi-IN",
+        "mr": "mr-IN",
+        "ta": "ta-IN",
+        "te": "te-IN",
+        "bn": "bn-IN",
+        "gu": "gu-IN",
+        "kn": "kn-IN",
+        "ml": "ml-IN",
+        "pa": "pa-IN",
+    }
+
+    def __init__(self, *, timeout_s: Optional[float] = 15.0) -> None:
+        super().__init__()
+        self.timeout_s = timeout_s
+
+    def available(self) -> bool:
+        return sr is not None
+
+    def transcribe(self, pcm: bytes, lang: str, *, sample_rate: int = SAMPLE_RATE) -> Transcript:
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.timeout_s
+        audio_data = sr.AudioData(pcm, sample_rate, 2)
+        try:
+            result = recognizer.recognize_google(audio_data, language=self.LANGUAGES.get(lang, "en-US"), show_all=True)
+        except sr.UnknownValueError:
+            return "", None
+        except sr.RequestError as e:
+            raise STTEngineError(str(e))
+        alternatives = result.get("alternative") if isinstance(result, dict) else None
+        if not alternatives:
+            return "", None
+        best = alternatives[0]
+        confidence = best.get("confidence")
+        return str(best.get("transcript") or "").strip(), float(confidence) if confidence is not None else None
+
+
+def _vosk_model_dirs() -> Dict[str, str]:
+    """Vosk model directory per language from VOSK_MODELS ("en=/models/en;hi=/models/hi")."""
+    out = {}
+    for part in os.getenv("VOSK_MODELS", "").split(";"):
+        lang, _, path = part.partition("=")
+        if lang.strip() and path.strip():
+            out[lang.strip().lower()] = path.strip()
+    return out
+
+
+class VoskEngine(STTEngine):
+    """Offline CPU recognition with Vosk (Kaldi) models.
+
+    Models are loaded once at startup and shared by all requests; each utterance gets its own
+    cheap KaldiRecognizer. Decoding is CPU-bound, so it runs in a pool with one worker per core.
+    """
+
+    name = "vosk"
+
+    def __init__(self, *, model_dirs: Optional[Dict[str, str]] = None, workers: Optional[int] = None) -> None:
+        super().__init__()
+        self.model_dirs = model_dirs if model_dirs is not None else _vosk_model_dirs()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._models: Dict[str, object] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def available(self) -> bool:
+        return vosk is not None and bool(self.model_dirs)
+
+    def supports(self, lang: str) -> bool:
+        return lang in self._models if self.ready else lang in self.model_dirs
+
+    def _load(self) -> None:
+        vosk.SetLogLevel(-1)
+        for lang, path in self.model_dirs.items():
+            if not os.path.isdir(path):
+                print(f"Vosk model for {lang} not found at {path}")
+                continue
+            self._models[lang] = vosk.Model(path)
+
+    async def warm_up(self) -> None:
+        if not self.available():
+            raise STTEngineError("vosk or VOSK_MODELS not configured")
+        await asyncio.to_thread(self._load)
+        if not self._models:
+            raise STTEngineError("no Vosk model could be loaded")
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vosk")
+
+    async def close(self) -> None:
+        await super().close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def transcribe(self, pcm: bytes, lang: str, *, sample_rate: int = SAMPLE_RATE) -> Transcript:
+        model = self._models.get(lang)
+        if model is None:
+            raise STTEngineError(f"no Vosk model loaded for {lang}")
+        recognizer = vosk.KaldiRecognizer(model, sample_rate)
+        recognizer.SetWords(True)
+        recognizer.AcceptWaveform(pcm)
+        result = json.loads(recognizer.FinalResult())
+        words = result.get("result") or []
+        confidences = [w["conf"] for w in words if "conf" in w]
+        confidence = sum(confidences) / len(confidences) if confidences else None
+        return str(result.get("text") or "").strip(), confidence
+
+    async def atranscribe(self, pcm: bytes, lang: str, *, sample_rate: int = SAMPLE_RATE) -> Transcript:
+        if self._pool is None:
+            return await super().atranscribe(pcm, lang, sample_rate=sample_rate)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, lambda: self.transcribe(pcm, lang, sample_rate=sample_rate))
+
+    def describe(self) -> dict:
+        return dict(super().describe(), languages=sorted(self._models), workers=self.workers)
+
+
+ENGINES: Dict[str, Type[STTEngine]] = {
+    GoogleEngine.name: GoogleEngine,
+    VoskEngine.name: VoskEngine,
+}
+
+
+def parse_engine_map(spec: str) -> Dict[str, str]:
+    """Language -> engine name from "hi:vosk,en:google"."""
+    out = {}
+    for part in (spec or "").split(","):
+        lang, _, name = part.partition(":")
+        if lang.strip() and name.strip():
+            out[lang.strip().lower()] = name.strip().lower()
+    return out
+
+
+class STTRouter:
+    """Picks the engine for each language: STT_ENGINES overrides, else the default engine.
+
+    Every configured engine is created once and started together. A language whose engine is
+    unavailable, failed to warm up or has no model for it falls back to the default engine, and
+    past that to Google (which is also the default when the requested one is unavailable).
+    """
+
+    def __init__(
+        self,
+        default: str = GoogleEngine.name,
+        per_language: Optional[Dict[str, str]] = None,
+        *,
+        options: Optional[Dict[str, dict]] = None,
+    ) -> None:
+        self.per_language = dict(per_language or {})
+        options = options or {}
+        names = {default, *self.per_language.values()}
+        self.engines: Dict[str, STTEngine] = {}
+        for name in names:
+            cls = ENGINES.get(name)
+            if cls is None:
+                print(f"Unknown STT engine {name!r}; ignoring")
+                continue
+            engine = cls(**options.get(name, {}))
+            if not engine.available():
+                print(f"STT engine {name} is not available here")
+            self.engines[name] = engine
+        if default not in self.engines or not self.engines[default].available():
+            if default != GoogleEngine.name:
+                print(f"STT engine {default!r} cannot be the default here; using {GoogleEngine.name}")
+            default = GoogleEngine.name
+        self.fallback = self.engines.setdefault(
+            GoogleEngine.name, GoogleEngine(**options.get(GoogleEngine.name, {}))
+        )
+        self.default = self.engines[default]
+
+    def available(self) -> bool:
+        return any(engine.available() for engine in self.engines.values())
+
+    def engine_for(self, lang: str) -> STTEngine:
+        for engine in (self.engines.get(self.per_language.get(lang, "")), self.default):
+            if engine is not None and engine.ready and engine.supports(lang):
+                return engine
+        return self.fallback
+
+    async def start(self) -> None:
+        await asyncio.gather(*(e.start() for e in self.engines.values() if e.available()))
+
+    async def close(self) -> None:
+        await asyncio.gather(*(e.close() for e in self.engines.values()))
+
+    def describe(self) -> dict:
+        return {
+            "default": self.default.name,
+            "per_language": self.per_language,
+            "engines": {name: engine.describe() for name, engine in self.engines.items()},
+        }
@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+os.environ.setdefault("SESSION_STORE", "memory")
+os.environ.setdefault("TRANSLATION_MEMORY_PATH", "")
+os.environ.setdefault("PREFETCH_QUESTIONS", "false")
+os.environ.setdefault("UPLOADS_JANITOR_INTERVAL_S", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+FORM_TEXT = "Application form\nName: ____\nDate of Birth: ____\nAddress: ____\nMobile Number: ____"
+
+
+class FakeTTS:
+    name = "fake"
+    settings = "fake:v1"
+    ready = True
+
+    def available(self):
+        return True
+
+    def supports(self, lang):
+        return True
+
+    def synthesize(self, text, lang):
+        return b"\xff\xf3" + text.encode("utf-8")[:32]
+
+    def stream(self, text, lang):
+        yield self.synthesize(text, lang)
+
+    def describe(self):
+        return {"name": self.name}
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # uploads and voice notes go to ./uploads
+    os.makedirs(main.TTS_CACHE_DIR)
+    monkeypatch.setattr(main, "extract_text_from_file", lambda path, ext: FORM_TEXT)
+    monkeypatch.setattr(main, "_translate_batch", lambda texts, target_lang, **kw: list(texts))
+    monkeypatch.setattr(main, "tts_engine", FakeTTS())
+    with TestClient(main.app) as c:
+        yield c
+
+
+def _new_session(client):
+    response = client.post(
+        "/api/analyze-form",
+        files={"file": ("form.pdf", b"%PDF", "application/pdf")},
+        data={"language": "en"},
+    )
+    assert response.status_code == 200
+    return response.json()["session_id"]
+
+
+def test_single_answer_after_bulk_skips_fields_answered_in_bulk(client):
+    session_id = _new_session(client)
+
+    response = client.post(
+        "/api/submit-fields",
+        json={"session_id": session_id, "values": {"Date of Birth": "01-01-1990"}, "voice": False},
+    )
+    assert response.json()["field_name"] == "Name"
+
+    response = client.post("/api/submit-field", data={"session_id": session_id, "field_value": "Asha"})
+    assert response.json()["field_name"] == "Address"
+
+    client.post("/api/submit-field", data={"session_id": session_id, "field_value": "Pune"})
+    client.post("/api/submit-field", data={"session_id": session_id, "field_value": "98765"})
+    responses = client.post("/api/generate-filled-form", data={"session_id": session_id}).json()["field_responses"]
+    assert responses == {"Name": "Asha", "Date of Birth": "01-01-1990", "Address": "Pune", "Mobile Number": "98765"}
+
+
+def test_form_channel_answer_after_bulk_skips_fields_answered_in_bulk(client):
+    session_id = _new_session(client)
+
+    with client.websocket_connect("/ws/form-filling") as ws:
+        ws.send_json({"type": "start", "session_id": session_id, "audio": "none"})
+        assert ws.receive_json()["type"] == "ready"
+        assert ws.receive_json()["field_name"] == "Name"
+
+        ws.send_json({"type": "answers", "values": {"Date of Birth": "01-01-1990"}})
+        assert ws.receive_json()["field_name"] == "Name"
+
+        ws.send_json({"type": "answer", "field_index": 0, "value": "Asha"})
+        question = ws.receive_json()
+        assert (question["field_index"], question["field_name"]) == (2, "Address")
+
+
+def test_analyze_form_removes_upload_when_analysis_fails(client, monkeypatch):
+    def broken_extract(path, ext):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(main, "extract_text_from_file", broken_extract)
+    response = client.post(
+        "/api/analyze-form",
+        files={"file": ("form.pdf", b"%PDF", "application/pdf")},
+        data={"language": "en"},
+    )
+    assert response.status_code == 500
+    assert [name for name in os.listdir(main.UPLOAD_DIR) if name.endswith(".pdf")] == []
+
+
+def test_analyze_form_falls_back_when_llm_json_is_not_an_object(client, monkeypatch):
+    class Models:
+        def generate_content(self, **kwargs):
+            return SimpleNamespace(text='["Name", "Address"]')
+
+    monkeypatch.setattr(main, "client", SimpleNamespace(models=Models()))
+    monkeypatch.setattr(main, "types", SimpleNamespace(GenerateContentConfig=lambda **kwargs: None))
+    response = client.post(
+        "/api/analyze-form",
+        files={"file": ("form.pdf", b"%PDF", "application/pdf")},
+        data={"language": "en"},
+    )
+    assert response.status_code == 200
+    assert response.json()["fallback"] is True
+    assert [f["field_name"] for f in response.json()["form_analysis"]["fields"]][:2] == ["Name", "Date of Birth"]
+
+
+def test_repeated_field_names_are_asked_and_kept_separately(client, monkeypatch):
+    fields = [
+        {"field_name": "Name", "field_type": "text"},
+        {"field_name": "Address", "field_type": "text"},
+        {"field_name": "Name", "field_type": "text"},
+        {"field_name": "Mobile Number", "field_type": "number"},
+    ]
+
+    class Models:
+        def generate_content(self, **kwargs):
+            return SimpleNamespace(text=json.dumps({"form_name": "Nomination", "fields": fields}))
+
+    monkeypatch.setattr(main, "client", SimpleNamespace(models=Models()))
+    monkeypatch.setattr(main, "types", SimpleNamespace(GenerateContentConfig=lambda **kwargs: None))
+    session_id = _new_session(client)
+
+    response = client.post(
+        "/api/submit-fields",
+        json={"session_id": session_id, "values": {"Address": "Pune"}, "voice": False},
+    )
+    assert response.json()["field_name"] == "Name"
+
+    response = client.post("/api/submit-field", data={"session_id": session_id, "field_value": "Asha"})
+    assert (response.json()["field_index"], response.json()["field_name"]) == (2, "Name (2)")
+
+    client.post("/api/submit-field", data={"session_id": session_id, "field_value": "Ravi"})
+    client.post("/api/submit-field", data={"session_id": session_id, "field_value": "98765"})
+    responses = client.post("/api/generate-filled-form", data={"session_id": session_id}).json()["field_responses"]
+    assert responses == {"Name": "Asha", "Address": "Pune", "Name (2)": "Ravi", "Mobile Number": "98765"}
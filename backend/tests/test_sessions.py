@@ -0,0 +1,189 @@
+import fnmatch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import sessions  # noqa: E402
+from sessions import MemorySessionStore, RedisSessionStore, SessionConflict, SQLiteSessionStore  # noqa: E402
+
+
+class FakeRedis:
+    """The handful of Redis commands RedisSessionStore uses, kept in a dict (expiries are ignored)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def getex(self, key, ex=None):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def persist(self, key):
+        return key in self.data
+
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def close(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.queued = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        pass
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def multi(self):
+        self.queued = []
+
+    def set(self, key, value, ex=None):
+        self.queued.append((key, value))
+
+    def execute(self):
+        for key, value in self.queued:
+            self.client.set(key, value)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "ANALYSIS_GRACE_S", 0.0)
+    if request.param == "memory":
+        store = MemorySessionStore()
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    else:
+        store = RedisSessionStore(client=FakeRedis())
+    yield store
+    store.close()
+
+
+def _expire(store, session_id):
+    """Make a session expire as if its idle TTL had passed."""
+    if isinstance(store, MemorySessionStore):
+        store._entries[session_id].last_access -= store.ttl_s + 1
+    elif isinstance(store, SQLiteSessionStore):
+        store._db.execute("UPDATE sessions SET last_access=0 WHERE id=?", (session_id,))
+        store._db.commit()
+    else:
+        store.client.delete(store._key(session_id))
+
+
+def _collect(store):
+    """Run whatever housekeeping drops expired sessions and unreferenced analyses."""
+    if isinstance(store, MemorySessionStore):
+        store.values()
+    elif isinstance(store, SQLiteSessionStore):
+        store.sweep()
+    else:
+        store.client.delete(store.sweep_lock_key, *store.client.scan_iter(match=store.pending_prefix + "*"))
+        store.sweep()
+
+
+def _stored_analysis(store, ref):
+    store._analysis_cache.clear()
+    return store.analysis(ref)
+
+
+def test_put_with_a_stale_version_conflicts(store):
+    store.put("s", {"answers": []})
+    first, second = store.get("s"), store.get("s")
+    first["answers"].append("first")
+    store.put("s", first)
+
+    second["answers"].append("second")
+    with pytest.raises(SessionConflict):
+        store.put("s", second)
+    assert store.get("s")["answers"] == ["first"]
+
+
+def test_put_after_the_session_was_removed_conflicts(store):
+    store.put("s", {"answers": []})
+    session = store.get("s")
+    store.delete("s")
+
+    with pytest.raises(SessionConflict):
+        store.put("s", session)
+    assert store.get("s") is None
+
+
+def test_analysis_survives_while_any_session_refers_to_it(store):
+    ref = store.intern_analysis({"fields": [{"field_name": "Name"}]})
+    store.put("a", {"analysis_ref": ref})
+    store.put("b", {"analysis_ref": store.intern_analysis({"fields": [{"field_name": "Name"}]})})
+
+    store.delete("a")
+    _collect(store)
+    assert _stored_analysis(store, ref) is not None
+
+    store.delete("b")
+    _collect(store)
+    assert _stored_analysis(store, ref) is None
+
+
+def test_expired_sessions_release_their_analysis_once(store):
+    ref = store.intern_analysis({"fields": [{"field_name": "Name"}]})
+    for session_id in ("a", "b"):
+        store.put(session_id, {"analysis_ref": ref})
+
+    _expire(store, "a")
+    _collect(store)
+    _collect(store)
+    assert store.get("a") is None
+    assert _stored_analysis(store, ref) is not None
+
+    _expire(store, "b")
+    _collect(store)
+    assert _stored_analysis(store, ref) is None
+
+
+def test_concurrent_sqlite_sweeps_release_each_session_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "ANALYSIS_GRACE_S", 0.0)
+    path = str(tmp_path / "sessions.sqlite3")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    ref = first.intern_analysis({"fields": []})
+    for session_id in ("a", "b", "c"):
+        first.put(session_id, {"analysis_ref": ref})
+
+    _expire(first, "a")
+    _expire(first, "b")
+    first.sweep()
+    second.sweep()
+    assert first._db.execute("SELECT refs FROM analyses WHERE key=?", (ref,)).fetchone() == (1,)
+    assert first.counters["expired"] + second.counters["expired"] == 2
+
+    first.close()
+    second.close()
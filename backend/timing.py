@@ -0,0 +1,162 @@
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended).
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class StageHistogram:
+    """Aggregated latency distribution for one pipeline stage."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound that covers the q-th fraction of observations."""
+        if not self.total:
+            return None
+        target = q * self.total
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                bound = float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 2)
+        return round(self.max_ms, 2)
+
+    def snapshot(self) -> dict:
+        buckets = {f"le_{b}": c for b, c in zip(BUCKETS_MS, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 2) if self.total else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": buckets,
+        }
+
+
+_histograms: Dict[str, StageHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _observe(stage: str, ms: float) -> None:
+    with _histograms_lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = StageHistogram()
+        hist.observe(ms)
+
+
+def stage_stats() -> dict:
+    with _histograms_lock:
+        return {stage: hist.snapshot() for stage, hist in sorted(_histograms.items())}
+
+
+def reset_stage_stats() -> None:
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class RequestTimer:
+    """Collects per-stage durations and outcomes for a single request."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.outcomes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, ms: float) -> None:
+        # Repeated stages (e.g. several translations) accumulate into one entry.
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def note(self, key: str, value) -> None:
+        with self._lock:
+            self.outcomes[key] = str(value)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def server_timing(self) -> str:
+        parts: List[str] = [f"{stage};dur={ms:.1f}" for stage, ms in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+    def log_record(self, status_code: int) -> dict:
+        return {
+            "event": "request_timing",
+            "endpoint": self.name,
+            "status": status_code,
+            "total_ms": round(self.elapsed_ms(), 1),
+            "stages_ms": {k: round(v, 1) for k, v in self.stages.items()},
+            "outcomes": dict(self.outcomes),
+        }
+
+
+_current_timer: contextvars.ContextVar[Optional[RequestTimer]] = contextvars.ContextVar(
+    "sahajseva_request_timer", default=None
+)
+
+
+def start_request(name: str) -> tuple:
+    timer = RequestTimer(name)
+    return timer, _current_timer.set(timer)
+
+
+def finish_request(timer: RequestTimer, token, status_code: int) -> None:
+    _current_timer.reset(token)
+    _observe(f"{timer.name}:total", timer.elapsed_ms())
+    print("[timing] " + json.dumps(timer.log_record(status_code), ensure_ascii=False))
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block; recorded on the active request (if any) and in the stage histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - started) * 1000.0
+        _observe(stage, ms)
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.add(stage, ms)
+
+
+def observe(stage: str, ms: float) -> None:
+    """Record a duration measured elsewhere (e.g. time spent waiting in a queue)."""
+    _observe(stage, ms)
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(stage, ms)
+
+
+def note(key: str, value) -> None:
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.note(key, value)
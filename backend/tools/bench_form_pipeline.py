@@ -0,0 +1,389 @@
+"""Reproducible benchmark for the /api/analyze-form pipeline.
+
+Generates synthetic forms from English/Hindi field templates (text PDFs,
+image-only PDFs and PNG photos at several page counts and resolutions), runs
+them through the real analyze-form endpoint with the LLM, gTTS and translator
+replaced by local fakes, and reports throughput, per-stage latency (from the
+Server-Timing header) and field recall/precision against the generated ground
+truth.
+
+Usage (from the backend directory):
+    python tools/bench_form_pipeline.py --forms 5 --pages 1,3 --dpi 100,200
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# (English label, Hindi label, field type)
+FIELD_TEMPLATES = [
+    ("Full Name", "पूरा नाम", "text"),
+    ("Father's Name", "पिता का नाम", "text"),
+    ("Date of Birth", "जन्म तिथि", "date"),
+    ("Age", "आयु", "number"),
+    ("Gender", "लिंग", "text"),
+    ("Mobile Number", "मोबाइल नंबर", "number"),
+    ("Email Address", "ईमेल पता", "text"),
+    ("Permanent Address", "स्थायी पता", "text"),
+    ("District", "जिला", "text"),
+    ("Pin Code", "पिन कोड", "number"),
+    ("Aadhaar Number", "आधार संख्या", "number"),
+    ("Bank Account Number", "बैंक खाता संख्या", "number"),
+    ("IFSC Code", "आईएफएससी कोड", "text"),
+    ("Annual Income", "वार्षिक आय", "number"),
+    ("Occupation", "व्यवसाय", "text"),
+    ("Caste Category", "जाति वर्ग", "text"),
+    ("Ration Card Number", "राशन कार्ड संख्या", "text"),
+    ("Name of Nominee", "नामांकित व्यक्ति का नाम", "text"),
+    ("Relationship with Nominee", "नामांकित व्यक्ति से संबंध", "text"),
+    ("Passport Size Photo", "पासपोर्ट साइज फोटो", "photo"),
+]
+
+# Lines a form carries that must NOT become questions.
+NOISE_LINES = [
+    "GOVERNMENT OF INDIA",
+    "Important Instructions: Fill the form in block letters.",
+    "For Office Use Only: ______",
+    "Declaration: I hereby declare that the above information is true.",
+    "Signature of Officer: ______",
+    "Do not write below this line",
+]
+
+TITLES = [
+    ("Old Age Pension Application Form", "वृद्धावस्था पेंशन आवेदन पत्र"),
+    ("Scholarship Registration Form", "छात्रवृत्ति पंजीकरण फॉर्म"),
+    ("Ration Card Application Form", "राशन कार्ड आवेदन पत्र"),
+]
+
+LABEL_STYLES = ("{label}: ____________", "{n}. {label}: ______", "{label} - __________", "{label} (as per records): ____")
+
+GLOSSARY_EN_HI = {en.lower(): hi for en, hi, _ in FIELD_TEMPLATES}
+
+
+def make_form(rng: random.Random, *, language: str, pages: int) -> dict:
+    n_fields = min(len(FIELD_TEMPLATES), rng.randint(5, 8) * pages)
+    chosen = rng.sample(FIELD_TEMPLATES, n_fields)
+    title_en, title_hi = rng.choice(TITLES)
+    per_page = max(1, -(-n_fields // pages))
+
+    page_lines = []
+    for p in range(pages):
+        lines = [title_en if language == "en" else f"{title_hi} / {title_en}"]
+        for i, (en, hi, _) in enumerate(chosen[p * per_page:(p + 1) * per_page], start=p * per_page + 1):
+            label = en if language == "en" else f"{hi} / {en}"
+            lines.append(rng.choice(LABEL_STYLES).format(label=label, n=i))
+            if rng.random() < 0.3:
+                lines.append(rng.choice(NOISE_LINES))
+        page_lines.append(lines)
+
+    return {"pages": page_lines, "truth": [(en, hi) for en, hi, _ in chosen]}
+
+
+# ---------------- RENDERERS ----------------
+def _pdf_escape(s: str) -> str:
+    # Base-14 fonts only cover Latin-1, so non-Latin glyphs are dropped from text PDFs.
+    s = s.encode("latin-1", "ignore").decode("latin-1")
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_text_pdf(pages: list) -> bytes:
+    objects = []
+    kids = []
+    font_obj = 3
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(b"")  # pages placeholder
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for lines in pages:
+        ops = ["BT", "/F1 11 Tf", "14 TL", "50 800 Td"]
+        for line in lines:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_obj = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (content_obj, font_obj)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for off in offsets:
+        out.write(b"%010d 00000 n \n" % off)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+_FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "C:/Windows/Fonts/Nirmala.ttf",
+)
+
+
+def _load_font(size: int):
+    from PIL import ImageFont  # type: ignore
+
+    for path in _FONT_CANDIDATES:
+        if os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+def render_images(pages: list, dpi: int) -> list:
+    from PIL import Image, ImageDraw  # type: ignore
+
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    font = _load_font(max(10, dpi // 7))
+    step = int(font.size * 1.8)
+    images = []
+    for lines in pages:
+        img = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(img)
+        y = dpi // 2
+        for line in lines:
+            draw.text((dpi // 2, y), line, fill=0, font=font)
+            y += step
+        images.append(img)
+    return images
+
+
+def render(kind: str, pages: list, dpi: int) -> tuple:
+    if kind == "text_pdf":
+        return render_text_pdf(pages), "form.pdf", "application/pdf"
+    images = render_images(pages, dpi)
+    buf = io.BytesIO()
+    if kind == "image_pdf":
+        images[0].save(buf, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+        return buf.getvalue(), "scan.pdf", "application/pdf"
+    # A "photo" of the form: one PNG per upload, first page only.
+    images[0].save(buf, "PNG")
+    return buf.getvalue(), "photo.png", "image/png"
+
+
+# ---------------- FAKES ----------------
+class FakeTranslator:
+    latency_s = 0.0
+    calls = 0
+
+    def translate(self, text, dest="en", src="auto"):
+        FakeTranslator.calls += 1
+        time.sleep(FakeTranslator.latency_s)
+        out = [GLOSSARY_EN_HI.get(line.strip().lower(), line) if dest == "hi" else line for line in str(text).split("\n")]
+        return SimpleNamespace(text="\n".join(out), src=src, dest=dest)
+
+
+class FakeGTTS:
+    latency_s = 0.0
+    calls = 0
+
+    def __init__(self, text, lang="en", **kwargs):
+        self.text = text
+        self.lang = lang
+
+    def write_to_fp(self, fp):
+        FakeGTTS.calls += 1
+        time.sleep(FakeGTTS.latency_s)
+        fp.write(b"\xff\xf3" + self.text.encode("utf-8")[:64])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            self.write_to_fp(f)
+
+
+class FakeLLM:
+    """Returns a well-formed answer with too few fields so the fallback extractor fills the rest."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self.latency_s)
+        return SimpleNamespace(
+            text=json.dumps(
+                {
+                    "form_id": "bench",
+                    "form_name": "Benchmark Form",
+                    "purpose": "Synthetic form used for benchmarking.",
+                    "eligibility": "",
+                    "fields": [],
+                    "warnings": [],
+                }
+            )
+        )
+
+
+# ---------------- SCORING ----------------
+def _norm(s: str) -> str:
+    return " ".join(str(s or "").lower().replace("'", "").split())
+
+
+def score(fields: list, truth: list) -> tuple:
+    names = [_norm(f.get("field_name", "")) for f in fields if isinstance(f, dict)]
+    hit = 0
+    matched = set()
+    for en, hi in truth:
+        keys = {_norm(en), _norm(hi)}
+        for i, n in enumerate(names):
+            if any(k and (k in n or n in k) for k in keys) and i not in matched:
+                matched.add(i)
+                hit += 1
+                break
+    return hit, len(truth), len(matched), len(names)
+
+
+def parse_server_timing(header: str) -> dict:
+    out = {}
+    for part in (header or "").split(","):
+        name, _, rest = part.strip().partition(";")
+        if rest.startswith("dur="):
+            out[name] = float(rest[4:])
+    return out
+
+
+def _pct(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+# ---------------- MAIN ----------------
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--forms", type=int, default=5, help="forms per (kind, language, pages, dpi) cell")
+    ap.add_argument("--kinds", default="text_pdf,image_pdf,png")
+    ap.add_argument("--languages", default="en,hi")
+    ap.add_argument("--pages", default="1,3")
+    ap.add_argument("--dpi", default="100,200", help="resolutions for image-based kinds")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--llm", choices=["off", "fake"], default="off")
+    ap.add_argument("--llm-latency-ms", type=float, default=0.0)
+    ap.add_argument("--tts-latency-ms", type=float, default=0.0)
+    ap.add_argument("--translate-latency-ms", type=float, default=0.0)
+    ap.add_argument("--json", dest="json_out", help="write the full report to this file")
+    args = ap.parse_args()
+
+    json_out = Path(args.json_out).resolve() if args.json_out else None
+    workdir = tempfile.mkdtemp(prefix="sahajseva-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, str(BACKEND_DIR))
+    import main as backend  # noqa: E402
+    from fastapi.testclient import TestClient  # noqa: E402
+
+    FakeTranslator.latency_s = args.translate_latency_ms / 1000.0
+    FakeGTTS.latency_s = args.tts_latency_ms / 1000.0
+    backend.Translator = FakeTranslator
+    backend.tts_engines.gTTS = FakeGTTS
+    if args.llm == "fake":
+        backend.client = FakeLLM(args.llm_latency_ms / 1000.0)
+        backend.MODEL_NAME = "fake"
+        if backend.types is None:
+            backend.types = SimpleNamespace(GenerateContentConfig=lambda **kw: kw)
+    else:
+        backend.client = None
+    http = TestClient(backend.app)
+
+    ocr_ok = backend.pytesseract is not None and shutil.which("tesseract") is not None
+    kinds = [k for k in args.kinds.split(",") if k]
+    if not ocr_ok and "png" in kinds:
+        print("note: Tesseract OCR is not available; skipping png cases")
+        kinds = [k for k in kinds if k != "png"]
+
+    rng = random.Random(args.seed)
+    cells = []
+    for kind in kinds:
+        for language in [x for x in args.languages.split(",") if x]:
+            for pages in [int(x) for x in args.pages.split(",") if x]:
+                dpis = [0] if kind == "text_pdf" else [int(x) for x in args.dpi.split(",") if x]
+                for dpi in dpis:
+                    cells.append((kind, language, pages, dpi))
+
+    report = {"cells": [], "config": vars(args)}
+    all_stages: dict = {}
+    t_all = time.perf_counter()
+    n_total = 0
+    for kind, language, pages, dpi in cells:
+        stages: dict = {}
+        latencies = []
+        hits = truth_n = matched = returned = errors = 0
+        for _ in range(args.forms):
+            form = make_form(rng, language=language, pages=pages)
+            body, name, ctype = render(kind, form["pages"], dpi or 150)
+            t0 = time.perf_counter()
+            r = http.post("/api/analyze-form", files={"file": (name, body, ctype)}, data={"language": language})
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            n_total += 1
+            for stage, ms in parse_server_timing(r.headers.get("server-timing", "")).items():
+                stages.setdefault(stage, []).append(ms)
+                all_stages.setdefault(stage, []).append(ms)
+            if r.status_code != 200:
+                errors += 1
+                continue
+            h, t, m, n = score(r.json()["form_analysis"].get("fields", []), form["truth"])
+            hits, truth_n, matched, returned = hits + h, truth_n + t, matched + m, returned + n
+
+        cell = {
+            "kind": kind,
+            "language": language,
+            "pages": pages,
+            "dpi": dpi or None,
+            "forms": args.forms,
+            "errors": errors,
+            "recall": round(hits / truth_n, 3) if truth_n else None,
+            "precision": round(matched / returned, 3) if returned else None,
+            "latency_ms": {"p50": round(_pct(latencies, 0.5), 1), "p95": round(_pct(latencies, 0.95), 1)},
+            "stages_ms_p50": {k: round(statistics.median(v), 1) for k, v in sorted(stages.items())},
+        }
+        report["cells"].append(cell)
+        print(
+            f"{kind:9s} {language} pages={pages} dpi={dpi or '-':>3} "
+            f"recall={cell['recall']} precision={cell['precision']} "
+            f"p50={cell['latency_ms']['p50']}ms p95={cell['latency_ms']['p95']}ms errors={errors}"
+        )
+
+    elapsed = time.perf_counter() - t_all
+    report["throughput_forms_per_s"] = round(n_total / elapsed, 2) if elapsed else None
+    report["stages_ms"] = {
+        k: {"p50": round(_pct(v, 0.5), 2), "p95": round(_pct(v, 0.95), 2), "n": len(v)} for k, v in sorted(all_stages.items())
+    }
+    report["fake_calls"] = {"translate": FakeTranslator.calls, "tts": FakeGTTS.calls}
+
+    print(f"\n{n_total} forms in {elapsed:.2f}s ({report['throughput_forms_per_s']} forms/s)")
+    print(f"{'stage':18s} p50(ms)   p95(ms)      n")
+    for stage, s in report["stages_ms"].items():
+        print(f"{stage:18s} {s['p50']:8.2f} {s['p95']:9.2f} {s['n']:6d}")
+
+    if json_out:
+        json_out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
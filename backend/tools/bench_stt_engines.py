@@ -0,0 +1,202 @@
+"""Latency and accuracy benchmark for the speech-to-text engines in stt_engines.py.
+
+Reads recorded clips from --clips, laid out one directory per language:
+
+    clips/en/name.wav   clips/en/name.txt   (reference transcript, optional)
+    clips/hi/other.webm clips/hi/other.txt
+
+Each clip is decoded to 16 kHz mono PCM once (like /api/speech-to-text), then
+every available engine transcribes every clip of a language it supports. The
+report has model load time, cold latency, p50/p95 latency, real-time factor
+(recognition time / audio duration), throughput with several concurrent clips
+and word error rate where reference transcripts exist.
+
+Usage (from the backend directory):
+    python tools/bench_stt_engines.py --clips ~/sahajseva-clips --engines google,vosk
+    VOSK_MODELS="en=models/vosk-en;hi=models/vosk-hi" python tools/bench_stt_engines.py --clips clips
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+import stt_engines  # noqa: E402
+from audio_decode import PCMDecoder  # noqa: E402
+
+AUDIO_SUFFIXES = {".wav", ".webm", ".ogg", ".opus", ".mp3", ".m4a", ".flac"}
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _words(text):
+    return _WORD_RE.findall((text or "").lower())
+
+
+def word_errors(reference, hypothesis):
+    """(edit distance in words, reference length)."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[len(hyp)], len(ref)
+
+
+def load_clips(root, languages):
+    decoder = PCMDecoder(pool_size=0)
+    clips = {}
+    for lang_dir in sorted(p for p in Path(root).iterdir() if p.is_dir()):
+        lang = lang_dir.name
+        if languages and lang not in languages:
+            continue
+        for path in sorted(lang_dir.iterdir()):
+            if path.suffix.lower() not in AUDIO_SUFFIXES:
+                continue
+            try:
+                pcm = decoder.decode(path.read_bytes())
+            except Exception as e:
+                print(f"  skipping {path}: {e}")
+                continue
+            ref = path.with_suffix(".txt")
+            clips.setdefault(lang, []).append(
+                {
+                    "name": path.name,
+                    "pcm": pcm,
+                    "audio_s": len(pcm) / (decoder.sample_rate * 2),
+                    "reference": ref.read_text(encoding="utf-8").strip() if ref.exists() else None,
+                }
+            )
+    return clips
+
+
+async def _transcribe(engine, clip, lang):
+    started = time.perf_counter()
+    text, _ = await engine.atranscribe(clip["pcm"], lang)
+    return (time.perf_counter() - started) * 1000.0, text
+
+
+async def bench_engine(engine, clips, repeat, concurrency):
+    await engine.start()
+    report = {"engine": engine.name, "warmup_ms": engine.warmup_ms, "warmup_error": engine.warmup_error, "languages": {}}
+    for lang, items in clips.items():
+        if not engine.ready or not engine.supports(lang):
+            report["languages"][lang] = {"skipped": "unsupported"}
+            continue
+        cell = {"clips": len(items), "errors": 0}
+        try:
+            cell["cold_ms"] = round((await _transcribe(engine, items[0], lang))[0], 1)
+        except Exception as e:
+            report["languages"][lang] = {"skipped": f"error: {e}"}
+            continue
+
+        latencies, rtfs, errors, ref_words = [], [], 0, 0
+        for _ in range(repeat):
+            for clip in items:
+                try:
+                    ms, text = await _transcribe(engine, clip, lang)
+                except Exception:
+                    cell["errors"] += 1
+                    continue
+                latencies.append(ms)
+                if clip["audio_s"]:
+                    rtfs.append(ms / 1000.0 / clip["audio_s"])
+                if clip["reference"] is not None:
+                    e, n = word_errors(clip["reference"], text)
+                    errors += e
+                    ref_words += n
+
+        jobs = [clip for _ in range(repeat) for clip in items]
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(clip):
+            async with slots:
+                try:
+                    await _transcribe(engine, clip, lang)
+                    return True
+                except Exception:
+                    return False
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(clip) for clip in jobs))
+        elapsed = time.perf_counter() - started
+        cell["errors"] += results.count(False)
+
+        cell.update(
+            {
+                "n": len(latencies),
+                "p50_ms": round(_pct(latencies, 0.5), 1) if latencies else None,
+                "p95_ms": round(_pct(latencies, 0.95), 1) if latencies else None,
+                "rtf_p50": round(statistics.median(rtfs), 3) if rtfs else None,
+                "wer": round(errors / ref_words, 3) if ref_words else None,
+                "throughput_per_s": round(results.count(True) / elapsed, 2) if elapsed else None,
+                "concurrency": concurrency,
+            }
+        )
+        report["languages"][lang] = cell
+    await engine.close()
+    return report
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clips", required=True, help="directory with one sub-directory of clips per language")
+    ap.add_argument("--engines", default=",".join(stt_engines.ENGINES))
+    ap.add_argument("--languages", default="", help="comma-separated subset of the clip languages")
+    ap.add_argument("--repeat", type=int, default=2)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--json", dest="json_out", help="write the full report to this file")
+    args = ap.parse_args()
+
+    languages = {l.strip() for l in args.languages.split(",") if l.strip()}
+    clips = load_clips(args.clips, languages)
+    if not clips:
+        print(f"No clips found under {args.clips}")
+        return 1
+    for lang, items in clips.items():
+        print(f"{lang}: {len(items)} clips, {sum(c['audio_s'] for c in items):.1f}s of audio")
+
+    reports = []
+    for name in [n.strip() for n in args.engines.split(",") if n.strip()]:
+        cls = stt_engines.ENGINES.get(name)
+        if cls is None:
+            print(f"{name:8s} unknown engine")
+            continue
+        engine = cls()
+        if not engine.available():
+            print(f"{name:8s} skipped (not installed or not configured)")
+            reports.append({"engine": name, "skipped": "not installed"})
+            continue
+        report = asyncio.run(bench_engine(engine, clips, args.repeat, args.concurrency))
+        reports.append(report)
+        print(f"{name:8s} warm-up={report['warmup_ms']}ms" + (f" ({report['warmup_error']})" if report["warmup_error"] else ""))
+        for lang, cell in report["languages"].items():
+            if "skipped" in cell:
+                print(f"  {lang}: skipped ({cell['skipped']})")
+                continue
+            print(
+                f"  {lang}: cold={cell['cold_ms']}ms p50={cell['p50_ms']}ms p95={cell['p95_ms']}ms "
+                f"rtf={cell['rtf_p50']} wer={cell['wer']} throughput={cell['throughput_per_s']}/s errors={cell['errors']}"
+            )
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+"""Latency and throughput benchmark for the text-to-speech engines in tts_engines.py.
+
+For every available engine and language it measures warm-up time, the first
+(cold) synthesis, sequential latency (p50/p95), real-time factor (synthesis
+time / audio duration) and throughput with several concurrent requests.
+Engines that are not installed (e.g. espeak-ng) are reported as skipped.
+
+Usage (from the backend directory):
+    python tools/bench_tts_engines.py --engines gtts,espeak --languages en,hi --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+import mp3_frames  # noqa: E402
+import tts_engines  # noqa: E402
+
+SENTENCES = {
+    "en": [
+        "Please enter your full name.",
+        "This form requires your Aadhaar number, date of birth and permanent address.",
+        "This document is an application for a ration card. It is used to get subsidised food grains "
+        "for your family. Would you like to start filling this form?",
+    ],
+    "hi": [
+        "कृपया अपना पूरा नाम लिखें।",
+        "इस फॉर्म में आपका आधार नंबर, जन्म तिथि और स्थायी पता आवश्यक है।",
+        "यह दस्तावेज़ राशन कार्ड के लिए आवेदन है। इसका उपयोग आपके परिवार के लिए सस्ता अनाज पाने के लिए किया जाता है। "
+        "क्या आप इस फॉर्म को भरना शुरू करना चाहेंगे?",
+    ],
+    "mr": [
+        "कृपया आपले पूर्ण नाव लिहा.",
+        "या फॉर्ममध्ये आपला आधार क्रमांक, जन्मतारीख आणि कायमचा पत्ता आवश्यक आहे.",
+    ],
+}
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _timed(engine, text, lang):
+    started = time.perf_counter()
+    data = engine.synthesize(text, lang)
+    return (time.perf_counter() - started) * 1000.0, data
+
+
+def bench_engine(engine, languages, repeat, concurrency):
+    report = {"engine": engine.name, "settings": engine.settings, "languages": {}}
+    asyncio.run(engine.start())
+    report["warmup_ms"] = engine.warmup_ms
+    report["warmup_error"] = engine.warmup_error
+
+    for lang in languages:
+        sentences = SENTENCES.get(lang)
+        if not sentences or not engine.supports(lang):
+            report["languages"][lang] = {"skipped": "unsupported"}
+            continue
+        cell = {"errors": 0}
+        try:
+            cell["cold_ms"] = round(_timed(engine, sentences[0], lang)[0], 1)
+        except Exception as e:
+            report["languages"][lang] = {"skipped": f"error: {e}"}
+            continue
+
+        latencies, rtfs, sizes = [], [], []
+        for _ in range(repeat):
+            for text in sentences:
+                try:
+                    ms, data = _timed(engine, text, lang)
+                except Exception:
+                    cell["errors"] += 1
+                    continue
+                latencies.append(ms)
+                sizes.append(len(data))
+                audio_s = mp3_frames.duration_s(data)
+                if audio_s:
+                    rtfs.append(ms / 1000.0 / audio_s)
+
+        jobs = [text for _ in range(repeat) for text in sentences]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda t: _safe(engine, t, lang), jobs))
+        elapsed = time.perf_counter() - started
+        cell["errors"] += results.count(False)
+
+        cell.update(
+            {
+                "n": len(latencies),
+                "p50_ms": round(_pct(latencies, 0.5), 1) if latencies else None,
+                "p95_ms": round(_pct(latencies, 0.95), 1) if latencies else None,
+                "rtf_p50": round(statistics.median(rtfs), 3) if rtfs else None,
+                "avg_bytes": int(statistics.mean(sizes)) if sizes else None,
+                "throughput_per_s": round(results.count(True) / elapsed, 2) if elapsed else None,
+                "concurrency": concurrency,
+            }
+        )
+        report["languages"][lang] = cell
+    asyncio.run(engine.close())
+    return report
+
+
+def _safe(engine, text, lang):
+    try:
+        engine.synthesize(text, lang)
+        return True
+    except Exception:
+        return False
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--engines", default=",".join(tts_engines.ENGINES))
+    ap.add_argument("--languages", default="en,hi")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--json", dest="json_out", help="write the full report to this file")
+    args = ap.parse_args()
+
+    languages = [l.strip() for l in args.languages.split(",") if l.strip()]
+    reports = []
+    for name in [n.strip() for n in args.engines.split(",") if n.strip()]:
+        cls = tts_engines.ENGINES.get(name)
+        if cls is None:
+            print(f"{name:8s} unknown engine")
+            continue
+        engine = cls()
+        if not engine.available():
+            print(f"{name:8s} skipped (not installed)")
+            reports.append({"engine": name, "skipped": "not installed"})
+            continue
+        report = bench_engine(engine, languages, args.repeat, args.concurrency)
+        reports.append(report)
+        print(f"{name:8s} warm-up={report['warmup_ms']}ms")
+        for lang, cell in report["languages"].items():
+            if "skipped" in cell:
+                print(f"  {lang}: skipped ({cell['skipped']})")
+                continue
+            print(
+                f"  {lang}: cold={cell['cold_ms']}ms p50={cell['p50_ms']}ms p95={cell['p95_ms']}ms "
+                f"rtf={cell['rtf_p50']} throughput={cell['throughput_per_s']}/s "
+                f"bytes={cell['avg_bytes']} errors={cell['errors']}"
+            )
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+"""Event-loop latency under concurrent text-to-speech.
+
+Runs the app in-process with a fake TTS engine that blocks for --tts-latency-ms
+(like a gTTS round trip), fires --concurrency start-filling requests that each
+need a fresh voice note, and meanwhile measures event-loop lag (how late a
+10 ms sleep wakes up) and /health latency. `--mode blocking` calls the TTS
+inline on the loop, the way the endpoints did before the async TTS path, for
+comparison.
+
+Usage (from the backend directory):
+    python tools/bench_tts_event_loop.py --concurrency 32 --tts-latency-ms 300
+    python tools/bench_tts_event_loop.py --concurrency 32 --tts-latency-ms 300 --mode blocking
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+class FakeEngine:
+    name = "fake"
+    settings = "fake:v1"
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, lang: str) -> bool:
+        return True
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        time.sleep(self.latency_s)
+        return b"\xff\xf3" + text.encode("utf-8")[:64]
+
+    def stream(self, text: str, lang: str):
+        yield self.synthesize(text, lang)
+
+    def describe(self) -> dict:
+        return {"name": self.name}
+
+
+def _pct(values, q):
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))], 2) if ordered else None
+
+
+async def _loop_lag_probe(samples, stop, interval_s=0.01):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval_s)
+        samples.append((time.perf_counter() - started - interval_s) * 1000.0)
+
+
+async def _health_probe(client, samples, stop, interval_s=0.05):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - started) * 1000.0)
+        await asyncio.sleep(interval_s)
+
+
+async def run(backend, args) -> dict:
+    import httpx
+
+    sessions = []
+    for i in range(args.concurrency):
+        session_id = str(uuid.uuid4())
+        field = {"field_name": f"Field {i} {session_id[:8]}", "field_type": "text", "description": "", "example": ""}
+        backend.session_store.put(session_id, {
+            "analysis_ref": backend.session_store.intern_analysis({"fields": [field]}),
+            "language": "en",
+            "current_field_index": 0,
+            "field_responses": {},
+            "form_language": "en",
+        })
+        sessions.append(session_id)
+
+    lag, health = [], []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        probes = [asyncio.create_task(_loop_lag_probe(lag, stop)), asyncio.create_task(_health_probe(client, health, stop))]
+        await asyncio.sleep(0.2)
+        baseline = len(lag)
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post("/api/start-filling", data={"session_id": sid}) for sid in sessions)
+        )
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*probes)
+        stats = (await client.get("/api/stats")).json()
+
+    under_load = lag[baseline:]
+    return {
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "tts_latency_ms": args.tts_latency_ms,
+        "errors": sum(1 for r in responses if r.status_code != 200),
+        "wall_s": round(elapsed, 2),
+        "loop_lag_ms": {"p50": _pct(under_load, 0.5), "p99": _pct(under_load, 0.99), "max": _pct(under_load, 1.0)},
+        "health_ms": {"p50": _pct(health, 0.5), "p99": _pct(health, 0.99), "max": _pct(health, 1.0)},
+        "tts_queue": stats.get("tts_queue"),
+        "tts_queue_wait_ms": stats.get("stages", {}).get("tts_queue", {}).get("p95_ms"),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--tts-latency-ms", type=float, default=300.0)
+    ap.add_argument("--mode", choices=["async", "blocking"], default="async")
+    ap.add_argument("--json", dest="json_out", help="write the report to this file")
+    args = ap.parse_args()
+
+    json_out = Path(args.json_out).resolve() if args.json_out else None
+    workdir = tempfile.mkdtemp(prefix="sahajseva-tts-bench-")
+    os.chdir(workdir)
+    os.environ["PREFETCH_QUESTIONS"] = "false"
+    os.environ["UPLOADS_JANITOR_INTERVAL_S"] = "0"
+    sys.path.insert(0, str(BACKEND_DIR))
+    import main as backend  # noqa: E402
+
+    backend.tts_engine = FakeEngine(args.tts_latency_ms / 1000.0)
+    backend._translate_batch = lambda texts, target_lang, **kw: list(texts)
+    if args.mode == "blocking":
+        async def inline_voice_note(text, target_lang=None, audio_format="mp3"):
+            return backend._create_voice_note(text, target_lang, audio_format)
+
+        backend._create_voice_note_async = inline_voice_note
+
+    report = asyncio.run(run(backend, args))
+    print(json.dumps(report, indent=2))
+    if json_out:
+        json_out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+GLOSSARY_PATH = os.path.join(os.path.dirname(__file__), "translation_glossary.json")
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_source(text: str) -> str:
+    """Key form of a source string: NFKC, collapsed whitespace, case-folded."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", str(text or ""))).strip().casefold()
+
+
+class TranslationMemory:
+    """Two-level translation cache: an in-process LRU in front of a SQLite store.
+
+    Entries are keyed by (normalized source text, source language, target language).
+    The SQLite file is shared by every worker on the node and survives restarts.
+    """
+
+    def __init__(self, db_path: Optional[str], *, lru_size: int = 4096) -> None:
+        self.db_path = db_path
+        self.lru_size = max(0, int(lru_size))
+        self._lru: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.counters: Dict[str, int] = {"lru_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "seeded": 0, "db_errors": 0}
+
+        if db_path:
+            try:
+                parent = os.path.dirname(os.path.abspath(db_path))
+                os.makedirs(parent, exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS translations (
+                        source TEXT NOT NULL,
+                        source_lang TEXT NOT NULL,
+                        target_lang TEXT NOT NULL,
+                        translation TEXT NOT NULL,
+                        origin TEXT NOT NULL DEFAULT 'provider',
+                        updated_at REAL NOT NULL,
+                        PRIMARY KEY (source, source_lang, target_lang)
+                    )
+                    """
+                )
+                self._db.commit()
+            except Exception as e:
+                print(f"Translation memory disabled (sqlite error): {e}")
+                self._db = None
+
+    # ---------------- LRU ----------------
+    def _lru_get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+        return value
+
+    def _lru_put(self, key: Tuple[str, str, str], value: str) -> None:
+        if not self.lru_size:
+            return
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    # ---------------- API ----------------
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        key = (normalize_source(text), source_lang, target_lang)
+        if not key[0]:
+            return None
+        with self._lock:
+            value = self._lru_get(key)
+            if value is not None:
+                self.counters["lru_hits"] += 1
+                return value
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT translation FROM translations WHERE source=? AND source_lang=? AND target_lang=?",
+                        key,
+                    ).fetchone()
+                except sqlite3.Error:
+                    self.counters["db_errors"] += 1
+                    row = None
+                if row is not None:
+                    self.counters["db_hits"] += 1
+                    self._lru_put(key, row[0])
+                    return row[0]
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, text: str, source_lang: str, target_lang: str, translation: str, *, origin: str = "provider") -> None:
+        self.put_many([(text, translation)], source_lang, target_lang, origin=origin)
+
+    def put_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        source_lang: str,
+        target_lang: str,
+        *,
+        origin: str = "provider",
+        overwrite: bool = True,
+    ) -> None:
+        rows = []
+        now = time.time()
+        for text, translation in pairs:
+            src = normalize_source(text)
+            if not src or not translation:
+                continue
+            rows.append((src, source_lang, target_lang, str(translation), origin, now))
+        if not rows:
+            return
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        with self._lock:
+            for src, sl, tl, translation, _, _ in rows:
+                if overwrite or (src, sl, tl) not in self._lru:
+                    self._lru_put((src, sl, tl), translation)
+            self.counters["seeded" if origin == "seed" else "stores"] += len(rows)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        f"{verb} INTO translations (source, source_lang, target_lang, translation, origin, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._db.commit()
+                except sqlite3.Error:
+                    self.counters["db_errors"] += 1
+
+    def seed(self, pairs: Iterable[Tuple[str, str]], source_lang: str, target_lang: str) -> None:
+        """Load known-good translations without overriding anything already stored."""
+        self.put_many(pairs, source_lang, target_lang, origin="seed", overwrite=False)
+
+    def seed_from_glossary(self, path: str = GLOSSARY_PATH, *, source_lang: str = "auto") -> int:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                glossary = json.load(f)
+        except Exception as e:
+            print(f"Could not load translation glossary {path}: {e}")
+            return 0
+        count = 0
+        for target_lang, entries in (glossary or {}).items():
+            if isinstance(entries, dict):
+                self.seed(entries.items(), source_lang, target_lang)
+                count += len(entries)
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self.counters)
+            out["lru_entries"] = len(self._lru)
+            out["lru_capacity"] = self.lru_size
+            lookups = out["lru_hits"] + out["db_hits"] + out["misses"]
+            out["hit_rate"] = round((out["lru_hits"] + out["db_hits"]) / lookups, 4) if lookups else None
+            out["db_entries"] = None
+            if self._db is not None:
+                try:
+                    out["db_entries"] = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            out["db_path"] = self.db_path
+            return out
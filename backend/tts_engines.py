@@ -0,0 +1,389 @@
+import asyncio
+import base64
+import io
+import re
+import shutil
+import time
+import urllib.request
+from typing import Dict, Iterator, List, Optional, Set, Type
+
+try:
+    from gtts import gTTS  # type: ignore
+    from gtts.lang import tts_langs  # type: ignore
+except Exception:  # pragma: no cover
+    gTTS = None
+    tts_langs = None
+
+try:
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+except Exception:  # pragma: no cover
+    requests = None
+    HTTPAdapter = None
+
+try:
+    import imageio_ffmpeg  # type: ignore
+except Exception:  # pragma: no cover
+    imageio_ffmpeg = None
+
+
+class TTSEngineError(RuntimeError):
+    pass
+
+
+def ffmpeg_binary() -> Optional[str]:
+    path = shutil.which("ffmpeg")
+    if path is None and imageio_ffmpeg is not None:
+        try:
+            path = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            path = None
+    return path
+
+
+async def run_pipe(cmd: List[str], data: bytes) -> bytes:
+    """Run cmd with data on stdin and return stdout; raise TTSEngineError on failure."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await proc.communicate(data)
+    if proc.returncode != 0:
+        raise TTSEngineError(f"{cmd[0]} exited with {proc.returncode}: {err.decode('utf-8', 'replace').strip()[:200]}")
+    return out
+
+
+async def encode_opus(mp3: bytes, *, bitrate: str = "16k") -> bytes:
+    """Re-encode a voice note as mono Opus in an Ogg container (speech-tuned, low bitrate)."""
+    ffmpeg = ffmpeg_binary()
+    if ffmpeg is None:
+        raise TTSEngineError("ffmpeg not found")
+    return await run_pipe(
+        [
+            ffmpeg, "-loglevel", "error", "-f", "mp3", "-i", "pipe:0",
+            "-ac", "1", "-c:a", "libopus", "-b:a", bitrate, "-application", "voip", "-f", "ogg", "pipe:1",
+        ],
+        mp3,
+    )
+
+
+class TTSEngine:
+    """A speech synthesizer producing mp3 bytes.
+
+    Engines implement either the blocking synthesize() or the async asynthesize(); the other
+    one is derived. start() runs once at startup so the first real request is not cold.
+    """
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.settings = f"{self.name}:v1"  # part of the voice-note cache key
+        self.ready = False
+        self.warmup_ms: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, lang: str) -> bool:
+        return True
+
+    async def warm_up(self) -> None:
+        pass
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        try:
+            await self.warm_up()
+            self.ready = True
+        except Exception as e:
+            self.warmup_error = str(e)
+            print(f"TTS engine {self.name} warm-up failed: {e}")
+        self.warmup_ms = round((time.perf_counter() - started) * 1000.0, 1)
+
+    async def close(self) -> None:
+        self.ready = False
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        if type(self).asynthesize is TTSEngine.asynthesize:
+            raise NotImplementedError
+        return asyncio.run(self.asynthesize(text, lang))
+
+    async def asynthesize(self, text: str, lang: str) -> bytes:
+        if type(self).synthesize is TTSEngine.synthesize:
+            raise NotImplementedError
+        return await asyncio.to_thread(self.synthesize, text, lang)
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        """mp3 bytes as they become available; engines without incremental output yield once."""
+        yield self.synthesize(text, lang)
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "settings": self.settings,
+            "available": self.available(),
+            "ready": self.ready,
+            "warmup_ms": self.warmup_ms,
+            "warmup_error": self.warmup_error,
+        }
+
+
+# Audio payload inside Google's batchexecute response (same pattern gTTS uses).
+_GTTS_AUDIO_RE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+class _GTTSInternalsChanged(Exception):
+    """gTTS's private request API or Google's response format is not what the pooled path expects."""
+
+
+class _GTTSNoAudio(_GTTSInternalsChanged):
+    """One pooled response carried no audio; only that request falls back to gTTS's public API."""
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate's TTS endpoint via gTTS (network, good Indian-language coverage).
+
+    gTTS opens a new HTTPS connection for every ~100-character part; this adapter sends the
+    requests gTTS prepares through one pooled session so connections are reused. That relies on
+    gTTS internals (pinned in requirements.txt). A response without audio sends just that text
+    through gTTS's public API; if the private API itself fails, pooling is switched off for
+    pool_retry_s seconds and then tried again.
+    """
+
+    name = "gtts"
+
+    def __init__(
+        self,
+        *,
+        tld: str = "com",
+        slow: bool = False,
+        pool_size: int = 8,
+        timeout: float = 15.0,
+        pool_retry_s: float = 600.0,
+    ) -> None:
+        super().__init__()
+        self.tld = tld
+        self.slow = slow
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pool_retry_s = pool_retry_s
+        self.settings = f"gtts:tld={tld}:slow={int(slow)}:v1"
+        self._languages: Optional[Set[str]] = None
+        self._session = None
+        self._pooling_failed: Optional[str] = None
+        self._pooling_failed_at = 0.0
+        self.direct_fallbacks = 0
+
+    def available(self) -> bool:
+        return gTTS is not None
+
+    def _language_set(self) -> Set[str]:
+        if self._languages is None:
+            try:
+                self._languages = set(tts_langs()) if tts_langs is not None else set()
+            except Exception:
+                self._languages = set()
+        return self._languages
+
+    def supports(self, lang: str) -> bool:
+        languages = self._language_set()
+        return lang in languages if languages else True
+
+    def _http(self):
+        if self._session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size))
+            self._session = session
+        return self._session
+
+    def _open_connection(self) -> None:
+        try:
+            self._http().head(f"https://translate.google.{self.tld}/", timeout=3)
+        except Exception as e:
+            print(f"gTTS warm-up connection failed: {e}")
+
+    async def warm_up(self) -> None:
+        await asyncio.to_thread(self._language_set)
+        if requests is not None:
+            await asyncio.to_thread(self._open_connection)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _engine(self, text: str, lang: str):
+        return gTTS(text=text, lang=lang, tld=self.tld, slow=self.slow)
+
+    def _send(self, engine) -> Iterator[bytes]:
+        session = self._http()
+        try:
+            requests_to_send = list(engine._prepare_requests())
+        except Exception as e:
+            raise _GTTSInternalsChanged(f"_prepare_requests failed: {e}")
+        for prepared in requests_to_send:
+            try:
+                response = session.send(prepared, timeout=self.timeout, proxies=urllib.request.getproxies())
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                raise TTSEngineError(f"gTTS request failed: {e}")
+            found = False
+            for line in response.iter_lines(chunk_size=1024):
+                match = _GTTS_AUDIO_RE.search(line.decode("utf-8", "replace"))
+                if match:
+                    found = True
+                    yield base64.b64decode(match.group(1).encode("ascii"))
+            if not found:
+                raise _GTTSNoAudio("gTTS response contained no audio")
+
+    def _pooling_paused(self) -> bool:
+        return self._pooling_failed is not None and time.monotonic() - self._pooling_failed_at < self.pool_retry_s
+
+    def _poolable(self, engine) -> bool:
+        return requests is not None and not self._pooling_paused() and hasattr(engine, "_prepare_requests")
+
+    def _pooling_error(self, error: Exception) -> None:
+        """Record a failed pooled request; the caller then uses gTTS's public API for it."""
+        self.direct_fallbacks += 1
+        if isinstance(error, _GTTSNoAudio):
+            print(f"gTTS pooled request failed ({error}); using gTTS directly for this text")
+            return
+        print(f"gTTS pooled requests failed ({error}); using gTTS directly for {self.pool_retry_s:.0f}s")
+        self._pooling_failed = str(error) or type(error).__name__
+        self._pooling_failed_at = time.monotonic()
+
+    def _pooling_ok(self) -> None:
+        if self._pooling_failed is not None:
+            print("gTTS pooled requests work again")
+            self._pooling_failed = None
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        engine = self._engine(text, lang)
+        if self._poolable(engine):
+            try:
+                audio = b"".join(self._send(engine))
+            except TTSEngineError:
+                raise
+            except Exception as e:
+                self._pooling_error(e)
+            else:
+                self._pooling_ok()
+                return audio
+        buf = io.BytesIO()
+        engine.write_to_fp(buf)
+        return buf.getvalue()
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        engine = self._engine(text, lang)
+        if self._poolable(engine):
+            sent = False
+            try:
+                for chunk in self._send(engine):
+                    sent = True
+                    yield chunk
+                self._pooling_ok()
+                return
+            except TTSEngineError:
+                raise
+            except Exception as e:
+                self._pooling_error(e)
+                if sent:
+                    raise TTSEngineError(f"gTTS stream failed: {e}")
+        yield from engine.stream()
+
+    def describe(self) -> dict:
+        return dict(
+            super().describe(),
+            pooled=not self._pooling_paused(),
+            pooling_error=self._pooling_failed,
+            direct_fallbacks=self.direct_fallbacks,
+        )
+
+
+class EspeakEngine(TTSEngine):
+    """Offline CPU synthesis with espeak-ng, encoded to mono mp3 by ffmpeg.
+
+    Robotic compared to gTTS, but latency is a few tens of milliseconds per sentence and it
+    needs no network.
+    """
+
+    name = "espeak"
+
+    # App language code -> espeak-ng voice.
+    VOICES = {
+        "en": "en-us",
+        "hi": "hi",
+        "mr": "mr",
+        "ta": "ta",
+        "te": "te",
+        "bn": "bn",
+        "gu": "gu",
+        "kn": "kn",
+        "ml": "ml",
+        "pa": "pa",
+        "or": "or",
+        "as": "as",
+        "ur": "ur",
+    }
+
+    def __init__(self, *, binary: Optional[str] = None, speed: int = 150, bitrate: str = "32k") -> None:
+        super().__init__()
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        self.ffmpeg = ffmpeg_binary()
+        self.speed = speed
+        self.bitrate = bitrate
+        self.settings = f"espeak-ng:s={speed}:b={bitrate}:v1"
+        self._voices: Optional[Set[str]] = None
+
+    def available(self) -> bool:
+        return bool(self.binary and self.ffmpeg)
+
+    def supports(self, lang: str) -> bool:
+        voice = self.VOICES.get(lang, lang)
+        return voice in self._voices if self._voices else lang in self.VOICES
+
+    async def warm_up(self) -> None:
+        if not self.available():
+            raise TTSEngineError("espeak-ng or ffmpeg not found")
+        listing = await run_pipe([self.binary, "--voices"], b"")
+        voices = set()
+        for line in listing.decode("utf-8", "replace").splitlines()[1:]:
+            parts = line.split()
+            if len(parts) >= 2:
+                voices.add(parts[1])
+        self._voices = voices or None
+        # One throwaway synthesis pages in the voice data and both binaries.
+        await self.asynthesize("ready", "en")
+
+    async def asynthesize(self, text: str, lang: str) -> bytes:
+        voice = self.VOICES.get(lang, lang)
+        # Text goes through stdin so it can never be parsed as an option.
+        wav = await run_pipe([self.binary, "-v", voice, "-s", str(self.speed), "--stdin", "--stdout"], text.encode("utf-8"))
+        return await run_pipe(
+            [self.ffmpeg, "-loglevel", "error", "-f", "wav", "-i", "pipe:0", "-ac", "1", "-b:a", self.bitrate, "-f", "mp3", "pipe:1"],
+            wav,
+        )
+
+
+ENGINES: Dict[str, Type[TTSEngine]] = {
+    GTTSEngine.name: GTTSEngine,
+    EspeakEngine.name: EspeakEngine,
+}
+
+
+def create_engine(name: str, *, fallback: str = GTTSEngine.name) -> TTSEngine:
+    """Engine registered under name, or the fallback engine if it is unknown or unavailable."""
+    key = (name or "").strip().lower()
+    cls = ENGINES.get(key)
+    if cls is None:
+        print(f"Unknown TTS engine {name!r}; using {fallback}")
+        cls = ENGINES[fallback]
+    engine = cls()
+    if not engine.available() and cls.name != fallback:
+        print(f"TTS engine {cls.name} is not available here; using {fallback}")
+        engine = ENGINES[fallback]()
+    return engine
@@ -0,0 +1,200 @@
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Root-level files with these extensions are scratch files (uploaded forms, STT input and
+# conversions, partial writes) that should never outlive the request that created them.
+TEMP_EXTENSIONS = {"tmp", "part", "wav", "webm", "ogg", "oga", "aiff", "aif", "flac", "m4a", "pdf", "png", "jpg", "jpeg"}
+
+
+def shard_path(root: str, name: str, depth: int = 2) -> str:
+    """root/ab/cd/name for name "abcd..." so no directory holds more than a few thousand files."""
+    parts = [name[2 * i:2 * i + 2] for i in range(depth) if len(name) >= 2 * i + 2]
+    return os.path.join(root, *parts, name)
+
+
+class UploadsJanitor:
+    """Keeps the uploads directory bounded.
+
+    Each sweep deletes stale scratch files, then voice notes not accessed for max_age_s,
+    then least-recently-used voice notes until the directory fits in max_bytes and the
+    disk keeps min_free_bytes free. Files returned by protected() and files younger than
+    min_age_s are never touched.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        max_bytes: int,
+        max_age_s: float,
+        temp_max_age_s: float,
+        min_age_s: float = 300.0,
+        min_free_bytes: int = 0,
+        protected: Optional[Callable[[], Iterable[str]]] = None,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.temp_max_age_s = temp_max_age_s
+        self.min_age_s = min_age_s
+        self.min_free_bytes = min_free_bytes
+        self.protected = protected or (lambda: ())
+        self._lock = threading.Lock()
+        self.last_sweep: Dict[str, object] = {}
+        self.usage: Dict[str, Dict[str, int]] = {}
+        self._deleted: Set[str] = set()
+        self.totals = {"sweeps": 0, "deleted_files": 0, "freed_bytes": 0, "errors": 0}
+
+    def touch(self, path: str) -> None:
+        """Record a read; eviction is LRU on access time, which noatime mounts would not update."""
+        try:
+            st = os.stat(path)
+            os.utime(path, (time.time(), st.st_mtime))
+        except OSError:
+            pass
+
+    def _scan(self) -> List[Tuple[str, int, float, float, bool]]:
+        """(path, size, last_access, mtime, is_temp) for every file under root."""
+        out = []
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                ext = entry.name.rsplit(".", 1)[-1].lower() if "." in entry.name else ""
+                is_temp = ext in ("tmp", "part") or (current == self.root and ext in TEMP_EXTENSIONS)
+                out.append((entry.path, st.st_size, max(st.st_atime, st.st_mtime), st.st_mtime, is_temp))
+        return out
+
+    def _delete(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            self._deleted.add(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError:
+            self.totals["errors"] += 1
+            return False
+
+    def _prune_empty_dirs(self) -> None:
+        for current, dirs, files in os.walk(self.root, topdown=False):
+            if current != self.root and not dirs and not files:
+                try:
+                    os.rmdir(current)
+                except OSError:
+                    pass
+
+    def sweep(self, protected_paths: Optional[Iterable[str]] = None) -> dict:
+        """Run one cleanup pass; protected_paths overrides protected() when given."""
+        with self._lock:
+            started = time.perf_counter()
+            now = time.time()
+            if protected_paths is None:
+                protected_paths = self.protected()
+            protected: Set[str] = {os.path.abspath(p) for p in protected_paths if p}
+            files = self._scan()
+            self._deleted = set()
+            deleted = {"temp": 0, "expired": 0, "evicted": 0}
+            freed = 0
+            total_bytes = sum(f[1] for f in files)
+
+            candidates = []
+            for path, size, last_access, mtime, is_temp in files:
+                if path in protected or now - mtime < self.min_age_s:
+                    continue
+                if is_temp:
+                    if now - mtime > self.temp_max_age_s and self._delete(path):
+                        deleted["temp"] += 1
+                        freed += size
+                    continue
+                if now - last_access > self.max_age_s:
+                    if self._delete(path):
+                        deleted["expired"] += 1
+                        freed += size
+                    continue
+                candidates.append((last_access, path, size))
+
+            # Size / free-space quota: evict least recently used first.
+            remaining = total_bytes - freed
+            free_bytes = self._free_bytes()
+            candidates.sort()
+            for _, path, size in candidates:
+                over_quota = remaining > self.max_bytes
+                low_disk = free_bytes is not None and free_bytes < self.min_free_bytes
+                if not over_quota and not low_disk:
+                    break
+                if self._delete(path):
+                    deleted["evicted"] += 1
+                    freed += size
+                    remaining -= size
+                    if free_bytes is not None:
+                        free_bytes += size
+
+            self._prune_empty_dirs()
+            self.usage = self._usage(f for f in files if f[0] not in self._deleted)
+            self._deleted = set()
+            n_deleted = sum(deleted.values())
+            self.totals["sweeps"] += 1
+            self.totals["deleted_files"] += n_deleted
+            self.totals["freed_bytes"] += freed
+            self.last_sweep = {
+                "at": now,
+                "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+                "files_before": len(files),
+                "bytes_before": total_bytes,
+                "deleted": deleted,
+                "freed_bytes": freed,
+                "protected": len(protected),
+            }
+            return dict(self.last_sweep)
+
+    def _free_bytes(self) -> Optional[int]:
+        try:
+            return shutil.disk_usage(self.root).free
+        except OSError:
+            return None
+
+    def _usage(self, files: Iterable[Tuple[str, int, float, float, bool]]) -> Dict[str, Dict[str, int]]:
+        usage: Dict[str, Dict[str, int]] = {}
+        for path, size, _, _, is_temp in files:
+            rel = os.path.relpath(path, self.root)
+            kind = "temp" if is_temp else (rel.split(os.sep, 1)[0] if os.sep in rel else "root")
+            bucket = usage.setdefault(kind, {"files": 0, "bytes": 0})
+            bucket["files"] += 1
+            bucket["bytes"] += size
+        return usage
+
+    def stats(self) -> dict:
+        """Usage as of the last sweep (a full scan per stats call would be too slow on big trees)."""
+        usage = self.usage
+        return {
+            "root": self.root,
+            "files": sum(b["files"] for b in usage.values()),
+            "bytes": sum(b["bytes"] for b in usage.values()),
+            "by_kind": usage,
+            "free_bytes": self._free_bytes(),
+            "limits": {
+                "max_bytes": self.max_bytes,
+                "max_age_s": self.max_age_s,
+                "temp_max_age_s": self.temp_max_age_s,
+                "min_free_bytes": self.min_free_bytes,
+            },
+            "last_sweep": dict(self.last_sweep),
+            "totals": dict(self.totals),
+        }
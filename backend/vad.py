@@ -0,0 +1,226 @@
+import math
+import operator
+import statistics
+from array import array
+from collections import deque
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    import webrtcvad  # type: ignore
+except Exception:  # pragma: no cover
+    webrtcvad = None
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+SILENCE_DBFS = -96.0
+# The adaptive energy threshold never drops below this, even in a perfectly quiet room.
+MIN_THRESHOLD_DBFS = -60.0
+# A noise floor estimated from a clip is never above this. Clips recorded push-to-talk can be
+# speech from the first frame to the last, and their quietest frames are then speech, not noise.
+MAX_NOISE_FLOOR_DBFS = -45.0
+
+
+def frame_dbfs(frame: bytes) -> float:
+    """RMS level of a s16le frame in dBFS."""
+    samples = array("h", frame)
+    if not samples:
+        return SILENCE_DBFS
+    mean_square = sum(map(operator.mul, samples, samples)) / len(samples)
+    if mean_square <= 0:
+        return SILENCE_DBFS
+    return 10.0 * math.log10(mean_square / (32768.0 * 32768.0))
+
+
+def estimate_noise_floor(
+    levels: List[float], *, margin_db: float = 10.0, max_floor_dbfs: float = MAX_NOISE_FLOOR_DBFS
+) -> float:
+    """Noise floor in dBFS from per-frame levels, at most max_floor_dbfs.
+
+    Starts from the quietest fifth of the frames, then takes the median of every frame that is
+    not more than margin_db above that guess (i.e. the frames that look like non-speech).
+    """
+    if not levels:
+        return SILENCE_DBFS
+    ordered = sorted(levels)
+    guess = statistics.fmean(ordered[: max(1, len(ordered) // 5)])
+    quiet = [level for level in ordered if level <= guess + margin_db]
+    return min(statistics.median(quiet), max_floor_dbfs)
+
+
+class VoiceActivityDetector:
+    """Per-frame speech/non-speech decision for 16 kHz mono s16le audio.
+
+    Uses webrtcvad when it is installed, otherwise an energy threshold. The energy threshold
+    adapts to the room: it sits margin_db above a noise floor that is tracked from the frames
+    judged to be non-speech (threshold_dbfs until a floor is known).
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = FRAME_MS,
+        aggressiveness: int = 2,
+        threshold_dbfs: float = -42.0,
+        margin_db: float = 10.0,
+        adaptive: bool = True,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.threshold_dbfs = threshold_dbfs
+        self.margin_db = margin_db
+        self.adaptive = adaptive
+        self.noise_floor_dbfs: Optional[float] = None
+        self._webrtc = webrtcvad.Vad(aggressiveness) if webrtcvad is not None else None
+
+    def threshold(self) -> float:
+        if not self.adaptive or self.noise_floor_dbfs is None:
+            return self.threshold_dbfs
+        return max(MIN_THRESHOLD_DBFS, self.noise_floor_dbfs + self.margin_db)
+
+    def is_speech(self, frame: bytes) -> bool:
+        level = frame_dbfs(frame)
+        speech = level > self.threshold()
+        if self._webrtc is not None:
+            try:
+                # webrtcvad fires on steady noise too; a frame at the noise floor is never speech.
+                speech = self._webrtc.is_speech(frame, self.sample_rate) and (
+                    self.noise_floor_dbfs is None or level > self.noise_floor_dbfs + 3.0
+                )
+            except Exception:
+                pass
+        if self.adaptive and not speech:
+            # Slow moving average so a single loud non-speech frame does not shift the floor.
+            floor = self.noise_floor_dbfs
+            self.noise_floor_dbfs = level if floor is None else floor + 0.05 * (level - floor)
+        return speech
+
+
+class Trimmed(NamedTuple):
+    pcm: bytes  # b"" when the clip has no speech
+    speech_ms: int
+    input_ms: int
+    noise_floor_dbfs: float
+
+
+def trim_silence(
+    pcm: bytes,
+    vad: Optional[VoiceActivityDetector] = None,
+    *,
+    pad_ms: int = 200,
+    min_run_ms: int = 90,
+    min_speech_ms: int = 150,
+) -> Trimmed:
+    """Cut leading and trailing silence from a finished clip.
+
+    The noise floor is estimated from the whole clip first, so the threshold is right from the
+    first frame. Speech starts at the first run of min_run_ms voiced frames and ends after the
+    last one; pad_ms of audio is kept on both sides so word edges are not clipped. A clip with
+    less than min_speech_ms of speech comes back empty.
+    """
+    vad = vad or VoiceActivityDetector()
+    step = vad.frame_bytes
+    frames = [pcm[i:i + step] for i in range(0, len(pcm) - len(pcm) % step, step)]
+    input_ms = len(pcm) * 1000 // (vad.sample_rate * 2)
+    floor = estimate_noise_floor([frame_dbfs(f) for f in frames], margin_db=vad.margin_db)
+    vad.noise_floor_dbfs = floor
+
+    voiced = [vad.is_speech(f) for f in frames]
+    min_run = max(1, min_run_ms // vad.frame_ms)
+    first = last = None
+    run = 0
+    for i, speech in enumerate(voiced):
+        run = run + 1 if speech else 0
+        if run >= min_run:
+            if first is None:
+                first = i - min_run + 1
+            last = i
+    speech_ms = sum(voiced) * vad.frame_ms
+    if first is None or speech_ms < min_speech_ms:
+        return Trimmed(b"", speech_ms, input_ms, floor)
+
+    pad = pad_ms // vad.frame_ms
+    start = max(0, first - pad) * step
+    end = min(len(frames), last + 1 + pad) * step
+    if end >= len(frames) * step:
+        end = len(pcm)  # keep the partial frame at the end
+    return Trimmed(pcm[start:end], speech_ms, input_ms, floor)
+
+
+class Segmenter:
+    """Cuts a live PCM stream into utterances.
+
+    An utterance starts after start_ms of consecutive speech frames (keeping pre_roll_ms of
+    audio before it) and ends after end_silence_ms of non-speech or at max_segment_ms.
+    feed() returns events: ("start", index) and ("end", index, pcm).
+    """
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        *,
+        start_ms: int = 90,
+        end_silence_ms: int = 600,
+        pre_roll_ms: int = 300,
+        max_segment_ms: int = 15000,
+    ) -> None:
+        self.vad = vad
+        frame_ms = vad.frame_ms
+        self._start_frames = max(1, start_ms // frame_ms)
+        self._end_frames = max(1, end_silence_ms // frame_ms)
+        self._max_frames = max(1, max_segment_ms // frame_ms)
+        self._pre_roll: deque = deque(maxlen=max(self._start_frames, pre_roll_ms // frame_ms))
+        self._pending = b""
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._segment: Optional[List[bytes]] = None
+        self.index = -1
+
+    @property
+    def in_speech(self) -> bool:
+        return self._segment is not None
+
+    def current(self) -> bytes:
+        """Audio of the utterance in progress (empty when idle)."""
+        return b"".join(self._segment) if self._segment is not None else b""
+
+    def current_ms(self) -> int:
+        return len(self._segment) * self.vad.frame_ms if self._segment is not None else 0
+
+    def feed(self, pcm: bytes) -> List[Tuple]:
+        events: List[Tuple] = []
+        data = self._pending + pcm
+        step = self.vad.frame_bytes
+        usable = len(data) - len(data) % step
+        self._pending = data[usable:]
+        for offset in range(0, usable, step):
+            frame = data[offset:offset + step]
+            speech = self.vad.is_speech(frame)
+            if self._segment is None:
+                self._pre_roll.append(frame)
+                self._voiced_run = self._voiced_run + 1 if speech else 0
+                if self._voiced_run >= self._start_frames:
+                    self.index += 1
+                    self._segment = list(self._pre_roll)
+                    self._pre_roll.clear()
+                    self._silent_run = 0
+                    events.append(("start", self.index))
+                continue
+            self._segment.append(frame)
+            self._silent_run = 0 if speech else self._silent_run + 1
+            if self._silent_run >= self._end_frames or len(self._segment) >= self._max_frames:
+                events.append(self._close())
+        return events
+
+    def _close(self) -> Tuple:
+        segment = b"".join(self._segment or [])
+        self._segment = None
+        self._voiced_run = 0
+        self._silent_run = 0
+        return ("end", self.index, segment)
+
+    def flush(self) -> List[Tuple]:
+        """End the utterance in progress, if any (e.g. when the client stops sending)."""
+        self._pending = b""
+        return [self._close()] if self._segment is not None else []